@@ -0,0 +1,65 @@
+"""Benchmark for Boolean movie queries over the rank bitmaps.
+
+Run from the CS235Flix directory:
+
+    $ python -m benchmarks.bench_boolean_queries --max-rows 1000000
+
+Each query is timed as a scan over Movie objects and from the repository's rank bitmaps. The bitmap time should
+follow the size of the sets combined, and selective queries should stay fast however large the catalogue grows.
+"""
+import argparse
+import tempfile
+import timeit
+from pathlib import Path
+
+from benchmarks.bench_movie_file_reader import write_movie_file
+from movie_app.adapters.memory_repository import MemoryRepository
+from movie_app.adapters.movie_query import parse_movie_query
+from movie_app.datafilereaders import MovieFileCSVReader
+from movie_app.domainmodel import Director, Genre
+
+ACTION, SCI_FI, HORROR, DRAMA, COMEDY, ROMANCE = (Genre(name) for name in (
+    'Action', 'Sci-Fi', 'Horror', 'Drama', 'Comedy', 'Romance'))
+
+QUERIES = {
+    'broad': ('(genre:Action OR genre:Sci-Fi) NOT genre:Horror',
+              lambda movie: (ACTION in movie.genres or SCI_FI in movie.genres) and HORROR not in movie.genres),
+    'years': ('year:2010..2012 genre:Comedy NOT genre:Romance',
+              lambda movie: 2010 <= movie.release_year <= 2012 and COMEDY in movie.genres and
+              ROMANCE not in movie.genres),
+    'selective': ('genre:Drama director:"Director 7"',
+                  lambda movie: DRAMA in movie.genres and movie.director == Director('Director 7'))
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--max-rows', type=int, default=1000000)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} " + ' '.join(f"{name + ' scan':>16} {name + ' bitmaps':>18}" for name in QUERIES.keys()))
+    rows = 1000
+    with tempfile.TemporaryDirectory() as temp_dir:
+        while rows <= args.max_rows:
+            file_name = str(Path(temp_dir, f"movies_{rows}.csv"))
+            write_movie_file(file_name, rows)
+            repo = MemoryRepository(use_movie_columns=False)
+            repo.set_movie_file_csv_reader(MovieFileCSVReader(file_name))
+            repo.load_movie_dataset()
+            movies = repo.get_movies_by_rank(range(1, rows + 1))
+
+            timings = list()
+            for text, matches in QUERIES.values():
+                query = parse_movie_query(text)
+                assert repo.get_movie_ranks_by_query(query) == [movie.rank for movie in movies if matches(movie)]
+                timings.append(min(timeit.repeat(lambda: [movie.rank for movie in movies if matches(movie)],
+                                                 number=1, repeat=3)))
+                timings.append(min(timeit.repeat(lambda: repo.get_movie_ranks_by_query(query), number=1, repeat=3)))
+
+            print(f"{rows:>10} " + ' '.join(f"{timings[i] * 1e3:>14.2f}ms {timings[i + 1] * 1e3:>16.2f}ms"
+                                            for i in range(0, len(timings), 2)))
+            rows *= 10
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""Benchmark of CS235Flix home and browse pages revalidated with their ETags.
+
+Run from the CS235Flix directory:
+
+    $ python -m benchmarks.bench_conditional_get --pages 40 --size 10 --repeat 5
+
+A local OMDb stand-in server answers poster lookups. Each page is requested once to warm the caches and obtain its
+ETag, then the pages are requested again in full and revalidated with If-None-Match, and the mean times are reported.
+"""
+import argparse
+import time
+
+from config import DataPaths
+from movie_app import create_app
+from movie_app.adapters.omdb_standin import StandInSettings, start_in_background
+from benchmarks.bench_fragment_cache import page_urls
+
+
+def time_requests(client, urls, etags, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for url in urls:
+            headers = {'If-None-Match': f'W/"{etags[url]}"'} if etags is not None else {}
+            client.get(url, headers=headers)
+    return (time.perf_counter() - start) / (repeat * len(urls))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, default=40)
+    parser.add_argument('--size', type=int, default=10, help='movies shown on each browse page')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    server, base_url = start_in_background(StandInSettings(seed=1))
+    app = create_app({
+        'TESTING': True,
+        'TEST_DATA_PATHS': DataPaths.PROD_DATA_PATHS,
+        'REPOSITORY_SNAPSHOT': None,
+        'POSTER_CACHE_FILE': None,
+        'POSTER_WARMUP': False,
+        'POSTER_DIRECTORY': None,
+        'OMDB_URL': base_url
+    })
+    client = app.test_client()
+    urls = page_urls(args.pages, args.size)
+    etags = {url: client.get(url).get_etag()[0] for url in urls}
+
+    print(f"{'request':<14} {'ms per page':>12}")
+    print(f"{'full page':<14} {time_requests(client, urls, None, args.repeat) * 1e3:>12.2f}")
+    print(f"{'revalidation':<14} {time_requests(client, urls, etags, args.repeat) * 1e3:>12.2f}")
+
+    server.shutdown()
+    server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Benchmark of CS235Flix home and browse pages with and without the fragment and page caches.
+
+Run from the CS235Flix directory:
+
+    $ python -m benchmarks.bench_fragment_cache --pages 40 --size 10 --repeat 5
+
+A local OMDb stand-in server answers poster lookups. Each page is requested once to warm the poster and fragment
+caches, then the pages are requested again and the mean time per page is reported for each configuration.
+"""
+import argparse
+import time
+
+from config import DataPaths
+from movie_app import create_app
+from movie_app.adapters.omdb_standin import StandInSettings, start_in_background
+import movie_app.adapters.fragment_cache as fragment_cache
+import movie_app.adapters.repository as repo
+
+CONFIGURATIONS = (
+    ('no caches', 0, 0),
+    ('fragment cache', 16 * 1024 * 1024, 0),
+    ('fragment and page cache', 16 * 1024 * 1024, 16 * 1024 * 1024),
+)
+
+
+def page_urls(quantity: int, size: int):
+    urls = ['/']
+    for genre in repo.repo_instance.get_genres():
+        urls.append(f"/movies_by_genres?genres={genre.genre_name}&size={size}")
+        urls.append(f"/movies_by_genres?genres={genre.genre_name}&size={size}&sort=-rating")
+    return urls[:quantity]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, default=40)
+    parser.add_argument('--size', type=int, default=10, help='movies shown on each browse page')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    server, base_url = start_in_background(StandInSettings(seed=1))
+    print(f"{'configuration':<24} {'ms per page':>12} {'fragment hits':>14} {'page hits':>10}")
+
+    for name, fragment_cache_bytes, page_cache_bytes in CONFIGURATIONS:
+        app = create_app({
+            'TESTING': True,
+            'TEST_DATA_PATHS': DataPaths.PROD_DATA_PATHS,
+            'REPOSITORY_SNAPSHOT': None,
+            'POSTER_CACHE_FILE': None,
+            'POSTER_WARMUP': False,
+            'POSTER_DIRECTORY': None,
+            'OMDB_URL': base_url,
+            'FRAGMENT_CACHE_BYTES': fragment_cache_bytes,
+            'PAGE_CACHE_BYTES': page_cache_bytes
+        })
+        client = app.test_client()
+        urls = page_urls(args.pages, args.size)
+        for url in urls:
+            client.get(url)
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for url in urls:
+                client.get(url)
+        elapsed = (time.perf_counter() - start) / (args.repeat * len(urls))
+
+        caches = (fragment_cache.cache_instance, fragment_cache.page_cache_instance)
+        hits = [cache.stats['hits'] if cache is not None else 0 for cache in caches]
+        print(f"{name:<24} {elapsed * 1e3:>12.2f} {hits[0]:>14} {hits[1]:>10}")
+
+    server.shutdown()
+    server.server_close()
+
+
+if __name__ == '__main__':
+    main()
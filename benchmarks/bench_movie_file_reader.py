@@ -0,0 +1,74 @@
+"""Scaling benchmark for MovieFileCSVReader.read_csv_file.
+
+Run from the CS235Flix directory:
+
+    $ python -m benchmarks.bench_movie_file_reader --max-rows 500000
+
+Synthetic movie files are generated with the same columns as Data1000Movies.csv. Time per row should stay flat as
+the number of rows grows.
+"""
+import argparse
+import csv
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from movie_app.datafilereaders import MovieFileCSVReader
+
+FIELD_NAMES = ['Rank', 'Title', 'Genre', 'Description', 'Director', 'Actors', 'Year', 'Runtime (Minutes)', 'Rating',
+               'Votes', 'Revenue (Millions)', 'Metascore']
+GENRES = ['Action', 'Adventure', 'Animation', 'Biography', 'Comedy', 'Crime', 'Drama', 'Family', 'Fantasy',
+          'History', 'Horror', 'Music', 'Musical', 'Mystery', 'Romance', 'Sci-Fi', 'Sport', 'Thriller', 'War',
+          'Western']
+
+
+def write_movie_file(file_name: str, rows: int, seed: int = 235):
+    rng = random.Random(seed)
+    actor_pool = max(rows // 2, 4)
+    director_pool = max(rows // 3, 1)
+
+    with open(file_name, mode='w', encoding='utf-8', newline='') as csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames=FIELD_NAMES)
+        writer.writeheader()
+
+        for rank in range(1, rows + 1):
+            writer.writerow({
+                'Rank': rank,
+                'Title': f"Movie {rank}",
+                'Genre': ','.join(rng.sample(GENRES, rng.randint(1, 3))),
+                'Description': f"Description of movie {rank}.",
+                'Director': f"Director {rng.randrange(director_pool)}",
+                'Actors': ', '.join(f"Actor {a}" for a in rng.sample(range(actor_pool), 4)),
+                'Year': rng.randint(2006, 2016),
+                'Runtime (Minutes)': rng.randint(66, 191),
+                'Rating': round(rng.uniform(1.9, 9.0), 1),
+                'Votes': rng.randint(61, 1791916),
+                'Revenue (Millions)': round(rng.uniform(0, 936.63), 2),
+                'Metascore': rng.randint(11, 100)
+            })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--max-rows', type=int, default=500000)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'seconds':>10} {'us/row':>10}")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        sizes = [rows for rows in (1000, 10000, 100000) if rows < args.max_rows] + [args.max_rows]
+
+        for rows in sizes:
+            file_name = str(Path(temp_dir).joinpath(f"movies_{rows}.csv"))
+            write_movie_file(file_name, rows)
+
+            reader = MovieFileCSVReader(file_name)
+            start = time.perf_counter()
+            reader.read_csv_file()
+            elapsed = time.perf_counter() - start
+
+            print(f"{rows:>10} {elapsed:>10.2f} {elapsed / rows * 1e6:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
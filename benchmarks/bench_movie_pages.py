@@ -0,0 +1,57 @@
+"""Benchmark for paging through the Movies of a genre.
+
+Run from the CS235Flix directory:
+
+    $ python -m benchmarks.bench_movie_pages --rows 100000
+
+Times finding the first, a middle and the last page of the Movies in one and in two genres, by slicing the full
+list of ranks as the browse pages once did, and with cursors from MemoryRepository.get_movie_ranks_page.
+"""
+import argparse
+import tempfile
+import timeit
+from pathlib import Path
+
+from benchmarks.bench_movie_file_reader import write_movie_file
+from benchmarks.bench_movie_queries import load_repository
+from movie_app.domainmodel import Genre
+
+MOVIES_PER_PAGE = 3
+GENRE_LISTS = ([Genre('Drama')], [Genre('Drama'), Genre('Comedy')])
+
+
+def sliced_page(repo, genre_list, position: int):
+    movie_ranks = repo.get_movie_ranks_by_genres(genre_list)
+    return movie_ranks[position:position + MOVIES_PER_PAGE], len(movie_ranks)
+
+
+def cursor_page(repo, genre_list, anchor: int):
+    return repo.get_movie_ranks_page('genre', genre_list, anchor, quantity=MOVIES_PER_PAGE)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_name = str(Path(temp_dir, f"movies_{args.rows}.csv"))
+        write_movie_file(file_name, args.rows)
+        repo = load_repository(file_name, use_movie_columns=False)
+
+    print(f"{'genres':>16} {'page':>8} {'sliced':>12} {'cursor':>12}")
+    for genre_list in GENRE_LISTS:
+        movie_ranks = repo.get_movie_ranks_by_genres(genre_list)
+        for name, position in (('first', 0), ('middle', len(movie_ranks) // 2), ('last', len(movie_ranks) - 3)):
+            # The cursor of a page names the Movie before it
+            anchor = movie_ranks[position - 1] if position > 0 else None
+            assert cursor_page(repo, genre_list, anchor) == sliced_page(repo, genre_list, position)
+
+            timings = [min(timeit.repeat(lambda: sliced_page(repo, genre_list, position), number=10, repeat=3)),
+                       min(timeit.repeat(lambda: cursor_page(repo, genre_list, anchor), number=10, repeat=3))]
+            genre_names = '/'.join(genre.genre_name for genre in genre_list)
+            print(f"{genre_names:>16} {name:>8} " + ' '.join(f"{timing * 1e2:>10.3f}ms" for timing in timings))
+
+
+if __name__ == '__main__':
+    main()
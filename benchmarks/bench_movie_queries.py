@@ -0,0 +1,68 @@
+"""Benchmark for whole-catalogue MemoryRepository queries.
+
+Run from the CS235Flix directory:
+
+    $ python -m benchmarks.bench_movie_queries --max-rows 1000000
+
+Times "movies from 2010 to 2016 rated above 7, sorted by revenue" as a scan over Movie objects, from the range
+indexes, and from the NumPy movie columns when NumPy is installed.
+"""
+import argparse
+import tempfile
+import timeit
+from pathlib import Path
+
+from benchmarks.bench_movie_file_reader import write_movie_file
+from movie_app.adapters.memory_repository import MemoryRepository
+from movie_app.adapters.movie_columns import HAS_NUMPY
+from movie_app.adapters.range_index import RangePredicate
+from movie_app.datafilereaders import MovieFileCSVReader
+
+PREDICATES = [RangePredicate('release_year', 2010, 2016),
+              RangePredicate('external_rating', minimum=7, include_minimum=False)]
+
+
+def load_repository(file_name: str, use_movie_columns: bool) -> MemoryRepository:
+    repo = MemoryRepository(use_movie_columns=use_movie_columns)
+    repo.set_movie_file_csv_reader(MovieFileCSVReader(file_name))
+    repo.load_movie_dataset()
+    return repo
+
+
+def scan_movies(repo: MemoryRepository):
+    movies = [movie for movie in repo.get_movies_by_rank(range(1, repo.get_number_of_movies() + 1))
+              if all(predicate.matches(getattr(movie, predicate.attribute)) for predicate in PREDICATES)]
+    return sorted(movies, key=lambda movie: -(movie.revenue_millions or 0))
+
+
+def query_repository(repo: MemoryRepository):
+    return repo.sort_movie_ranks(repo.get_movie_ranks_by_ranges(PREDICATES), 'revenue_millions', descending=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--max-rows', type=int, default=1000000)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'object scan':>12} {'indexes':>12} {'columns':>12}")
+    rows = 1000
+    with tempfile.TemporaryDirectory() as temp_dir:
+        while rows <= args.max_rows:
+            file_name = str(Path(temp_dir, f"movies_{rows}.csv"))
+            write_movie_file(file_name, rows)
+
+            indexed_repo = load_repository(file_name, use_movie_columns=False)
+            timings = [min(timeit.repeat(lambda: scan_movies(indexed_repo), number=1, repeat=3)),
+                       min(timeit.repeat(lambda: query_repository(indexed_repo), number=1, repeat=3))]
+
+            if HAS_NUMPY:
+                columnar_repo = load_repository(file_name, use_movie_columns=True)
+                assert query_repository(columnar_repo) == query_repository(indexed_repo)
+                timings.append(min(timeit.repeat(lambda: query_repository(columnar_repo), number=1, repeat=3)))
+
+            print(f"{rows:>10} " + ' '.join(f"{timing * 1e3:>10.2f}ms" for timing in timings))
+            rows *= 10
+
+
+if __name__ == '__main__':
+    main()
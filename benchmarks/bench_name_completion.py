@@ -0,0 +1,63 @@
+"""Benchmark for actor name completion.
+
+Run from the CS235Flix directory:
+
+    $ python -m benchmarks.bench_name_completion --max-names 1000000
+
+Synthetic names are indexed with Zipf-like film counts. Completing a prefix should take well under a millisecond
+at any catalogue size: prefixes matching few names are ranked directly, and those matching many are answered from
+the completion cache after their first lookup.
+"""
+import argparse
+import random
+import time
+import timeit
+
+from movie_app.adapters.frequency_counter import FrequencyCounter
+from movie_app.adapters.prefix_index import PrefixIndex
+
+SYLLABLES = ['ka', 'lo', 'mi', 'ne', 'ru', 'sa', 'ti', 'vo', 'ze', 'bar', 'den', 'gal', 'hon', 'kit', 'mor', 'pel']
+
+
+def generate_names(count: int, seed: int = 235):
+    rng = random.Random(seed)
+    for i in range(count):
+        first = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 3))).title()
+        last = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).title()
+        yield f"{first} {last} {i}", max(1, int(100 / (i + 1) ** 0.5))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--max-names', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    prefixes = {'one letter': 'k', 'two letters': 'ka', 'first name': 'kalo', 'first and last': 'kalo mi'}
+    print(f"{'names':>10} {'build':>9} " + ' '.join(f"{name:>15}" for name in prefixes.keys()))
+    counter = FrequencyCounter()
+    prefix_index = PrefixIndex(counter)
+    names = generate_names(args.max_names)
+    count = 0
+    size = 10000
+
+    while size <= args.max_names:
+        start = time.perf_counter()
+        for name, film_count in names:
+            prefix_index.add(name, name)
+            for _ in range(film_count):
+                counter.increment(name)
+            count += 1
+            if count == size:
+                break
+        prefix_index.complete('a', 10)
+        build_seconds = time.perf_counter() - start
+
+        timings = [min(timeit.repeat(lambda: prefix_index.complete(prefix, 10), number=1, repeat=args.repeat))
+                   for prefix in prefixes.values()]
+        print(f"{count:>10} {build_seconds:>8.1f}s " + ' '.join(f"{timing * 1e3:>13.3f}ms" for timing in timings))
+        size *= 10
+
+
+if __name__ == '__main__':
+    main()
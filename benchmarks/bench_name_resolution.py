@@ -0,0 +1,70 @@
+"""Benchmark for resolving misspelt actor names.
+
+Run from the CS235Flix directory:
+
+    $ python -m benchmarks.bench_name_resolution --max-names 1000000
+
+Synthetic names are made of a first and a last name, so like real names they share words with many others. Each
+query is an indexed name with its case changed, resolved to that name as a search submission is, or with one or two
+typos, for which five "did you mean" suggestions are looked up.
+"""
+import argparse
+import random
+import time
+import timeit
+
+from benchmarks.bench_name_completion import SYLLABLES
+from movie_app.adapters.frequency_counter import FrequencyCounter
+from movie_app.adapters.name_resolver import NameResolver
+
+
+def generate_names(count: int, seed: int = 235):
+    rng = random.Random(seed)
+    for _ in range(count):
+        first = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 3))).title()
+        last = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).title()
+        yield f"{first} {last}"
+
+
+def misspell(name: str, typos: int, rng: random.Random) -> str:
+    for _ in range(typos):
+        i = rng.randrange(1, len(name) - 1)
+        name = name[:i] + name[i + 1] + name[i] + name[i + 2:] if rng.random() < 0.5 else name[:i] + name[i + 1:]
+    return name
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--max-names', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(235)
+    queries = {'upper case': (lambda name: name.upper(), 1), 'one typo': (lambda name: misspell(name, 1, rng), 5),
+               'two typos': (lambda name: misspell(name, 2, rng), 5)}
+    print(f"{'names':>10} {'build':>9} " + ' '.join(f"{name:>12}" for name in queries.keys()))
+    resolver = NameResolver(FrequencyCounter())
+    names = generate_names(args.max_names)
+    indexed_names = list()
+    size = 10000
+
+    while size <= args.max_names:
+        start = time.perf_counter()
+        for name in names:
+            resolver.add(name, len(indexed_names))
+            indexed_names.append(name)
+            if len(indexed_names) == size:
+                break
+        build_seconds = time.perf_counter() - start
+
+        timings = list()
+        for make_query, quantity in queries.values():
+            typed_names = [make_query(rng.choice(indexed_names)) for _ in range(args.repeat)]
+            timings.append(timeit.timeit(
+                lambda: [resolver.resolve(typed_name, quantity) for typed_name in typed_names], number=1) / args.repeat)
+        print(f"{size:>10} {build_seconds:>8.1f}s " + ' '.join(f"{timing * 1e3:>10.3f}ms" for timing in timings))
+        size *= 10
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""Load test of CS235Flix browse pages against a slow or failing OMDb.
+
+Run from the CS235Flix directory:
+
+    $ python -m benchmarks.bench_poster_degradation --latency 0.2 --pages 60 --concurrency 8
+
+A local OMDb stand-in server is started for each scenario, with an increasing share of failing and hanging requests.
+Browse pages are requested concurrently with an empty poster cache, and the report shows page latencies, the
+share of posters replaced by the placeholder, and the requests, retries and fast failures of the OMDb client.
+"""
+import argparse
+import time
+from concurrent import futures
+
+import movie_app.adapters.omdb_client as omdb_client
+import movie_app.adapters.poster_cache as poster_cache
+import movie_app.adapters.repository as repo
+from config import DataPaths
+from movie_app import create_app
+from movie_app.adapters.omdb_client import OMDbClient
+from movie_app.adapters.omdb_standin import StandInSettings, start_in_background
+from movie_app.adapters.poster_cache import PosterCache
+
+SCENARIOS = (
+    ('healthy', 0.0, 0.0),
+    ('10% failing', 0.1, 0.0),
+    ('50% failing', 0.5, 0.0),
+    ('5% hanging', 0.0, 0.05),
+    ('down', 1.0, 0.0),
+)
+
+
+def browse_page_urls(quantity: int):
+    urls = []
+    for genre in repo.repo_instance.get_genres():
+        movie_ranks = repo.repo_instance.get_movie_ranks_by_genres([genre])
+        for cursor in range(0, len(movie_ranks), 3):
+            urls.append(f"/movies_by_genres?genres={genre.genre_name}&cursor={cursor}")
+    return urls[:quantity]
+
+
+def percentile(values, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def run_scenario(app, urls, settings: StandInSettings, concurrency: int, args):
+    server, base_url = start_in_background(settings)
+    poster_cache.cache_instance = PosterCache()
+    omdb_client.client_instance = OMDbClient('benchmark', base_url=base_url,
+                                             connect_timeout_seconds=args.connect_timeout,
+                                             read_timeout_seconds=args.read_timeout)
+
+    def get_page(url):
+        with app.test_client() as client:
+            start = time.perf_counter()
+            response = client.get(url)
+            elapsed = time.perf_counter() - start
+        page = response.get_data(as_text=True)
+        return elapsed, page.count('<img'), page.count('poster_placeholder')
+
+    with futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(get_page, urls))
+
+    server.shutdown()
+    server.server_close()
+
+    latencies = [elapsed for elapsed, _, _ in results]
+    images = sum(count for _, count, _ in results)
+    placeholders = sum(count for _, _, count in results)
+    return latencies, placeholders / max(images, 1), omdb_client.client_instance.stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--latency', type=float, default=0.2, help='seconds added to every stand-in response')
+    parser.add_argument('--jitter', type=float, default=0.1)
+    parser.add_argument('--pages', type=int, default=60)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--deadline', type=float, default=1.5, help='POSTER_DEADLINE_SECONDS of the app')
+    parser.add_argument('--connect-timeout', type=float, default=1.0)
+    parser.add_argument('--read-timeout', type=float, default=2.0)
+    args = parser.parse_args()
+
+    app = create_app({
+        'TESTING': True,
+        'TEST_DATA_PATHS': DataPaths.PROD_DATA_PATHS,
+        'REPOSITORY_SNAPSHOT': None,
+        'POSTER_CACHE_FILE': None,
+        'POSTER_WARMUP': False,
+        'POSTER_DEADLINE_SECONDS': args.deadline
+    })
+    urls = browse_page_urls(args.pages)
+
+    print(f"{'scenario':<14} {'p50 s':>7} {'p95 s':>7} {'max s':>7} {'placeholders':>13} {'requests':>9} "
+          f"{'retries':>8} {'failures':>9} {'rejected':>9} {'circuit':>10}")
+
+    for name, failure_rate, hang_rate in SCENARIOS:
+        settings = StandInSettings(latency=args.latency, jitter=args.jitter, failure_rate=failure_rate,
+                                   hang_rate=hang_rate, hang_seconds=args.read_timeout * 5, seed=1)
+        latencies, placeholder_share, stats = run_scenario(app, urls, settings, args.concurrency, args)
+        print(f"{name:<14} {percentile(latencies, 0.5):>7.3f} {percentile(latencies, 0.95):>7.3f} "
+              f"{max(latencies):>7.3f} {placeholder_share:>12.0%} {stats['requests']:>9} {stats['retries']:>8} "
+              f"{stats['failures']:>9} {stats['rejected']:>9} {stats['circuit']:>10}")
+
+
+if __name__ == '__main__':
+    main()
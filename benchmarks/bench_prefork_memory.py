@@ -0,0 +1,92 @@
+"""Memory report for workers forked from a preloaded CS235Flix app.
+
+Run from the CS235Flix directory (Linux only):
+
+    $ python -m benchmarks.bench_prefork_memory --workers 4
+
+The app is created once, its heap is frozen and worker processes are forked from it, as gunicorn does with
+gunicorn.conf.py. Each worker then runs warm-up queries against the shared repository. The report shows how much of
+each worker's resident memory is still shared with the master, and how many pages each worker dirtied during warm-up.
+"""
+import argparse
+import os
+
+# Set before the app's configuration is imported, so create_app does not start the poster warm-up in the master and
+# its OMDb lookups do not change the memory being measured
+os.environ['POSTER_WARMUP_AFTER_FORK'] = 'True'
+
+import movie_app.adapters.repository as repo  # noqa: E402
+import movie_app.services.movie_services as services  # noqa: E402
+from movie_app import create_app  # noqa: E402
+from movie_app.prefork import freeze_preloaded_heap, memory_usage, format_memory_report  # noqa: E402
+
+
+def warm_up(rounds: int):
+    """ Runs the repository queries behind the home and browse pages. """
+    repository = repo.repo_instance
+
+    for _ in range(rounds):
+        services.get_most_common_director_names(10, repository)
+        services.get_most_common_actor_names(10, repository)
+        services.get_most_common_genre_names(10, repository)
+
+        for genre in repository.get_genres():
+            movie_ranks = services.get_movie_ranks_by_genres([genre], repository)
+            for movie in services.get_movies_by_rank(movie_ranks, repository):
+                repository.get_reviews_for_movie(movie)
+                services.get_movie_ranks_by_director(movie.director, repository)
+                services.get_movie_ranks_by_actors(list(movie.actors), repository)
+
+
+def run_worker(ready_fd: int, release_fd: int, rounds: int):
+    before = memory_usage()
+    warm_up(rounds)
+    os.write(ready_fd, f"{before['private_dirty']}\n".encode())
+
+    # Wait for the master to measure this worker before exiting
+    os.read(release_fd, 1)
+    os._exit(0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--no-freeze', action='store_true', help='fork without freezing the preloaded heap')
+    args = parser.parse_args()
+
+    create_app()
+    if not args.no_freeze:
+        freeze_preloaded_heap()
+
+    usage_by_process = {'master': memory_usage()}
+    workers = []
+
+    for _ in range(args.workers):
+        ready_read, ready_write = os.pipe()
+        release_read, release_write = os.pipe()
+        pid = os.fork()
+
+        if pid == 0:
+            run_worker(ready_write, release_read, args.rounds)
+
+        workers.append((pid, ready_read, release_write))
+
+    dirtied_by_worker = dict()
+    for pid, ready_read, release_write in workers:
+        private_dirty_before = int(os.read(ready_read, 64).decode())
+        usage_by_process[f"worker {pid}"] = usage = memory_usage(pid)
+        dirtied_by_worker[pid] = usage['private_dirty'] - private_dirty_before
+
+    for pid, ready_read, release_write in workers:
+        os.write(release_write, b'x')
+        os.waitpid(pid, 0)
+
+    print(format_memory_report(usage_by_process))
+    print()
+    for pid, dirtied in dirtied_by_worker.items():
+        print(f"worker {pid} dirtied {dirtied} kB of shared pages during warm-up")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""Benchmark for the MemoryRepository cache of query results.
+
+Run from the CS235Flix directory:
+
+    $ python -m benchmarks.bench_query_cache --rows 100000
+
+Times popular browse queries without the cache, and again once they are cached, then adds a Movie and shows which
+cached results it evicts.
+"""
+import argparse
+import tempfile
+import timeit
+from pathlib import Path
+
+from benchmarks.bench_movie_file_reader import write_movie_file
+from movie_app.adapters.memory_repository import MemoryRepository
+from movie_app.adapters.movie_query import parse_movie_query
+from movie_app.adapters.range_index import RangePredicate
+from movie_app.datafilereaders import MovieFileCSVReader
+from movie_app.domainmodel import Genre, Movie
+
+QUERIES = {
+    'Drama and Comedy': lambda repo: repo.get_movie_ranks_by_genres([Genre('Drama'), Genre('Comedy')]),
+    'metascore >= 80': lambda repo: repo.get_movie_ranks_by_ranges([RangePredicate('metascore', minimum=80)]),
+    'Action not Horror': lambda repo: repo.get_movie_ranks_by_query(
+        parse_movie_query('genre:Action NOT genre:Horror'), 'external_rating', True),
+    'colleagues': lambda repo: repo.get_actors_by_colleagues(repo.get_most_common_actors(1)),
+}
+
+
+def load_repository(file_name: str, query_cache_bytes: int) -> MemoryRepository:
+    repo = MemoryRepository(query_cache_bytes=query_cache_bytes)
+    repo.set_movie_file_csv_reader(MovieFileCSVReader(file_name))
+    repo.load_movie_dataset()
+    return repo
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_name = str(Path(temp_dir, f"movies_{args.rows}.csv"))
+        write_movie_file(file_name, args.rows)
+        uncached_repo = load_repository(file_name, query_cache_bytes=0)
+        cached_repo = load_repository(file_name, query_cache_bytes=64 * 1024 * 1024)
+
+    print(f"{'query':>20} {'uncached':>12} {'cached':>12}")
+    for name, query in QUERIES.items():
+        assert query(cached_repo) == query(uncached_repo)
+        timings = [min(timeit.repeat(lambda: query(uncached_repo), number=1, repeat=3)),
+                   min(timeit.repeat(lambda: query(cached_repo), number=100, repeat=3)) / 100]
+        print(f"{name:>20} " + ' '.join(f"{timing * 1e3:>10.3f}ms" for timing in timings))
+
+    movie = Movie('Benchmark', 2020)
+    movie.rank = args.rows + 1
+    movie.add_genre(Genre('Western'))
+    cached_repo.add_movie(movie)
+    print(f"\nAfter adding a Western: {cached_repo.get_query_cache_stats()}")
+
+
+if __name__ == '__main__':
+    main()
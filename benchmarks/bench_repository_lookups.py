@@ -0,0 +1,70 @@
+"""Benchmark for MemoryRepository user and watchlist lookups.
+
+Run from the CS235Flix directory:
+
+    $ python -m benchmarks.bench_repository_lookups --max-users 1000000
+
+Lookup time should stay flat as the number of stored Users grows.
+"""
+import argparse
+import random
+import timeit
+
+from movie_app.adapters.memory_repository import MemoryRepository
+from movie_app.domainmodel import User
+
+
+def populate_users(repo: MemoryRepository, start: int, stop: int):
+    for i in range(start, stop):
+        user = User(f"user{i}", "pw12345")
+        repo.add_user(user)
+        repo.add_watchlist(user.watchlist)
+
+
+def time_lookups(repo: MemoryRepository, user_count: int, lookups: int) -> dict:
+    names = [f"user{random.randrange(user_count)}" for _ in range(lookups)]
+    ids = [repo.get_user(name).id for name in names]
+
+    def by_name():
+        for name in names:
+            repo.get_user(name)
+
+    def by_id():
+        for user_id in ids:
+            repo.get_user_by_id(user_id)
+
+    def watchlist_by_id():
+        for user_id in ids:
+            repo.get_watchlist_by_user_id(user_id)
+
+    return {
+        'get_user': min(timeit.repeat(by_name, number=1, repeat=5)) / lookups,
+        'get_user_by_id': min(timeit.repeat(by_id, number=1, repeat=5)) / lookups,
+        'get_watchlist_by_user_id': min(timeit.repeat(watchlist_by_id, number=1, repeat=5)) / lookups,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--max-users', type=int, default=1000000)
+    parser.add_argument('--lookups', type=int, default=10000)
+    args = parser.parse_args()
+
+    User.reset_id()
+    repo = MemoryRepository()
+    user_count = 0
+    size = 1000
+
+    print(f"{'users':>10} {'get_user':>12} {'get_user_by_id':>16} {'get_watchlist_by_user_id':>26}")
+    while size <= args.max_users:
+        populate_users(repo, user_count, size)
+        user_count = size
+
+        timings = time_lookups(repo, user_count, args.lookups)
+        print(f"{user_count:>10} {timings['get_user'] * 1e9:>10.0f}ns {timings['get_user_by_id'] * 1e9:>14.0f}ns "
+              f"{timings['get_watchlist_by_user_id'] * 1e9:>24.0f}ns")
+        size *= 10
+
+
+if __name__ == '__main__':
+    main()
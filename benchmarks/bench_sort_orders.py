@@ -0,0 +1,61 @@
+"""Benchmark for sorting browse results with MemoryRepository.sort_movie_ranks.
+
+Run from the CS235Flix directory:
+
+    $ python -m benchmarks.bench_sort_orders --rows 100000
+
+Times ordering every 100th, 10th and 2nd Movie of the catalogue by descending rating, as a sort over Movie objects,
+as a NumPy sort of the movie columns, and by picking the ranks out of the presorted orders the columns keep.
+"""
+import argparse
+import tempfile
+import timeit
+from pathlib import Path
+
+import movie_app.adapters.movie_columns as movie_columns
+from benchmarks.bench_movie_file_reader import write_movie_file
+from benchmarks.bench_movie_queries import load_repository
+
+STEPS = (100, 10, 2)
+
+
+def sort_ranks(repo, rank_list, merge_ratio: int):
+    # A merge ratio of 0 never picks ranks out of the presorted orders, so the columns sort them instead
+    default_merge_ratio, movie_columns.MERGE_RATIO = movie_columns.MERGE_RATIO, merge_ratio
+    try:
+        return repo.sort_movie_ranks(rank_list, 'external_rating', descending=True)
+    finally:
+        movie_columns.MERGE_RATIO = default_merge_ratio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_name = str(Path(temp_dir, f"movies_{args.rows}.csv"))
+        write_movie_file(file_name, args.rows)
+        indexed_repo = load_repository(file_name, use_movie_columns=False)
+        if not movie_columns.HAS_NUMPY:
+            print('NumPy is not installed, so only the sort over Movie objects is timed')
+        columnar_repo = load_repository(file_name, use_movie_columns=True) if movie_columns.HAS_NUMPY else None
+
+    print(f"{'ranks':>10} {'object sort':>12} {'columns':>12} {'presorted':>12}")
+    for step in STEPS:
+        rank_list = list(range(1, args.rows + 1, step))
+        timings = [min(timeit.repeat(lambda: sort_ranks(indexed_repo, rank_list, 0), number=1, repeat=3))]
+
+        if columnar_repo is not None:
+            expected = sort_ranks(indexed_repo, rank_list, 0)
+            assert sort_ranks(columnar_repo, rank_list, 0) == expected
+            assert sort_ranks(columnar_repo, rank_list, step) == expected
+            timings.append(min(timeit.repeat(lambda: sort_ranks(columnar_repo, rank_list, 0), number=1, repeat=3)))
+            timings.append(min(timeit.repeat(lambda: sort_ranks(columnar_repo, rank_list, step), number=1,
+                                             repeat=3)))
+
+        print(f"{len(rank_list):>10} " + ' '.join(f"{timing * 1e3:>10.2f}ms" for timing in timings))
+
+
+if __name__ == '__main__':
+    main()
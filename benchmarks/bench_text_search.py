@@ -0,0 +1,76 @@
+"""Benchmark for full-text search over movie titles and descriptions.
+
+Run from the CS235Flix directory:
+
+    $ python -m benchmarks.bench_text_search --max-documents 1000000
+
+Synthetic titles and descriptions are drawn from a vocabulary with a Zipf-like word distribution, as in natural
+text. Query latency should grow with the number of matching Movies rather than with the size of the catalogue.
+"""
+import argparse
+import random
+import time
+import timeit
+from itertools import accumulate
+
+from movie_app.adapters.text_index import TextIndex
+
+SYLLABLES = ['ka', 'lo', 'mi', 'ne', 'ru', 'sa', 'ti', 'vo', 'ze', 'bar', 'den', 'gal', 'hon', 'kit', 'mor', 'pel']
+
+
+def make_vocabulary(size: int, rng: random.Random):
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def generate_documents(count: int, seed: int = 235):
+    rng = random.Random(seed)
+    vocabulary = make_vocabulary(50000, rng)
+    cumulative_weights = list(accumulate(1 / (i + 1) for i in range(len(vocabulary))))
+
+    for rank in range(1, count + 1):
+        title = ' '.join(rng.choices(vocabulary, cum_weights=cumulative_weights, k=rng.randint(1, 4)))
+        description = ' '.join(rng.choices(vocabulary, cum_weights=cumulative_weights, k=rng.randint(12, 30)))
+        yield rank, title, description
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--max-documents', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    vocabulary = make_vocabulary(50000, random.Random(235))
+    queries = {
+        'common word': vocabulary[0],
+        'rare word': vocabulary[20000],
+        'common + rare': f"{vocabulary[0]} {vocabulary[20000]}",
+        'two common': f"{vocabulary[0]} {vocabulary[1]}",
+        'phrase': f'"{vocabulary[0]} {vocabulary[1]}"'
+    }
+
+    print(f"{'documents':>10} {'build':>9} " + ' '.join(f"{name:>14}" for name in queries.keys()))
+    text_index = TextIndex()
+    documents = generate_documents(args.max_documents)
+    count = 0
+    size = 10000
+
+    while size <= args.max_documents:
+        start = time.perf_counter()
+        for rank, title, description in documents:
+            text_index.add(rank, title, description)
+            count += 1
+            if count == size:
+                break
+        build_seconds = time.perf_counter() - start
+
+        timings = [min(timeit.repeat(lambda: text_index.search(query, 0, 10), number=1, repeat=args.repeat))
+                   for query in queries.values()]
+        print(f"{count:>10} {build_seconds:>8.1f}s " + ' '.join(f"{timing * 1e3:>12.2f}ms" for timing in timings))
+        size *= 10
+
+
+if __name__ == '__main__':
+    main()
@@ -10,6 +10,17 @@ class Config:
     FLASK_ENV = environ.get('FLASK_ENV')
     SECRET_KEY = environ.get('SECRET_KEY')
     OMDB_KEY = environ.get('OMDB_KEY')
+    OMDB_URL = environ.get('OMDB_URL')
+    OMDB_CONNECT_TIMEOUT_SECONDS = float(environ.get('OMDB_CONNECT_TIMEOUT_SECONDS', 1.0))
+    OMDB_READ_TIMEOUT_SECONDS = float(environ.get('OMDB_READ_TIMEOUT_SECONDS', 2.0))
+    REPOSITORY_SNAPSHOT = environ.get('REPOSITORY_SNAPSHOT')
+    POSTER_CACHE_FILE = environ.get('POSTER_CACHE_FILE')
+    POSTER_DEADLINE_SECONDS = float(environ.get('POSTER_DEADLINE_SECONDS', 1.5))
+    POSTER_WARMUP = environ.get('POSTER_WARMUP', 'False') == 'True'
+    POSTER_WARMUP_AFTER_FORK = environ.get('POSTER_WARMUP_AFTER_FORK', 'False') == 'True'
+    POSTER_DIRECTORY = environ.get('POSTER_DIRECTORY')
+    FRAGMENT_CACHE_BYTES = int(environ.get('FRAGMENT_CACHE_BYTES', 16 * 1024 * 1024))
+    PAGE_CACHE_BYTES = int(environ.get('PAGE_CACHE_BYTES', 0))
 
 
 class DataPaths:
@@ -22,7 +33,8 @@ class DataPaths:
         "users": str(PROD_DATA_BASE_PATH.joinpath('users.csv')),
         "reviews": str(PROD_DATA_BASE_PATH.joinpath('reviews.csv')),
         "watch_lists": str(PROD_DATA_BASE_PATH.joinpath('watch_lists.csv')),
-        "watching_sims": str(PROD_DATA_BASE_PATH.joinpath('watching_sims.csv'))
+        "watching_sims": str(PROD_DATA_BASE_PATH.joinpath('watching_sims.csv')),
+        "posters": str(PROD_DATA_BASE_PATH.joinpath('posters.csv'))
     }
 
     TEST_DATA_PATHS = {
@@ -30,6 +42,7 @@ class DataPaths:
         "users": str(TEST_DATA_BASE_PATH.joinpath('users.csv')),
         "reviews": str(TEST_DATA_BASE_PATH.joinpath('reviews.csv')),
         "watch_lists": str(TEST_DATA_BASE_PATH.joinpath('watch_lists.csv')),
-        "watching_sims": str(TEST_DATA_BASE_PATH.joinpath('watching_sims.csv'))
+        "watching_sims": str(TEST_DATA_BASE_PATH.joinpath('watching_sims.csv')),
+        "posters": str(TEST_DATA_BASE_PATH.joinpath('posters.csv'))
     }
 
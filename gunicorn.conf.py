@@ -0,0 +1,41 @@
+"""Gunicorn settings for serving CS235Flix from pre-forked workers.
+
+The app, including its populated repository, is created once in the master process and shared by the workers.
+
+    $ gunicorn --config gunicorn.conf.py wsgi:app
+"""
+import os
+import tempfile
+
+# Set before the app's configuration is imported, so create_app leaves the poster warm-up to the forked workers
+os.environ.setdefault('POSTER_WARMUP_AFTER_FORK', 'True')
+
+from movie_app.prefork import freeze_preloaded_heap, acquire_process_lock  # noqa: E402
+from movie_app.adapters.poster_enrichment import start_warm_up  # noqa: E402
+
+bind = os.environ.get('BIND', 'localhost:5627')
+workers = int(os.environ.get('WEB_CONCURRENCY', 4))
+preload_app = True
+
+
+def pre_fork(server, worker):
+    # Keep the garbage collector in each worker away from the repository built by the master.
+    freeze_preloaded_heap()
+
+
+def warm_up_lock_path(server) -> str:
+    return os.path.join(tempfile.gettempdir(), f'cs235flix-poster-warm-up-{server.pid}.lock')
+
+
+def post_fork(server, worker):
+    # A thread started in the master would not be copied into the workers, so the warm-up runs in the one worker
+    # holding the lock, rather than repeating its OMDb lookups in every worker.
+    if acquire_process_lock(warm_up_lock_path(server)):
+        start_warm_up()
+
+
+def on_exit(server):
+    try:
+        os.remove(warm_up_lock_path(server))
+    except FileNotFoundError:
+        pass
@@ -3,7 +3,18 @@ from flask import Flask
 from config import DataPaths
 
 import movie_app.adapters.repository as repo
+import movie_app.adapters.poster_cache as poster_cache
+import movie_app.adapters.omdb_client as omdb_client
+import movie_app.adapters.poster_store as poster_store
+import movie_app.adapters.fragment_cache as fragment_cache
+import movie_app.adapters.poster_enrichment as poster_enrichment
+from movie_app.adapters.poster_cache import PosterCache
+from movie_app.adapters.omdb_client import OMDbClient
+from movie_app.adapters.poster_store import PosterStore
+from movie_app.adapters.fragment_cache import FragmentCache
+from movie_app.adapters.poster_enrichment import PosterWarmUp
 from movie_app.adapters.memory_repository import MemoryRepository
+from movie_app.adapters.snapshot import load_or_populate
 
 
 def create_app(test_config=None):
@@ -22,17 +33,52 @@ def create_app(test_config=None):
         data_path_dict = app.config['TEST_DATA_PATHS']
 
     # Create the MemoryRepository implementation for a memory-based repository.
-    repo.repo_instance = MemoryRepository()
-    repo.repo_instance.populate(data_path_dict)
+    # When a snapshot file is configured, it is loaded instead of parsing the CSV data files if it is up to date.
+    if app.config.get('REPOSITORY_SNAPSHOT'):
+        repo.repo_instance = load_or_populate(data_path_dict, app.config['REPOSITORY_SNAPSHOT'])
+    else:
+        repo.repo_instance = MemoryRepository()
+        repo.repo_instance.populate(data_path_dict)
+
+    # Cache poster URLs fetched from OMDb, persisting them to a file when one is configured.
+    poster_cache.cache_instance = PosterCache(file_name=app.config.get('POSTER_CACHE_FILE'))
+    omdb_client.client_instance = OMDbClient(
+        app.config.get('OMDB_KEY'),
+        base_url=app.config.get('OMDB_URL') or omdb_client.OMDB_URL,
+        connect_timeout_seconds=app.config.get('OMDB_CONNECT_TIMEOUT_SECONDS', 1.0),
+        read_timeout_seconds=app.config.get('OMDB_READ_TIMEOUT_SECONDS', 2.0)
+    )
+
+    # Serve local copies of posters, along with thumbnails, when a poster directory is configured.
+    poster_store.store_instance = None
+    if app.config.get('POSTER_DIRECTORY'):
+        poster_store.store_instance = PosterStore(app.config['POSTER_DIRECTORY'])
+
+    # Cache the rendered fragments of pages, such as Movie cards. Whole pages shown to anonymous users are only cached
+    # when given a memory budget of their own.
+    fragment_cache_bytes = app.config.get('FRAGMENT_CACHE_BYTES', 0)
+    page_cache_bytes = app.config.get('PAGE_CACHE_BYTES', 0)
+    fragment_cache.cache_instance = FragmentCache(fragment_cache_bytes) if fragment_cache_bytes > 0 else None
+    fragment_cache.page_cache_instance = FragmentCache(page_cache_bytes) if page_cache_bytes > 0 else None
+
+    # Resolve the posters missing from the poster data file in the background, so later pages find them cached.
+    # When the app is preloaded by a pre-fork server, the thread is started in one worker after it is forked instead.
+    poster_enrichment.warm_up_instance = None
+    if app.config.get('POSTER_WARMUP'):
+        poster_enrichment.warm_up_instance = PosterWarmUp(repo.repo_instance, omdb_client.client_instance,
+                                                          poster_cache.cache_instance)
+        if not app.config.get('POSTER_WARMUP_AFTER_FORK'):
+            poster_enrichment.start_warm_up()
 
     # Build the application
     with app.app_context():
         # Register blueprints
-        from .blueprints import home, movies, utilities, authentication, user_activity
+        from .blueprints import home, movies, utilities, authentication, user_activity, posters
         app.register_blueprint(home.home_blueprint)
         app.register_blueprint(movies.movie_blueprint)
         app.register_blueprint(utilities.utilities_blueprint)
         app.register_blueprint(authentication.authentication_blueprint)
         app.register_blueprint(user_activity.user_activity_blueprint)
+        app.register_blueprint(posters.posters_blueprint)
 
     return app
@@ -72,5 +72,5 @@ class MovieWatchingSimulation:
             review.user.remove_review(review)
 
     @staticmethod
-    def reset_id():
-        MovieWatchingSimulation.__watching_sim_id = 1
+    def reset_id(next_id: int = 1):
+        MovieWatchingSimulation.__watching_sim_id = next_id
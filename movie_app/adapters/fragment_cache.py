@@ -0,0 +1,27 @@
+from typing import Tuple
+
+from movie_app.adapters.query_cache import QueryCache
+
+# Caches of rendered HTML, the fragments of every page and, optionally, the whole pages shown to anonymous users
+cache_instance = None
+page_cache_instance = None
+
+
+def movie_tag(movie_rank: int) -> Tuple[str, int]:
+    """ Returns the tag of the fragments and pages showing the Movie with the rank. """
+    return 'movie', movie_rank
+
+
+class FragmentCache(QueryCache):
+    """ LRU cache of rendered HTML, such as a Movie's card on a browse page, within a memory budget.
+
+    Each fragment is tagged with the Movies it shows, so a new Review of a Movie evicts only the fragments and pages
+    showing that Movie.
+    """
+
+    def copy(self, result: str) -> str:
+        # Rendered HTML is an immutable string, so is shared rather than copied
+        return result
+
+    def invalidate_movie(self, movie_rank: int):
+        self.invalidate([movie_tag(movie_rank)])
@@ -0,0 +1,77 @@
+from typing import Dict, Hashable, List
+
+
+class FrequencyCounter:
+    """ Counts occurrences of items and keeps them bucketed by count.
+
+    Each bucket is an insertion-ordered dictionary, so incrementing an item moves it between buckets in constant
+    time. The non-empty buckets are linked in count order, so reading the most common items only visits the occupied
+    buckets at the top, however far apart their counts are. Items with equal counts are ordered by when they reached
+    that count, which keeps the ordering deterministic for a given sequence of increments.
+    """
+
+    def __init__(self):
+        self.__counts: Dict[Hashable, int] = dict()
+        self.__buckets: Dict[int, Dict[Hashable, None]] = dict()
+        # The next lower and higher counts with a non-empty bucket, with 0 linked below the lowest one
+        self.__lower_counts: Dict[int, int] = dict()
+        self.__higher_counts: Dict[int, int] = dict()
+        self.__max_count = 0
+        self.__total = 0
+
+    def __len__(self) -> int:
+        return len(self.__counts)
+
+    def __contains__(self, item) -> bool:
+        return item in self.__counts
+
+    def count(self, item: Hashable) -> int:
+        return self.__counts.get(item, 0)
+
+    @property
+    def total(self) -> int:
+        """ Returns the number of increments so far, which changes whenever any count does. """
+        return self.__total
+
+    def increment(self, item: Hashable):
+        count = self.__counts.get(item, 0)
+        new_count = count + 1
+
+        if new_count not in self.__buckets:
+            # Counts only go up by one, so the new bucket is linked directly above the item's current count
+            higher_count = self.__higher_counts.get(count)
+            self.__link(count, new_count)
+            if higher_count is not None:
+                self.__link(new_count, higher_count)
+        self.__buckets.setdefault(new_count, dict())[item] = None
+
+        if count > 0:
+            bucket = self.__buckets[count]
+            del bucket[item]
+            if len(bucket) == 0:
+                del self.__buckets[count]
+                self.__link(self.__lower_counts.pop(count), self.__higher_counts.pop(count))
+
+        self.__total += 1
+        self.__counts[item] = new_count
+
+        if new_count > self.__max_count:
+            self.__max_count = new_count
+
+    def __link(self, lower_count: int, higher_count: int):
+        self.__higher_counts[lower_count] = higher_count
+        self.__lower_counts[higher_count] = lower_count
+
+    def most_common(self, quantity: int) -> List[Hashable]:
+        """ Returns up to the given quantity of items, most common first. """
+        most_common_items = list()
+        count = self.__max_count
+
+        while count > 0 and len(most_common_items) < quantity:
+            for item in self.__buckets[count]:
+                if len(most_common_items) == quantity:
+                    break
+                most_common_items.append(item)
+            count = self.__lower_counts[count]
+
+        return most_common_items
@@ -1,43 +1,185 @@
-from typing import List, Dict
+import uuid
+from bisect import bisect_left, bisect_right
+from functools import reduce
+from pathlib import Path
+from typing import Callable, List, Dict, Hashable, Optional, Tuple
 
 from movie_app.adapters.repository import AbstractRepository, RepositoryException
+from movie_app.adapters.frequency_counter import FrequencyCounter
+from movie_app.adapters.range_index import RangeIndex, RangePredicate, RANGE_ATTRIBUTES
+from movie_app.adapters.movie_columns import MovieColumns, HAS_NUMPY, MERGE_RATIO
+from movie_app.adapters.text_index import TextIndex
+from movie_app.adapters.movie_query import MovieQuery, QUERY_FIELDS, year_range
+from movie_app.adapters.name_resolver import NameResolver
+from movie_app.adapters.prefix_index import PrefixIndex, name_key
+from movie_app.adapters.query_cache import QueryCache
+from movie_app.adapters.rank_bitmap import RankBitmap
 from movie_app.domainmodel import Actor, Director, Genre, Movie, Review, User, WatchList
 from movie_app.datafilereaders import MovieFileCSVReader, UserFileCSVReader, ReviewFileCSVReader, \
-    WatchListFileCSVReader, WatchingSimFileCSVReader
+    WatchListFileCSVReader, WatchingSimFileCSVReader, PosterFileCSVReader
 from movie_app.activitysimulations import MovieWatchingSimulation
 
 
+# Range queries are answered with a vectorized scan of the movie columns, rather than from the indexes, unless an
+# index matches fewer than one in COLUMN_SCAN_RATIO Movies
+COLUMN_SCAN_RATIO = 32
+
+# Memory budget of the cache of query results
+QUERY_CACHE_BYTES = 32 * 1024 * 1024
+
+# Cached queries are tagged with the Actors and Genres they are about, e.g. ('genre', 'Horror'). Queries over the
+# whole catalogue, and over all Actors, are tagged with these.
+CATALOGUE_TAG = ('catalogue',)
+ACTORS_TAG = ('actors',)
+
+# Most selections of Movies, by the Actors, Genres or Director paged through by get_movie_ranks_page, kept between
+# the requests for their pages
+SELECTIONS_KEPT = 64
+
+
+def add_rank_to_postings(postings: Dict[Hashable, List[int]], key: Hashable, rank: int):
+    """ Inserts the rank into the sorted posting list stored under the given key. """
+    ranks = postings.setdefault(key, list())
+    pos = bisect_left(ranks, rank)
+
+    if pos == len(ranks) or ranks[pos] != rank:
+        ranks.insert(pos, rank)
+
+
+def posting_contains(ranks: List[int], rank: int) -> bool:
+    pos = bisect_left(ranks, rank)
+    return pos < len(ranks) and ranks[pos] == rank
+
+
+def intersect_postings(posting_lists: List[List[int]]) -> List[int]:
+    """ Returns the sorted ranks present in all of the given sorted posting lists.
+
+    The shortest posting list drives the intersection, so the cost is bounded by its length rather than by the
+    number of Movies in the repository.
+    """
+    if len(posting_lists) == 0:
+        return list()
+
+    posting_lists = sorted(posting_lists, key=len)
+    smallest, others = posting_lists[0], posting_lists[1:]
+
+    return [rank for rank in smallest if all(posting_contains(ranks, rank) for ranks in others)]
+
+
+def movie_key(title: str, release_year: int, normalize: bool = False) -> Tuple[str, int]:
+    """ Returns the composite (title, release year) key used to index Movies.
+
+    When normalize is True, the title is case folded and runs of whitespace are collapsed to a single space.
+    """
+    if normalize and isinstance(title, str):
+        title = ' '.join(title.split()).casefold()
+    return title, release_year
+
+
+class WatcherIndex:
+    """ Users who have watched each Movie, keyed as the repository keys Movies.
+
+    An index is added as a watch listener to each User it records, so Movies the User watches later are recorded too.
+    """
+
+    def __init__(self, normalize_movie_titles: bool = False):
+        self.__normalize_movie_titles = normalize_movie_titles
+        self.__watchers: Dict[Tuple[str, int], Dict[User, None]] = dict()
+
+    def __call__(self, user: User, movie: Movie):
+        self.add(movie, user)
+
+    def add(self, movie: Movie, user: User):
+        key = movie_key(movie.title, movie.release_year, self.__normalize_movie_titles)
+        self.__watchers.setdefault(key, dict())[user] = None
+
+    def add_user(self, user: User):
+        for movie in user.watched_movies:
+            self.add(movie, user)
+        user.add_watch_listener(self)
+
+    def get(self, movie: Movie) -> List[User]:
+        """ Returns the recorded watchers of movie who still have it among their watched Movies """
+        watchers = self.__watchers.get(movie_key(movie.title, movie.release_year, self.__normalize_movie_titles),
+                                       dict())
+        return [user for user in watchers if movie in user.watched_movies]
+
+
 class MemoryRepository(AbstractRepository):
 
-    def __init__(self):
-        self.__actors: List[Actor] = list()
-        self.__actors_count: Dict[Actor, int] = dict()
-        self.__directors: List[Director] = list()
-        self.__directors_count: Dict[Director, int] = dict()
-        self.__genres: List[Genre] = list()
-        self.__genres_count: Dict[Genre, int] = dict()
+    def __init__(self, normalize_movie_titles: bool = False, use_movie_columns: bool = HAS_NUMPY,
+                 query_cache_bytes: int = QUERY_CACHE_BYTES):
+        self.__normalize_movie_titles = normalize_movie_titles
+        self.__actors: Dict[str, Actor] = dict()
+        self.__actors_count = FrequencyCounter()
+        self.__directors: Dict[str, Director] = dict()
+        self.__directors_count = FrequencyCounter()
+        self.__genres: Dict[str, Genre] = dict()
+        self.__genres_count = FrequencyCounter()
         self.__movies: Dict[int, Movie] = dict()
+        self.__movies_by_key: Dict[Tuple[str, int], Movie] = dict()
+        self.__movie_ranks_by_actor: Dict[Actor, List[int]] = dict()
+        self.__movie_ranks_by_director: Dict[Director, List[int]] = dict()
+        self.__movie_ranks_by_genre: Dict[Genre, List[int]] = dict()
+        self.__movie_ranks_by_release_year: Dict[int, List[int]] = dict()
+        self.__range_indexes: Dict[str, RangeIndex] = {attribute: RangeIndex()
+                                                       for attribute in RANGE_ATTRIBUTES.values()}
+        self.__columns = MovieColumns() if use_movie_columns else None
+        # Ranks of the whole catalogue in each sort order used by get_movie_ranks_page, with each rank's position
+        self.__catalogue_orders: Dict[Tuple[str, bool], Tuple[List[int], Dict[int, int]]] = dict()
+        self.__selections: Dict[Tuple[str, frozenset], RankBitmap] = dict()
+        self.__rank_bitmaps: Dict[str, Dict[Hashable, RankBitmap]] = {field: dict() for field in QUERY_FIELDS}
+        self.__all_ranks = RankBitmap()
+        self.__text_index = TextIndex()
+        self.__query_cache = QueryCache(query_cache_bytes) if query_cache_bytes > 0 else None
+        self.__actor_names = PrefixIndex(self.__actors_count)
+        self.__director_names = PrefixIndex(self.__directors_count)
+        self.__genre_names = PrefixIndex(self.__genres_count)
+        self.__actor_resolver = NameResolver(self.__actors_count)
+        self.__director_resolver = NameResolver(self.__directors_count)
+        self.__user_resolver = NameResolver()
         self.__reviews: Dict[int, Review] = dict()
-        self.__users: List[User] = list()
-        self.__watch_lists: List[WatchList] = list()
+        self.__reviews_by_movie: Dict[Tuple[str, int], List[Review]] = dict()
+        self.__version = 0
+        self.__load_token = uuid.uuid4().hex
+        # Versions of the Movies changed since they were added, the others being at version 1
+        self.__movie_versions: Dict[int, int] = dict()
+        self.__users: Dict[str, User] = dict()
+        self.__users_by_id: Dict[int, User] = dict()
+        self.__watch_lists: Dict[int, WatchList] = dict()
+        self.__poster_urls: Dict[Movie, Optional[str]] = dict()
         self.__movie_file_csv_reader = None
         self.__review_file_csv_reader = None
         self.__user_file_csv_reader = None
         self.__watchlist_file_csv_reader = None
         self.__watching_sim_file_csv_reader = None
+        self.__poster_file_csv_reader = None
         self.__watching_sims: Dict[int, MovieWatchingSimulation] = dict()
+        self.__watching_sims_by_movie: Dict[Tuple[str, int], List[MovieWatchingSimulation]] = dict()
+        self.__watchers = WatcherIndex(self.__normalize_movie_titles)
 
     def add_actor(self, actor: Actor):
         super().add_actor(actor)
-        if actor not in self.__actors:
-            self.__actors.append(actor)
+        if actor.actor_full_name not in self.__actors:
+            self.__actors[actor.actor_full_name] = actor
+            self.__actor_names.add(actor.actor_full_name, actor)
+            self.__actor_resolver.add(actor.actor_full_name, actor)
+            self.__invalidate_queries([('actor', actor.actor_full_name), ACTORS_TAG, CATALOGUE_TAG])
+
+    def __contains_actor(self, actor: Actor) -> bool:
+        return isinstance(actor, Actor) and actor.actor_full_name in self.__actors
 
     def get_actor(self, actor_full_name: str) -> Actor:
-        return next((actor for actor in self.__actors if actor.actor_full_name == actor_full_name), None)
+        return self.__actors.get(actor_full_name)
 
     def get_actors_by_colleagues(self, colleagues: List[Actor]) -> List[Actor]:
+        names = frozenset(actor.actor_full_name for actor in colleagues if isinstance(actor, Actor))
+        return self.__cached_query(('colleagues', names), [ACTORS_TAG] + [('actor', name) for name in names],
+                                   lambda: self.__find_actors_by_colleagues(colleagues))
+
+    def __find_actors_by_colleagues(self, colleagues: List[Actor]) -> List[Actor]:
         # Only include colleagues which are Actors in this repository
-        existing_colleagues = [actor for actor in colleagues if actor in self.__actors]
+        existing_colleagues = [actor for actor in colleagues if self.__contains_actor(actor)]
 
         # Fetch the Actors who have all of the existing colleagues in the given list
         actors_with_colleagues = []
@@ -45,7 +187,7 @@ class MemoryRepository(AbstractRepository):
         if len(existing_colleagues) == 0:
             return actors_with_colleagues
 
-        for actor in self.__actors:
+        for actor in self.__actors.values():
             has_worked_with_all = True
 
             for colleague in existing_colleagues:
@@ -60,46 +202,107 @@ class MemoryRepository(AbstractRepository):
 
     def add_director(self, director: Director):
         super().add_director(director)
-        if director not in self.__directors:
-            self.__directors.append(director)
+        if director.director_full_name not in self.__directors:
+            self.__directors[director.director_full_name] = director
+            self.__director_names.add(director.director_full_name, director)
+            self.__director_resolver.add(director.director_full_name, director)
+            self.__invalidate_queries([CATALOGUE_TAG])
 
     def get_director(self, director_full_name: str) -> Director:
-        return next((director for director in self.__directors
-                     if director.director_full_name == director_full_name), None)
+        return self.__directors.get(director_full_name)
 
     def add_genre(self, genre: Genre):
         super().add_genre(genre)
-        if genre not in self.__genres:
-            self.__genres.append(genre)
+        if genre.genre_name not in self.__genres:
+            self.__genres[genre.genre_name] = genre
+            self.__genre_names.add(genre.genre_name, genre)
+            self.__invalidate_queries([('genre', genre.genre_name), CATALOGUE_TAG])
+
+    def __contains_genre(self, genre: Genre) -> bool:
+        return isinstance(genre, Genre) and genre.genre_name in self.__genres
 
     def get_genres(self) -> List[Genre]:
-        return self.__genres
+        return list(self.__genres.values())
 
     def add_movie(self, movie: Movie):
         super().add_movie(movie)
-        if movie.rank not in self.__movies.keys() and movie not in self.__movies.values():
+        key = self.__movie_key(movie)
+
+        if movie.rank not in self.__movies.keys() and key not in self.__movies_by_key:
             self.__movies[movie.rank] = movie
+            self.__movies_by_key[key] = movie
+            self.__index_movie(movie)
 
-            if movie.director in self.__directors_count.keys():
-                self.__directors_count[movie.director] += 1
-            else:
-                self.__directors_count[movie.director] = 1
+            self.__directors_count.increment(movie.director)
 
             for actor in movie.actors:
-                if actor in self.__actors_count.keys():
-                    self.__actors_count[actor] += 1
-                else:
-                    self.__actors_count[actor] = 1
+                self.__actors_count.increment(actor)
 
             for genre in movie.genres:
-                if genre in self.__genres_count.keys():
-                    self.__genres_count[genre] += 1
-                else:
-                    self.__genres_count[genre] = 1
+                self.__genres_count.increment(genre)
+
+            # Evict the cached queries the new Movie may belong in
+            self.__invalidate_queries([CATALOGUE_TAG] + [('actor', actor.actor_full_name) for actor in movie.actors] +
+                                      [('genre', genre.genre_name) for genre in movie.genres])
+            self.__version += 1
+
+    def __index_movie(self, movie: Movie):
+        # Keep the posting lists used by the get_movie_ranks_by_* queries up to date.
+        # Movies without a rank cannot be ordered within a posting list, so they are not indexed.
+        if movie.rank is None:
+            return
+
+        add_rank_to_postings(self.__movie_ranks_by_director, movie.director, movie.rank)
+        add_rank_to_postings(self.__movie_ranks_by_release_year, movie.release_year, movie.rank)
+
+        for actor in movie.actors:
+            add_rank_to_postings(self.__movie_ranks_by_actor, actor, movie.rank)
+
+        for genre in movie.genres:
+            add_rank_to_postings(self.__movie_ranks_by_genre, genre, movie.rank)
+
+        for attribute, range_index in self.__range_indexes.items():
+            value = getattr(movie, attribute)
+            if value is not None:
+                range_index.add(value, movie.rank)
+
+        # The query bitmaps hold the same ranks as the posting lists, compressed for fast set operations
+        query_values = [('director', movie.director), ('year', movie.release_year)]
+        query_values.extend(('actor', actor) for actor in movie.actors)
+        query_values.extend(('genre', genre) for genre in movie.genres)
+        for field, value in query_values:
+            self.__rank_bitmaps[field].setdefault(value, RankBitmap()).add(movie.rank)
+        self.__all_ranks.add(movie.rank)
+
+        if self.__columns is not None:
+            self.__columns.add(movie)
+        self.__catalogue_orders = dict()
+        self.__selections = dict()
+
+        self.__text_index.add(movie.rank, movie.title, movie.description)
+
+    def __cached_query(self, key: Hashable, tags: List[Hashable], compute: Callable[[], List]) -> List:
+        if self.__query_cache is None:
+            return compute()
+        return self.__query_cache.get(key, compute, tags)
+
+    def __invalidate_queries(self, tags: List[Hashable]):
+        if self.__query_cache is not None:
+            self.__query_cache.invalidate(tags)
+
+    def get_query_cache_stats(self) -> Dict[str, int]:
+        if self.__query_cache is None:
+            return {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0, 'entries': 0, 'bytes': 0}
+        return self.__query_cache.stats
+
+    def __movie_key(self, movie: Movie) -> Tuple[str, int]:
+        return movie_key(movie.title, movie.release_year, self.__normalize_movie_titles)
+
+    def __contains_movie(self, movie: Movie) -> bool:
+        return isinstance(movie, Movie) and self.__movie_key(movie) in self.__movies_by_key
 
     def get_movie(self, title: str, release_year: int) -> Movie:
-        return next((movie for movie in self.__movies.values()
-                     if movie.title == title and movie.release_year == release_year), None)
+        return self.__movies_by_key.get(movie_key(title, release_year, self.__normalize_movie_titles))
 
     def get_number_of_movies(self) -> int:
         return len(self.__movies)
@@ -112,6 +315,19 @@ class MemoryRepository(AbstractRepository):
 
         return movie
 
+    def get_version(self) -> int:
+        return self.__version
+
+    def get_load_token(self) -> str:
+        return self.__load_token
+
+    def renew_load_token(self):
+        """ Chooses a new load token, for a repository loaded again from the same snapshot. """
+        self.__load_token = uuid.uuid4().hex
+
+    def get_movie_version(self, movie_rank: int) -> int:
+        return self.__movie_versions.get(movie_rank, 1 if movie_rank in self.__movies else 0)
+
     def get_movies_by_rank(self, rank_list: List[int]) -> List[Movie]:
         # Only include Movie ranks which are in this repository.
         existing_ranks = [rank for rank in rank_list if rank in self.__movies.keys()]
@@ -121,99 +337,381 @@ class MemoryRepository(AbstractRepository):
         return movies_with_ranks
 
     def get_movie_ranks_by_release_year(self, release_year: int) -> List[int]:
-        return [movie.rank for movie in self.__movies.values() if movie.release_year == release_year]
+        return list(self.__movie_ranks_by_release_year.get(release_year, list()))
 
     def get_movie_ranks_by_director(self, director: Director) -> List[int]:
-        return [movie.rank for movie in self.__movies.values() if movie.director == director]
+        return list(self.__movie_ranks_by_director.get(director, list()))
 
     def get_movie_ranks_by_actors(self, actor_list: List[Actor]) -> List[int]:
+        # A single posting list is copied as fast as a cached result would be, so only intersections are cached
+        names = frozenset(actor.actor_full_name for actor in actor_list if isinstance(actor, Actor))
+        if len(names) <= 1:
+            return self.__find_movie_ranks_by_actors(actor_list)
+        return self.__cached_query(('actors', names), [('actor', name) for name in names],
+                                   lambda: self.__find_movie_ranks_by_actors(actor_list))
+
+    def __find_movie_ranks_by_actors(self, actor_list: List[Actor]) -> List[int]:
         # Only include Actors which are in this repository
-        existing_actors = [actor for actor in actor_list if actor in self.__actors]
+        existing_actors = [actor for actor in actor_list if self.__contains_actor(actor)]
+
+        if len(existing_actors) == 0:
+            return list()
 
         # Fetch the Movies which have all of the existing actors in the given list
-        movie_ranks: List[int] = list()
+        return intersect_postings([self.__movie_ranks_by_actor.get(actor, list()) for actor in existing_actors])
 
-        if len(existing_actors) == 0:
-            return movie_ranks
+    def get_movie_ranks_by_genres(self, genre_list: List[Genre]) -> List[int]:
+        names = frozenset(genre.genre_name for genre in genre_list if isinstance(genre, Genre))
+        if len(names) <= 1:
+            return self.__find_movie_ranks_by_genres(genre_list)
+        return self.__cached_query(('genres', names), [('genre', name) for name in names],
+                                   lambda: self.__find_movie_ranks_by_genres(genre_list))
 
-        for movie in self.__movies.values():
-            has_all_actors = True
+    def __find_movie_ranks_by_genres(self, genre_list: List[Genre]) -> List[int]:
+        # Only include Genres which are in this repository
+        existing_genres = [genre for genre in genre_list if self.__contains_genre(genre)]
 
-            for actor in existing_actors:
-                if actor not in movie.actors:
-                    has_all_actors = False
-                    break
+        if len(existing_genres) == 0:
+            return list()
 
-            if has_all_actors and movie.rank not in movie_ranks:
-                movie_ranks.append(movie.rank)
+        # Fetch the Movies which have all of the existing genres in the given list
+        return intersect_postings([self.__movie_ranks_by_genre.get(genre, list()) for genre in existing_genres])
+
+    def get_movie_ranks_page(self, field: str, item_list: list, anchor: int = None, backward: bool = False,
+                             quantity: int = 3, sort_attribute: str = None,
+                             descending: bool = False) -> Tuple[List[int], int]:
+        super().get_movie_ranks_page(field, item_list, anchor, backward, quantity, sort_attribute, descending)
+
+        # Only include Actors and Genres which are in this repository, as get_movie_ranks_by_actors and
+        # get_movie_ranks_by_genres do
+        if field == 'actor':
+            item_list = [actor for actor in item_list if self.__contains_actor(actor)]
+        elif field == 'genre':
+            item_list = [genre for genre in item_list if self.__contains_genre(genre)]
+        if len(item_list) == 0:
+            return list(), 0
+
+        if sort_attribute is not None:
+            return self.__sorted_movie_ranks_page(field, item_list, anchor, backward, quantity, sort_attribute,
+                                                  descending)
+        if descending:
+            # The page following the anchor in reverse rank order is the one preceding it in rank order
+            page, number_of_ranks = self.get_movie_ranks_page(field, item_list, anchor, not backward, quantity)
+            return page[::-1], number_of_ranks
+
+        postings = {'director': self.__movie_ranks_by_director, 'actor': self.__movie_ranks_by_actor,
+                    'genre': self.__movie_ranks_by_genre}[field]
+        posting_lists = sorted((postings.get(item, list()) for item in item_list), key=len)
+        ranks, other_posting_lists = posting_lists[0], posting_lists[1:]
+
+        if len(other_posting_lists) == 0:
+            number_of_ranks = len(ranks)
+        else:
+            bitmaps = [self.__rank_bitmaps[field].get(item, RankBitmap()) for item in item_list]
+            number_of_ranks = len(reduce(lambda a, b: a & b, bitmaps))
+
+        # Start from the anchor's position in the shortest posting list, and step away from it until the page is full
+        page = list()
+        if backward:
+            i = bisect_left(ranks, anchor) - 1 if anchor is not None else len(ranks) - 1
+            step = -1
+        else:
+            i = bisect_right(ranks, anchor) if anchor is not None else 0
+            step = 1
+
+        while 0 <= i < len(ranks) and len(page) < quantity:
+            if all(posting_contains(other_ranks, ranks[i]) for other_ranks in other_posting_lists):
+                page.append(ranks[i])
+            i += step
+
+        return page[::-1] if backward else page, number_of_ranks
+
+    def __sorted_movie_ranks_page(self, field: str, item_list: list, anchor: Optional[int], backward: bool,
+                                  quantity: int, sort_attribute: str, descending: bool) -> Tuple[List[int], int]:
+        selected = self.__selection(field, item_list)
+        step = -1 if backward else 1
+
+        if len(selected) * MERGE_RATIO < len(self.__movies):
+            # A small selection is sorted, rather than picked out of the whole presorted catalogue
+            order = self.sort_movie_ranks(list(selected), sort_attribute, descending)
+            if anchor is not None and anchor in selected:
+                i = order.index(anchor) + step
+            else:
+                i = len(order) - 1 if backward else 0
+            page = order[max(i - quantity + 1, 0):i + 1] if backward else order[i:i + quantity]
+            return page, len(selected)
+
+        # Start from the anchor's position in the presorted catalogue, and step away from it until the page is full
+        order, positions = self.__catalogue_order(sort_attribute, descending)
+        page = list()
+        if anchor in positions:
+            i = positions[anchor] + step
+        else:
+            i = len(order) - 1 if backward else 0
+
+        while 0 <= i < len(order) and len(page) < quantity:
+            if order[i] in selected:
+                page.append(order[i])
+            i += step
+
+        return page[::-1] if backward else page, len(selected)
+
+    def __selection(self, field: str, item_list: list) -> RankBitmap:
+        # The Movies matching all of the items are intersected once, for the first page requested, not for every page
+        key = (field, frozenset(item_list))
+        selected = self.__selections.get(key)
+        if selected is None:
+            selected = reduce(lambda a, b: a & b, [self.__rank_bitmaps[field].get(item, RankBitmap())
+                                                   for item in item_list])
+            if len(self.__selections) >= SELECTIONS_KEPT:
+                self.__selections = dict()
+            self.__selections[key] = selected
+        return selected
+
+    def __catalogue_order(self, attribute: str, descending: bool) -> Tuple[List[int], Dict[int, int]]:
+        catalogue_order = self.__catalogue_orders.get((attribute, descending))
+        if catalogue_order is None:
+            # All of the ranks are picked out of the presorted order of the movie columns or of the range index
+            order = self.sort_movie_ranks(sorted(self.__movies.keys()), attribute, descending)
+            catalogue_order = (order, {rank: position for position, rank in enumerate(order)})
+            self.__catalogue_orders[attribute, descending] = catalogue_order
+        return catalogue_order
+
+    def get_movie_ranks_by_ranges(self, predicates: List[RangePredicate], director: Director = None,
+                                  actor_list: List[Actor] = None, genre_list: List[Genre] = None) -> List[int]:
+        super().get_movie_ranks_by_ranges(predicates, director, actor_list, genre_list)
+
+        key = ('ranges', frozenset(predicates), director, None if actor_list is None else frozenset(actor_list),
+               None if genre_list is None else frozenset(genre_list))
+        return self.__cached_query(key, [CATALOGUE_TAG], lambda: self.__find_movie_ranks_by_ranges(
+            predicates, director, actor_list, genre_list))
+
+    def __find_movie_ranks_by_ranges(self, predicates: List[RangePredicate], director: Director,
+                                     actor_list: Optional[List[Actor]], genre_list: Optional[List[Genre]]) -> List[int]:
+        # Only include Actors and Genres which are in this repository, as get_movie_ranks_by_actors and
+        # get_movie_ranks_by_genres do
+        if actor_list is not None:
+            actor_list = [actor for actor in actor_list if self.__contains_actor(actor)]
+        if genre_list is not None:
+            genre_list = [genre for genre in genre_list if self.__contains_genre(genre)]
+        if actor_list == [] or genre_list == []:
+            return list()
+
+        # Count the Movies matched by each predicate and attribute query on its own, without collecting them
+        predicates = sorted(predicates, key=lambda p: self.__range_indexes[p.attribute].count(p))
+        match_counts = [self.__range_indexes[predicate.attribute].count(predicate) for predicate in predicates[:1]]
+        if director is not None:
+            match_counts.append(len(self.__movie_ranks_by_director.get(director, list())))
+        match_counts.extend(len(self.__movie_ranks_by_actor.get(actor, list())) for actor in actor_list or list())
+        match_counts.extend(len(self.__movie_ranks_by_genre.get(genre, list())) for genre in genre_list or list())
+        smallest_match_count = min(match_counts, default=None)
+
+        # A vectorized mask touches every Movie, so it is only used when no index narrows the query down to a small
+        # part of the catalogue
+        if self.__columns is not None and (smallest_match_count is None or
+                                           smallest_match_count * COLUMN_SCAN_RATIO > len(self.__movies)):
+            movie_ranks = self.__columns.ranks(self.__columns.mask(predicates, director, genre_list))
+            if actor_list is not None:
+                movie_ranks = intersect_postings([movie_ranks, self.get_movie_ranks_by_actors(actor_list)])
+            return movie_ranks
 
-        return movie_ranks
+        posting_lists = list()
+        if director is not None:
+            posting_lists.append(self.__movie_ranks_by_director.get(director, list()))
+        if actor_list is not None:
+            posting_lists.append(self.get_movie_ranks_by_actors(actor_list))
+        if genre_list is not None:
+            posting_lists.append(self.get_movie_ranks_by_genres(genre_list))
+
+        # Scan the range of the most selective predicate, unless an attribute query already matches fewer Movies.
+        # The remaining predicates are checked against each candidate rather than scanned.
+        smallest_posting_length = min((len(ranks) for ranks in posting_lists), default=None)
+
+        if len(predicates) > 0 and (smallest_posting_length is None or
+                                    self.__range_indexes[predicates[0].attribute].count(predicates[0]) <
+                                    smallest_posting_length):
+            scanned = predicates.pop(0)
+            posting_lists.append(self.__range_indexes[scanned.attribute].ranks(scanned))
+
+        if len(posting_lists) == 0:
+            candidates = sorted(rank for rank in self.__movies.keys() if rank is not None)
+        else:
+            candidates = intersect_postings(posting_lists)
+
+        return [rank for rank in candidates if all(predicate.matches(getattr(self.__movies[rank], predicate.attribute))
+                                                   for predicate in predicates)]
+
+    def get_movie_ranks_by_query(self, query: MovieQuery, sort_attribute: str = None,
+                                 descending: bool = False) -> List[int]:
+        super().get_movie_ranks_by_query(query, sort_attribute, descending)
+
+        # Queries are keyed by their normalized text, so equivalent spellings of a query share a result
+        return self.__cached_query(('query', str(query), sort_attribute, descending), [CATALOGUE_TAG],
+                                   lambda: self.__find_movie_ranks_by_query(query, sort_attribute, descending))
+
+    def __find_movie_ranks_by_query(self, query: MovieQuery, sort_attribute: Optional[str],
+                                    descending: bool) -> List[int]:
+        # A term may be both estimated and evaluated, so each is looked up once
+        bitmaps: Dict[Tuple[str, str], RankBitmap] = dict()
+
+        def lookup(field: str, value: str) -> RankBitmap:
+            if (field, value) not in bitmaps:
+                bitmaps[field, value] = self.__lookup_query_term(field, value)
+            return bitmaps[field, value]
+
+        movie_ranks = list(query.evaluate(lookup, self.__all_ranks))
+
+        if sort_attribute is not None:
+            return self.sort_movie_ranks(movie_ranks, sort_attribute, descending)
+        return movie_ranks[::-1] if descending else movie_ranks
+
+    def __lookup_query_term(self, field: str, value: str) -> RankBitmap:
+        bitmaps = self.__rank_bitmaps[field]
+
+        if field == 'year':
+            result = RankBitmap()
+            for year in year_range(value):
+                if year in bitmaps:
+                    result = result | bitmaps[year]
+            return result
+
+        if field == 'actor':
+            key = self.__find_by_name(self.__actors, self.__actor_resolver, value)
+        elif field == 'director':
+            key = self.__find_by_name(self.__directors, self.__director_resolver, value)
+        else:
+            key = self.__genres.get(value) or next(
+                (genre for genre in self.__genres.values() if name_key(genre.genre_name) == name_key(value)), None)
+
+        return bitmaps.get(key, RankBitmap())
+
+    @staticmethod
+    def __find_by_name(items: Dict[str, Hashable], resolver: NameResolver, name: str) -> Optional[Hashable]:
+        # Find the item with the name, or with the name typed with different case or accents
+        item = items.get(name)
+        if item is None:
+            matches = resolver.find(name)
+            item = matches[0] if len(matches) > 0 else None
+        return item
+
+    def sort_movie_ranks(self, rank_list: List[int], attribute: str, descending: bool = False) -> List[int]:
+        super().sort_movie_ranks(rank_list, attribute, descending)
 
-    def get_movie_ranks_by_genres(self, genre_list: List[Genre]) -> List[int]:
-        # Only include Genres which are in this repository
-        existing_genres = [genre for genre in genre_list if genre in self.__genres]
+        # Only include Movie ranks which are in this repository.
+        existing_ranks = [rank for rank in rank_list if rank in self.__movies.keys()]
 
-        # Fetch the Movies which have all of the existing genres in the given list
-        movie_ranks: List[int] = list()
+        if self.__columns is not None:
+            return self.__columns.sort_ranks(existing_ranks, attribute, descending)
 
-        if len(existing_genres) == 0:
-            return movie_ranks
+        range_index = self.__range_indexes.get(attribute)
+        if range_index is not None and len(existing_ranks) * MERGE_RATIO >= len(self.__movies) and \
+                all(rank < next_rank for rank, next_rank in zip(existing_ranks, existing_ranks[1:])):
+            # Without NumPy, the range index's order of the catalogue is the presorted order the ranks are picked
+            # out of. Movies missing the value are not in the index, so are placed last in rank order.
+            selected = set(existing_ranks)
+            sorted_ranks = [rank for rank in range_index.sorted_ranks(descending) if rank in selected]
+            selected.difference_update(sorted_ranks)
+            return sorted_ranks + [rank for rank in existing_ranks if rank in selected]
 
-        for movie in self.__movies.values():
-            has_all_genres = True
+        def sort_key(rank: int):
+            value = getattr(self.__movies[rank], attribute)
+            return value is None, 0 if value is None else (-value if descending else value)
 
-            for genre in existing_genres:
-                if genre not in movie.genres:
-                    has_all_genres = False
-                    break
+        return sorted(existing_ranks, key=sort_key)
 
-            if has_all_genres and movie.rank not in movie_ranks:
-                movie_ranks.append(movie.rank)
+    def search_movie_ranks(self, query: str, cursor: int = 0, quantity: int = 10) -> Tuple[List[int], int]:
+        super().search_movie_ranks(query, cursor, quantity)
+        return self.__text_index.search(query or '', cursor, quantity)
 
-        return movie_ranks
+    def search_movie_ranks_page(self, query: str, anchor: int = None, backward: bool = False,
+                                quantity: int = 10) -> Tuple[List[int], int]:
+        super().search_movie_ranks_page(query, anchor, backward, quantity)
+        return self.__text_index.search_page(query or '', anchor, backward, quantity)
 
     def get_most_common_directors(self, quantity: int) -> List[Director]:
         if not isinstance(quantity, int) or quantity <= 0:
             raise RepositoryException('Number of most common Directors needs to be a positive integer value')
 
-        director_count = len(self.__directors_count)
-
-        if quantity > director_count:
-            quantity = director_count
-
-        most_common_directors = sorted(self.__directors_count, key=self.__directors_count.get, reverse=True)
-        return most_common_directors[0:quantity]
+        return self.__directors_count.most_common(quantity)
 
     def get_most_common_actors(self, quantity: int) -> List[Actor]:
         if not isinstance(quantity, int) or quantity <= 0:
             raise RepositoryException('Number of most common Actors needs to be a positive integer value')
 
-        actor_count = len(self.__actors_count)
-
-        if quantity > actor_count:
-            quantity = actor_count
-
-        most_common_actors = sorted(self.__actors_count, key=self.__actors_count.get, reverse=True)
-        return most_common_actors[0:quantity]
+        return self.__actors_count.most_common(quantity)
 
     def get_most_common_genres(self, quantity: int) -> List[Genre]:
         if not isinstance(quantity, int) or quantity <= 0:
             raise RepositoryException('Number of most common Genres needs to be a positive integer value')
 
-        genre_count = len(self.__genres_count)
+        return self.__genres_count.most_common(quantity)
+
+    def complete_actor_names(self, prefix: str, quantity: int) -> List[Actor]:
+        super().complete_actor_names(prefix, quantity)
+        return self.__actor_names.complete(prefix, quantity)
+
+    def complete_director_names(self, prefix: str, quantity: int) -> List[Director]:
+        super().complete_director_names(prefix, quantity)
+        return self.__director_names.complete(prefix, quantity)
 
-        if quantity > genre_count:
-            quantity = genre_count
+    def complete_genre_names(self, prefix: str, quantity: int) -> List[Genre]:
+        super().complete_genre_names(prefix, quantity)
+        return self.__genre_names.complete(prefix, quantity)
 
-        most_common_genres = sorted(self.__genres_count, key=self.__genres_count.get, reverse=True)
-        return most_common_genres[0:quantity]
+    def resolve_actor_names(self, actor_full_name: str, quantity: int) -> List[Actor]:
+        super().resolve_actor_names(actor_full_name, quantity)
+        return self.__actor_resolver.resolve(actor_full_name, quantity)
+
+    def resolve_director_names(self, director_full_name: str, quantity: int) -> List[Director]:
+        super().resolve_director_names(director_full_name, quantity)
+        return self.__director_resolver.resolve(director_full_name, quantity)
+
+    def add_poster_url(self, movie: Movie, poster_url: Optional[str]):
+        super().add_poster_url(movie, poster_url)
+        if not self.__contains_movie(movie):
+            raise RepositoryException(f'Movie {movie} for poster URL is not in the repository')
+
+        self.__poster_urls[self.__movies_by_key[self.__movie_key(movie)]] = poster_url
+
+    def get_poster_url(self, movie: Movie) -> Optional[str]:
+        if not self.__contains_movie(movie):
+            return None
+        return self.__poster_urls.get(self.__movies_by_key[self.__movie_key(movie)])
+
+    def has_poster_url(self, movie: Movie) -> bool:
+        return self.__contains_movie(movie) and self.__movies_by_key[self.__movie_key(movie)] in self.__poster_urls
+
+    def get_movies_without_poster_urls(self) -> List[Movie]:
+        return [movie for rank, movie in sorted(self.__movies.items()) if movie not in self.__poster_urls]
 
     def add_review(self, review: Review):
         super().add_review(review)
-        if review.movie not in self.__movies.values():
+        if not self.__contains_movie(review.movie):
             raise RepositoryException(f'Movie {review.movie} for Review is not in the repository')
-        if review.id not in self.__reviews.keys() and review not in self.__reviews.values():
+        # An equal Review is for the same Movie, so only that Movie's Reviews are checked
+        movie_reviews = self.__reviews_by_movie.setdefault(self.__movie_key(review.movie), list())
+        if review.id not in self.__reviews.keys() and review not in movie_reviews:
             self.__reviews[review.id] = review
+            movie_reviews.append(review)
+            self.__bump_movie_version(self.__movies_by_key[self.__movie_key(review.movie)])
+
+    def remove_review(self, review: Review):
+        super().remove_review(review)
+        if review.user is not None:
+            review.user.remove_review(review)
+
+        if self.__reviews.get(review.id) is review:
+            del self.__reviews[review.id]
+            movie_reviews = self.__reviews_by_movie.get(self.__movie_key(review.movie), [])
+            if review in movie_reviews:
+                movie_reviews.remove(review)
+
+        if self.__contains_movie(review.movie):
+            self.__bump_movie_version(self.__movies_by_key[self.__movie_key(review.movie)])
+
+    def __bump_movie_version(self, movie: Movie):
+        self.__movie_versions[movie.rank] = self.get_movie_version(movie.rank) + 1
+        self.__version += 1
 
     def get_review(self, review_id: int) -> Review:
         review = None
@@ -224,34 +722,66 @@ class MemoryRepository(AbstractRepository):
         return review
 
     def get_reviews_for_movie(self, movie: Movie) -> List[Review]:
-        return [review for review in self.__reviews.values() if review.movie == movie and
-                movie in self.__movies.values()]
+        if not self.__contains_movie(movie):
+            return list()
+
+        return list(self.__reviews_by_movie.get(self.__movie_key(movie), list()))
 
     def add_user(self, user: User):
         super().add_user(user)
-        if user not in self.__users:
-            self.__users.append(user)
+        if user.user_name not in self.__users:
+            self.__users[user.user_name] = user
+            self.__users_by_id.setdefault(user.id, user)
+            self.__user_resolver.add(user.user_name, user)
+            self.__watchers.add_user(user)
+
+    def __contains_user(self, user: User) -> bool:
+        return isinstance(user, User) and user.user_name in self.__users
 
     def get_user(self, user_name: str) -> User:
-        return next((user for user in self.__users if user.user_name == user_name), None)
+        return self.__users.get(user_name)
+
+    def resolve_user_names(self, user_name: str, quantity: int) -> List[User]:
+        super().resolve_user_names(user_name, quantity)
+        return self.__user_resolver.resolve(user_name, quantity)
 
     def get_user_by_id(self, user_id: int) -> User:
-        return next((user for user in self.__users if user.id == user_id), None)
+        return self.__users_by_id.get(user_id)
 
     def get_users_watched_movie(self, movie: Movie) -> List[User]:
-        return [user for user in self.__users if movie in user.watched_movies and movie in self.__movies.values()]
+        if not self.__contains_movie(movie):
+            return list()
+
+        return self.__watchers.get(movie)
 
     def add_watchlist(self, watchlist: WatchList):
         super().add_watchlist(watchlist)
         for movie in watchlist:
-            if movie not in self.__movies.values():
+            if not self.__contains_movie(movie):
                 raise RepositoryException(f'Movie {movie} in Watchlist is not in the repository')
 
-        if watchlist not in self.__watch_lists:
-            self.__watch_lists.append(watchlist)
+        if watchlist.user.id not in self.__watch_lists:
+            self.__watch_lists[watchlist.user.id] = watchlist
+            self.__version += 1
+
+    def add_movie_to_watchlist(self, watchlist: WatchList, movie: Movie):
+        super().add_movie_to_watchlist(watchlist, movie)
+        if not self.__contains_movie(movie):
+            raise RepositoryException(f'Movie {movie} for Watchlist is not in the repository')
+
+        if movie not in watchlist:
+            watchlist.add_movie(movie)
+            self.__version += 1
+        self.__watch_lists.setdefault(watchlist.user.id, watchlist)
+
+    def remove_movie_from_watchlist(self, watchlist: WatchList, movie: Movie):
+        super().remove_movie_from_watchlist(watchlist, movie)
+        if movie in watchlist:
+            watchlist.remove_movie(movie)
+            self.__version += 1
 
     def get_watchlist_by_user_id(self, user_id: int) -> WatchList:
-        return next((watchlist for watchlist in self.__watch_lists if watchlist.user.id == user_id), None)
+        return self.__watch_lists.get(user_id)
 
     def set_movie_file_csv_reader(self, movie_file_reader: MovieFileCSVReader):
         super().set_movie_file_csv_reader(movie_file_reader)
@@ -293,21 +823,35 @@ class MemoryRepository(AbstractRepository):
     def get_watching_sim_file_csv_reader(self) -> WatchingSimFileCSVReader:
         return self.__watching_sim_file_csv_reader
 
+    def set_poster_file_csv_reader(self, poster_file_reader: PosterFileCSVReader):
+        super().set_poster_file_csv_reader(poster_file_reader)
+        if self.__poster_file_csv_reader is None:
+            self.__poster_file_csv_reader = poster_file_reader
+
+    def get_poster_file_csv_reader(self) -> PosterFileCSVReader:
+        return self.__poster_file_csv_reader
+
     def add_watching_sim(self, watching_sim: MovieWatchingSimulation):
         super().add_watching_sim(watching_sim)
-        if watching_sim.movie not in self.__movies.values():
+        if not self.__contains_movie(watching_sim.movie):
             raise RepositoryException(f'Movie {watching_sim.movie} for watching simulation is not in the repository')
 
         for user in watching_sim.users:
-            if user not in self.__users:
+            if not self.__contains_user(user):
                 raise RepositoryException(f'User {user} for watching simulation is not in the repository')
 
         for review in watching_sim.reviews:
-            if review not in self.__reviews.values():
+            if not self.__contains_movie(review.movie) or \
+                    review not in self.__reviews_by_movie.get(self.__movie_key(review.movie), list()):
                 raise RepositoryException(f'Review {review} for watching simulation is not in the repository')
 
-        if watching_sim.id not in self.__watching_sims.keys() and watching_sim not in self.__watching_sims.values():
+        # An equal watching simulation is of the same Movie, so only that Movie's watching simulations are checked
+        movie_watching_sims = self.__watching_sims_by_movie.setdefault(self.__movie_key(watching_sim.movie), list())
+        if watching_sim.id not in self.__watching_sims.keys() and watching_sim not in movie_watching_sims:
             self.__watching_sims[watching_sim.id] = watching_sim
+            movie_watching_sims.append(watching_sim)
+            for user in watching_sim.users:
+                self.__watchers.add(watching_sim.movie, user)
 
     def get_watching_sim(self, watching_sim_id: int) -> MovieWatchingSimulation:
         watching_sim = None
@@ -318,12 +862,14 @@ class MemoryRepository(AbstractRepository):
         return watching_sim
 
     def get_watching_sims_for_movie(self, movie: Movie) -> List[MovieWatchingSimulation]:
-        return [watching_sim for watching_sim in self.__watching_sims.values() if watching_sim.movie == movie and
-                movie in self.__movies.values()]
+        if not self.__contains_movie(movie):
+            return list()
+
+        return list(self.__watching_sims_by_movie.get(self.__movie_key(movie), list()))
 
     def get_watching_sims_by_users(self, user_list: List[User]) -> List[MovieWatchingSimulation]:
         # Only include Users which are in this repository
-        existing_users = [user for user in user_list if user in self.__users]
+        existing_users = [user for user in user_list if self.__contains_user(user)]
 
         # Fetch the Watching Simulations which have all of the existing users in the given list
         watching_sims_with_users = []
@@ -363,6 +909,10 @@ class MemoryRepository(AbstractRepository):
             for genre in self.__movie_file_csv_reader.dataset_of_genres:
                 self.add_genre(genre)
 
+            # Sort the catalogue by each attribute now, rather than in the first request to browse by it
+            if self.__columns is not None:
+                self.__columns.prepare()
+
     def load_users(self):
         if self.__user_file_csv_reader is not None:
             self.__user_file_csv_reader.read_csv_file()
@@ -391,8 +941,16 @@ class MemoryRepository(AbstractRepository):
             for watching_sim in self.__watching_sim_file_csv_reader.dataset_of_watching_sims:
                 self.add_watching_sim(watching_sim)
 
+    def load_posters(self):
+        if self.__poster_file_csv_reader is not None:
+            self.__poster_file_csv_reader.read_csv_file()
+
+            for movie, poster_url in self.__poster_file_csv_reader.dataset_of_posters:
+                self.add_poster_url(movie, poster_url)
+
     def populate(self, data_path_dict):
         super().populate(data_path_dict)
+        self.renew_load_token()
 
         self.set_movie_file_csv_reader(MovieFileCSVReader(data_path_dict["movies"]))
         self.load_movie_dataset()
@@ -400,13 +958,20 @@ class MemoryRepository(AbstractRepository):
         self.set_user_file_csv_reader(UserFileCSVReader(data_path_dict["users"], self.__movies))
         self.load_users()
 
-        self.set_review_file_csv_reader(ReviewFileCSVReader(data_path_dict["reviews"], self.__movies, self.__users))
+        self.set_review_file_csv_reader(
+            ReviewFileCSVReader(data_path_dict["reviews"], self.__movies, self.__users_by_id))
         self.load_reviews()
 
         self.set_watchlist_file_csv_reader(
-            WatchListFileCSVReader(data_path_dict["watch_lists"], self.__movies, self.__users))
+            WatchListFileCSVReader(data_path_dict["watch_lists"], self.__movies, self.__users_by_id))
         self.load_watch_lists()
 
         self.set_watching_sim_file_csv_reader(
-            WatchingSimFileCSVReader(data_path_dict["watching_sims"], self.__movies, self.__users, self.__reviews))
+            WatchingSimFileCSVReader(data_path_dict["watching_sims"], self.__movies, self.__users_by_id,
+                                     self.__reviews))
         self.load_activity_simulations()
+
+        # The poster file is written by the poster enrichment job, so it is only loaded once that job has run
+        if "posters" in data_path_dict.keys() and Path(data_path_dict["posters"]).exists():
+            self.set_poster_file_csv_reader(PosterFileCSVReader(data_path_dict["posters"], self.__movies))
+            self.load_posters()
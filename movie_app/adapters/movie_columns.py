@@ -0,0 +1,176 @@
+from typing import Dict, Iterable, List, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None   # NumPy is optional, without it the repository answers queries from its indexes alone
+
+from movie_app.adapters.range_index import RangePredicate, RANGE_ATTRIBUTES
+from movie_app.domainmodel import Director, Genre, Movie
+
+HAS_NUMPY = np is not None
+
+# Numeric Movie attributes mirrored as columns. Missing values are stored as NaN, which no comparison matches.
+COLUMN_ATTRIBUTES = tuple(RANGE_ATTRIBUTES.values())
+
+NO_DIRECTOR = -1
+
+# Ranks making up at least one in MERGE_RATIO of the catalogue are sorted by picking them out of a presorted order
+# of the whole catalogue, which costs less than sorting them once there are that many
+MERGE_RATIO = 20
+
+
+class MovieColumns:
+    """ Columnar mirror of the Movies in a repository, for vectorized filtering and sorting of the whole catalogue.
+
+    Each column is a dense NumPy array indexed by Movie rank. Numeric attributes are float columns, directors are
+    integer codes and genres are a boolean matrix with a column per genre code. Arrays grow by doubling as Movies
+    with higher ranks are added.
+
+    Each numeric attribute also has an ascending and a descending order of the catalogue, holding the ranks sorted
+    by value with Movies of equal value in rank order and Movies missing the value last. An order is built the first
+    time it is needed, or by prepare, and a Movie added later is inserted into it rather than rebuilding it.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        if np is None:
+            raise ImportError('MovieColumns requires NumPy')
+
+        self.__capacity = max(capacity, 1)
+        self.__present = np.zeros(self.__capacity, dtype=bool)
+        self.__numeric: Dict[str, np.ndarray] = {attribute: np.full(self.__capacity, np.nan)
+                                                 for attribute in COLUMN_ATTRIBUTES}
+        self.__director_codes = np.full(self.__capacity, NO_DIRECTOR, dtype=np.int32)
+        self.__genre_flags = np.zeros((self.__capacity, 8), dtype=bool)
+        self.__director_code_by_director: Dict[Director, int] = dict()
+        self.__genre_code_by_genre: Dict[Genre, int] = dict()
+        # The ranks of each order, and the values they are sorted by, negated for descending orders
+        self.__orders: Dict[Tuple[str, bool], Tuple[np.ndarray, np.ndarray]] = dict()
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.__present))
+
+    def __grow(self, rank: int):
+        capacity = self.__capacity
+        while capacity <= rank:
+            capacity *= 2
+
+        def grown(column: np.ndarray, fill) -> np.ndarray:
+            new_column = np.full((capacity,) + column.shape[1:], fill, dtype=column.dtype)
+            new_column[:self.__capacity] = column
+            return new_column
+
+        self.__present = grown(self.__present, False)
+        self.__numeric = {attribute: grown(column, np.nan) for attribute, column in self.__numeric.items()}
+        self.__director_codes = grown(self.__director_codes, NO_DIRECTOR)
+        self.__genre_flags = grown(self.__genre_flags, False)
+        self.__capacity = capacity
+
+    def __genre_code(self, genre: Genre) -> int:
+        if genre not in self.__genre_code_by_genre:
+            code = len(self.__genre_code_by_genre)
+            if code == self.__genre_flags.shape[1]:
+                self.__genre_flags = np.hstack([self.__genre_flags, np.zeros_like(self.__genre_flags)])
+            self.__genre_code_by_genre[genre] = code
+
+        return self.__genre_code_by_genre[genre]
+
+    def add(self, movie: Movie):
+        """ Copies the attributes of a ranked Movie into the columns. """
+        if movie.rank >= self.__capacity:
+            self.__grow(movie.rank)
+
+        rank = movie.rank
+        if self.__present[rank]:
+            # The Movie's old values are somewhere in the orders, so they are rebuilt when next needed
+            self.__orders = dict()
+        for attribute, column in self.__numeric.items():
+            value = getattr(movie, attribute)
+            column[rank] = np.nan if value is None else value
+
+        if movie.director is not None:
+            self.__director_codes[rank] = self.__director_code_by_director.setdefault(
+                movie.director, len(self.__director_code_by_director))
+
+        for genre in movie.genres:
+            # The genre code is found first, as a new genre may replace the genre matrix with a wider one
+            code = self.__genre_code(genre)
+            self.__genre_flags[rank, code] = True
+
+        self.__present[rank] = True
+
+        for (attribute, descending), (ranks, keys) in list(self.__orders.items()):
+            key = self.__numeric[attribute][rank]
+            key = -key if descending else key
+            # Movies with the same value are in rank order, so the rank is placed among them with a second search
+            start = int(np.searchsorted(keys, key, side='left'))
+            stop = int(np.searchsorted(keys, key, side='right'))
+            position = start + int(np.searchsorted(ranks[start:stop], rank))
+            self.__orders[attribute, descending] = (np.insert(ranks, position, rank), np.insert(keys, position, key))
+
+    def __order(self, attribute: str, descending: bool) -> 'np.ndarray':
+        if (attribute, descending) not in self.__orders:
+            ranks = np.flatnonzero(self.__present)
+            keys = self.__numeric[attribute][ranks]
+            keys = -keys if descending else keys
+            order = np.argsort(keys, kind='stable')
+            self.__orders[attribute, descending] = (ranks[order], keys[order])
+
+        return self.__orders[attribute, descending][0]
+
+    def prepare(self):
+        """ Builds the ascending and descending orders of every numeric attribute, so no query has to. """
+        for attribute in COLUMN_ATTRIBUTES:
+            self.__order(attribute, descending=False)
+            self.__order(attribute, descending=True)
+
+    def mask(self, predicates: Iterable[RangePredicate], director: Director = None,
+             genre_list: List[Genre] = None) -> 'np.ndarray':
+        """ Returns a boolean array, indexed by rank, of the Movies matching all of the predicates, with the given
+        Director and with all of the given Genres.
+        """
+        mask = self.__present.copy()
+
+        for predicate in predicates:
+            column = self.__numeric[predicate.attribute]
+            if predicate.minimum is not None:
+                mask &= column >= predicate.minimum if predicate.include_minimum else column > predicate.minimum
+            if predicate.maximum is not None:
+                mask &= column <= predicate.maximum if predicate.include_maximum else column < predicate.maximum
+            if predicate.minimum is None and predicate.maximum is None:
+                mask &= ~np.isnan(column)
+
+        if director is not None:
+            mask &= self.__director_codes == self.__director_code_by_director.get(director, -2)
+
+        for genre in genre_list or list():
+            if genre not in self.__genre_code_by_genre:
+                mask[:] = False
+                break
+            mask &= self.__genre_flags[:, self.__genre_code_by_genre[genre]]
+
+        return mask
+
+    def ranks(self, mask: 'np.ndarray') -> List[int]:
+        """ Returns the ranks selected by a mask, in rank order. """
+        return np.flatnonzero(mask).tolist()
+
+    def sort_ranks(self, rank_list: List[int], attribute: str, descending: bool = False) -> List[int]:
+        """ Returns the given ranks ordered by the value of an attribute, with Movies missing the value last.
+
+        Movies with equal values keep their order in the given list.
+        """
+        ranks = np.asarray(rank_list, dtype=np.int64)
+        if len(ranks) == 0:
+            return list()
+
+        if len(ranks) * MERGE_RATIO >= len(self) and bool(np.all(ranks[1:] > ranks[:-1])):
+            # Ranks in rank order have the order's tie break, so they are picked out of it in a single pass
+            selected = np.zeros(self.__capacity, dtype=bool)
+            selected[ranks] = True
+            order = self.__order(attribute, descending)
+            return order[selected[order]].tolist()
+
+        values = self.__numeric[attribute][ranks]
+        order = np.argsort(-values if descending else values, kind='stable')
+        return ranks[order].tolist()
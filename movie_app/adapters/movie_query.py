@@ -0,0 +1,229 @@
+import abc
+import re
+from typing import Callable, List
+
+from movie_app.adapters.rank_bitmap import RankBitmap
+
+# Looks up the Movies with a field value, e.g. lookup('genre', 'Action'). A year value may be a range, '2010..2016'.
+Lookup = Callable[[str, str], RankBitmap]
+
+QUERY_FIELDS = ('actor', 'genre', 'director', 'year')
+YEAR_PATTERN = re.compile(r'^(\d{4})(?:\.\.(\d{4}))?$')
+
+# Parentheses, operators and field:value terms. Values containing spaces are quoted, e.g. actor:"Chris Pratt".
+TOKEN_PATTERN = re.compile(r'\s*(?:([()])|([a-zA-Z]+):(?:"([^"]*)"|([^\s()"]+))|([^\s()]+))')
+
+# Deepest nesting of parentheses a query may have, which keeps the recursive parse and evaluation of a query well
+# within the interpreter's recursion limit
+MAX_QUERY_DEPTH = 32
+
+
+class MovieQueryException(Exception):
+    def __init__(self, message=None):
+        pass
+
+
+class MovieQuery(abc.ABC):
+    """ A Boolean query over the actors, genres, directors and release years of Movies, such as
+    '(genre:Action OR genre:Sci-Fi) AND NOT genre:Horror AND director:"James Gunn"'.
+
+    Queries evaluate to RankBitmaps. Before evaluating the operands of an AND, each estimates how many Movies it
+    matches, so the intersection starts from the most selective operand and stops once nothing is left.
+    """
+
+    @abc.abstractmethod
+    def estimate(self, lookup: Lookup, universe: RankBitmap) -> int:
+        """ Returns an upper bound on the number of Movies the query matches, without evaluating it. """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def evaluate(self, lookup: Lookup, universe: RankBitmap) -> RankBitmap:
+        raise NotImplementedError
+
+
+class QueryTerm(MovieQuery):
+
+    def __init__(self, field: str, value: str):
+        self.field = field
+        self.value = value
+
+    def __str__(self) -> str:
+        return f'{self.field}:"{self.value}"'
+
+    def estimate(self, lookup: Lookup, universe: RankBitmap) -> int:
+        return len(lookup(self.field, self.value))
+
+    def evaluate(self, lookup: Lookup, universe: RankBitmap) -> RankBitmap:
+        return lookup(self.field, self.value)
+
+
+class QueryNot(MovieQuery):
+
+    def __init__(self, operand: MovieQuery):
+        self.operand = operand
+
+    def __str__(self) -> str:
+        return f"NOT {self.operand}"
+
+    def estimate(self, lookup: Lookup, universe: RankBitmap) -> int:
+        return len(universe)
+
+    def evaluate(self, lookup: Lookup, universe: RankBitmap) -> RankBitmap:
+        return universe - self.operand.evaluate(lookup, universe)
+
+
+class QueryAnd(MovieQuery):
+
+    def __init__(self, operands: List[MovieQuery]):
+        self.operands = operands
+
+    def __str__(self) -> str:
+        return '(' + ' AND '.join(str(operand) for operand in self.operands) + ')'
+
+    def estimate(self, lookup: Lookup, universe: RankBitmap) -> int:
+        return min(operand.estimate(lookup, universe) for operand in self.operands)
+
+    def evaluate(self, lookup: Lookup, universe: RankBitmap) -> RankBitmap:
+        # Intersect the smallest operands first, then subtract the negated ones from what is left
+        included = [operand for operand in self.operands if not isinstance(operand, QueryNot)]
+        excluded = [operand.operand for operand in self.operands if isinstance(operand, QueryNot)]
+        included.sort(key=lambda operand: operand.estimate(lookup, universe))
+
+        result = included[0].evaluate(lookup, universe) if len(included) > 0 else universe
+        for operand in included[1:]:
+            if len(result) == 0:
+                return result
+            result = result & operand.evaluate(lookup, universe)
+
+        for operand in excluded:
+            if len(result) == 0:
+                return result
+            result = result - operand.evaluate(lookup, universe)
+
+        return result
+
+
+class QueryOr(MovieQuery):
+
+    def __init__(self, operands: List[MovieQuery]):
+        self.operands = operands
+
+    def __str__(self) -> str:
+        return '(' + ' OR '.join(str(operand) for operand in self.operands) + ')'
+
+    def estimate(self, lookup: Lookup, universe: RankBitmap) -> int:
+        return min(len(universe), sum(operand.estimate(lookup, universe) for operand in self.operands))
+
+    def evaluate(self, lookup: Lookup, universe: RankBitmap) -> RankBitmap:
+        result = RankBitmap()
+        for operand in self.operands:
+            result = result | operand.evaluate(lookup, universe)
+        return result
+
+
+class QueryParser:
+    """ Parses query text with a recursive descent over its tokens. NOT binds tightest, then AND, then OR, and
+    adjacent terms are joined with AND, so 'genre:Action NOT genre:Horror' is 'genre:Action AND NOT genre:Horror'.
+
+    Repeated NOTs cancel out in pairs, and parentheses may be nested at most MAX_QUERY_DEPTH deep.
+    """
+
+    def __init__(self, text: str):
+        self.__tokens = list()
+        position = 0
+        text = text.rstrip()
+
+        while position < len(text):
+            match = TOKEN_PATTERN.match(text, position)
+            if match is None:
+                raise MovieQueryException(f'Query cannot be read from position {position}')
+            self.__tokens.append(match.groups())
+            position = match.end()
+
+        self.__position = 0
+        self.__depth = 0
+
+    def parse(self) -> MovieQuery:
+        if len(self.__tokens) == 0:
+            raise MovieQueryException('Query is empty')
+
+        query = self.__parse_or()
+        if self.__position < len(self.__tokens):
+            raise MovieQueryException(f'Unexpected {self.__describe(self.__tokens[self.__position])} in query')
+        return query
+
+    def __peek_operator(self) -> str:
+        if self.__position < len(self.__tokens):
+            parenthesis, field, quoted_value, value, word = self.__tokens[self.__position]
+            return parenthesis or (word.upper() if word is not None else '')
+        return ''
+
+    def __parse_or(self) -> MovieQuery:
+        operands = [self.__parse_and()]
+        while self.__peek_operator() == 'OR':
+            self.__position += 1
+            operands.append(self.__parse_and())
+        return operands[0] if len(operands) == 1 else QueryOr(operands)
+
+    def __parse_and(self) -> MovieQuery:
+        operands = [self.__parse_not()]
+        while self.__position < len(self.__tokens) and self.__peek_operator() not in ('OR', ')'):
+            if self.__peek_operator() == 'AND':
+                self.__position += 1
+            operands.append(self.__parse_not())
+        return operands[0] if len(operands) == 1 else QueryAnd(operands)
+
+    def __parse_not(self) -> MovieQuery:
+        negated = False
+        while self.__peek_operator() == 'NOT':
+            negated = not negated
+            self.__position += 1
+
+        query = self.__parse_operand()
+        return QueryNot(query) if negated else query
+
+    def __parse_operand(self) -> MovieQuery:
+        if self.__position == len(self.__tokens):
+            raise MovieQueryException('Query ends before an operand')
+
+        parenthesis, field, quoted_value, value, word = self.__tokens[self.__position]
+        self.__position += 1
+
+        if parenthesis == '(':
+            if self.__depth == MAX_QUERY_DEPTH:
+                raise MovieQueryException(f'Query nests parentheses more than {MAX_QUERY_DEPTH} deep')
+            self.__depth += 1
+            query = self.__parse_or()
+            if self.__peek_operator() != ')':
+                raise MovieQueryException('Query has an unclosed parenthesis')
+            self.__position += 1
+            self.__depth -= 1
+            return query
+
+        if field is None:
+            raise MovieQueryException(f'Unexpected {self.__describe(self.__tokens[self.__position - 1])} in query')
+
+        field = field.lower()
+        value = quoted_value if quoted_value is not None else value
+        if field not in QUERY_FIELDS:
+            raise MovieQueryException(f'Query field {field} is not one of {", ".join(QUERY_FIELDS)}')
+        if field == 'year' and YEAR_PATTERN.match(value) is None:
+            raise MovieQueryException(f'Year {value} is neither a year nor a range of years such as 2010..2016')
+
+        return QueryTerm(field, value.strip())
+
+    @staticmethod
+    def __describe(token) -> str:
+        parenthesis, field, quoted_value, value, word = token
+        return f"'{parenthesis or word or field}'"
+
+
+def parse_movie_query(text: str) -> MovieQuery:
+    """ Returns the query in the text, raising MovieQueryException if it is not valid. """
+    return QueryParser(text or '').parse()
+
+
+def year_range(value: str) -> range:
+    """ Returns the years of a year term value, e.g. range(2010, 2017) for '2010..2016'. """
+    first, last = YEAR_PATTERN.match(value).groups()
+    return range(int(first), int(last or first) + 1)
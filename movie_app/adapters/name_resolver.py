@@ -0,0 +1,176 @@
+import heapq
+from typing import Dict, Hashable, Iterable, List, Set, Tuple
+
+from movie_app.adapters.frequency_counter import FrequencyCounter
+from movie_app.adapters.prefix_index import name_key
+
+# Misspelt names are resolved to names at most this many edits away, and each word of the name to words at most
+# word_distance_bound edits away
+MAX_EDIT_DISTANCE = 2
+
+# Deletions are only taken from the first letters of each word, which bounds the number indexed for long words
+DELETE_PREFIX_LENGTH = 7
+
+
+def word_distance_bound(word: str) -> int:
+    """ Returns the number of edits allowed to a word of a name, fewer for short words. """
+    if len(word) <= 2:
+        return 0
+    return 1 if len(word) <= 5 else MAX_EDIT_DISTANCE
+
+
+def deletions(word: str, distance: int) -> Set[str]:
+    """ Returns the strings made by deleting up to distance letters from the start of the word, and the start
+    itself.
+    """
+    variants = {word[:DELETE_PREFIX_LENGTH]}
+    latest = variants
+
+    for _ in range(distance):
+        latest = {variant[:i] + variant[i + 1:] for variant in latest for i in range(len(variant))}
+        variants |= latest
+
+    return variants
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """ Returns the number of insertions, deletions, substitutions and transpositions of adjacent letters turning
+    a into b, or max_distance + 1 if it takes more than max_distance of them.
+    """
+    if a == b:
+        return 0
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+
+    # Only the cells within max_distance of the diagonal can hold a distance up to max_distance, so the others are
+    # left at the cut-off
+    cut_off = max_distance + 1
+    before_previous: List[int] = list()
+    previous = [j if j <= max_distance else cut_off for j in range(len(b) + 1)]
+
+    for i in range(1, len(a) + 1):
+        current = [cut_off] * (len(b) + 1)
+        if i <= max_distance:
+            current[0] = i
+        row_minimum = current[0]
+
+        for j in range(max(1, i - max_distance), min(len(b), i + max_distance) + 1):
+            distance = previous[j - 1] if a[i - 1] == b[j - 1] else previous[j - 1] + 1
+            if previous[j] + 1 < distance:
+                distance = previous[j] + 1
+            if current[j - 1] + 1 < distance:
+                distance = current[j - 1] + 1
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1] and \
+                    before_previous[j - 2] + 1 < distance:
+                distance = before_previous[j - 2] + 1
+            current[j] = distance if distance < cut_off else cut_off
+            if distance < row_minimum:
+                row_minimum = distance
+
+        if row_minimum >= cut_off:
+            return cut_off
+        before_previous, previous = previous, current
+
+    return previous[-1]
+
+
+class NameResolver:
+    """ Resolves names typed with different case, accents or a few typos, such as 'chirs prat' to Chris Pratt.
+
+    Each distinct word of the indexed names is stored under the strings left after deleting up to
+    MAX_EDIT_DISTANCE of its letters. The words near a typed word share one of those strings with it, so they are
+    found with dictionary lookups rather than by comparing the typed word with every word. Only names containing a
+    near word for every typed word are then compared with the typed name as a whole.
+
+    Items are ranked by edit distance, then by their count in the optional FrequencyCounter, and then by name.
+    """
+
+    def __init__(self, counter: FrequencyCounter = None):
+        self.__counter = counter
+        self.__words: List[str] = list()
+        self.__word_ids: Dict[str, int] = dict()
+        self.__word_ids_by_deletion: Dict[str, List[int]] = dict()
+        self.__name_ids_by_word: List[List[int]] = list()
+        self.__name_ids_by_key: Dict[str, List[int]] = dict()
+        self.__names: List[Tuple[str, str, Hashable, Tuple[int, ...]]] = list()
+
+    def __len__(self) -> int:
+        return len(self.__names)
+
+    def add(self, name: str, item: Hashable):
+        key = name_key(name)
+        if not key:
+            return
+
+        name_id = len(self.__names)
+        word_ids = tuple(self.__add_word(word) for word in dict.fromkeys(key.split(' ')))
+        self.__names.append((name, key, item, word_ids))
+        self.__name_ids_by_key.setdefault(key, list()).append(name_id)
+        for word_id in word_ids:
+            self.__name_ids_by_word[word_id].append(name_id)
+
+    def __add_word(self, word: str) -> int:
+        word_id = self.__word_ids.get(word)
+        if word_id is None:
+            word_id = len(self.__words)
+            self.__words.append(word)
+            self.__word_ids[word] = word_id
+            self.__name_ids_by_word.append(list())
+            for variant in deletions(word, MAX_EDIT_DISTANCE):
+                self.__word_ids_by_deletion.setdefault(variant, list()).append(word_id)
+        return word_id
+
+    def __candidate_word_ids(self, word: str) -> Set[int]:
+        # Words sharing a deletion with the typed word, a few of which may be further away than its bound
+        word_ids = set()
+        for variant in deletions(word, word_distance_bound(word)):
+            word_ids.update(self.__word_ids_by_deletion.get(variant, ()))
+        return word_ids
+
+    def __ranked(self, name_ids: Iterable[int], distance: int) -> List[Tuple[int, int, str, int]]:
+        return [(distance, -self.__count(self.__names[name_id][2]), self.__names[name_id][0], name_id)
+                for name_id in name_ids]
+
+    def find(self, name: str) -> List[Hashable]:
+        """ Returns the items with names differing from the name only in case, accents, punctuation or spacing. """
+        return [self.__names[name_id][2] for name_id in self.__name_ids_by_key.get(name_key(name), ())]
+
+    def resolve(self, name: str, quantity: int) -> List[Hashable]:
+        """ Returns up to quantity items with names matching the name, closest first. Names differing only in case,
+        accents, punctuation or spacing match exactly and come before any others.
+        """
+        key = name_key(name)
+        if not key or quantity <= 0:
+            return list()
+
+        exact_name_ids = self.__name_ids_by_key.get(key, ())
+        if len(exact_name_ids) >= quantity:
+            return [self.__names[name_id][2] for *ranking, name_id in heapq.nsmallest(
+                quantity, self.__ranked(exact_name_ids, 0))]
+
+        # Start from the typed word with the fewest candidate names. Only its candidate words are compared with it,
+        # and only the names also containing a candidate word for each other typed word are compared with the name.
+        typed_words = list(dict.fromkeys(key.split(' ')))
+        candidate_word_ids = sorted(
+            ((word, self.__candidate_word_ids(word)) for word in typed_words),
+            key=lambda candidate: sum(len(self.__name_ids_by_word[word_id]) for word_id in candidate[1]))
+        word, word_ids = candidate_word_ids[0]
+        bound = word_distance_bound(word)
+
+        name_ids = set()
+        for word_id in word_ids:
+            if edit_distance(word, self.__words[word_id], bound) <= bound:
+                name_ids.update(self.__name_ids_by_word[word_id])
+
+        matches = list()
+        for name_id in name_ids:
+            candidate_name, candidate_key, item, name_word_ids = self.__names[name_id]
+            if all(not word_ids.isdisjoint(name_word_ids) for word, word_ids in candidate_word_ids[1:]):
+                distance = edit_distance(key, candidate_key, MAX_EDIT_DISTANCE)
+                if distance <= MAX_EDIT_DISTANCE:
+                    matches.extend(self.__ranked([name_id], distance))
+
+        return [self.__names[name_id][2] for *ranking, name_id in heapq.nsmallest(quantity, matches)]
+
+    def __count(self, item: Hashable) -> int:
+        return self.__counter.count(item) if self.__counter is not None else 0
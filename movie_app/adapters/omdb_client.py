@@ -0,0 +1,212 @@
+import time
+from threading import Lock
+from typing import Callable, Dict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from movie_app.prefork import reopen_after_fork
+
+client_instance = None
+
+OMDB_URL = 'http://www.omdbapi.com/'
+
+
+class OMDbException(Exception):
+    def __init__(self, message=None):
+        pass
+
+
+class CircuitOpenException(OMDbException):
+    def __init__(self, message=None):
+        pass
+
+
+class CircuitBreaker:
+    """ Stops calls to a failing service, then lets a single probe through to test whether it has recovered.
+
+    The circuit opens after failure_threshold consecutive failures. Calls then fail fast until reset_timeout_seconds
+    have passed, when the circuit becomes half open and admits one probe call. A successful probe closes the
+    circuit; a failed probe opens it again for another timeout.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout_seconds: float = 30,
+                 clock: Callable[[], float] = time.monotonic):
+        self.__failure_threshold = failure_threshold
+        self.__reset_timeout_seconds = reset_timeout_seconds
+        self.__clock = clock
+        self.__lock = Lock()
+        self.__state = CircuitBreaker.CLOSED
+        self.__consecutive_failures = 0
+        self.__opened_at = 0.0
+        self.__probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self.__lock:
+            if self.__state == CircuitBreaker.OPEN and self.__reset_timeout_has_passed():
+                return CircuitBreaker.HALF_OPEN
+            return self.__state
+
+    def __reset_timeout_has_passed(self) -> bool:
+        return self.__clock() - self.__opened_at >= self.__reset_timeout_seconds
+
+    def allow_request(self) -> bool:
+        with self.__lock:
+            if self.__state == CircuitBreaker.CLOSED:
+                return True
+
+            if self.__state == CircuitBreaker.OPEN and self.__reset_timeout_has_passed():
+                self.__state = CircuitBreaker.HALF_OPEN
+
+            if self.__state == CircuitBreaker.HALF_OPEN and not self.__probe_in_flight:
+                self.__probe_in_flight = True
+                return True
+
+            return False
+
+    def record_success(self):
+        with self.__lock:
+            # Calls started before the circuit opened may still finish, and must not close it
+            if self.__state != CircuitBreaker.OPEN:
+                self.__state = CircuitBreaker.CLOSED
+                self.__consecutive_failures = 0
+                self.__probe_in_flight = False
+
+    def record_failure(self):
+        with self.__lock:
+            if self.__state == CircuitBreaker.OPEN:
+                return
+
+            self.__consecutive_failures += 1
+            self.__probe_in_flight = False
+
+            if self.__state == CircuitBreaker.HALF_OPEN or self.__consecutive_failures >= self.__failure_threshold:
+                self.__state = CircuitBreaker.OPEN
+                self.__opened_at = self.__clock()
+
+
+class RetryBudget:
+    """ Limits retries to a fraction of recent requests, so retries cannot multiply the load on a failing service.
+
+    Every request deposits ratio tokens and every retry withdraws one. The balance starts at, and is capped at,
+    max_tokens, which allows a few retries after a quiet period.
+    """
+
+    def __init__(self, ratio: float = 0.2, max_tokens: float = 10):
+        self.__ratio = ratio
+        self.__max_tokens = max_tokens
+        self.__tokens = max_tokens
+        self.__lock = Lock()
+
+    @property
+    def tokens(self) -> float:
+        return self.__tokens
+
+    def deposit(self):
+        with self.__lock:
+            self.__tokens = min(self.__max_tokens, self.__tokens + self.__ratio)
+
+    def withdraw(self) -> bool:
+        with self.__lock:
+            if self.__tokens < 1:
+                return False
+            self.__tokens -= 1
+            return True
+
+
+class OMDbClient:
+    """ Client for the OMDb API with connect and read timeouts, retries limited by a budget, and a circuit breaker.
+
+    Connections are kept alive in a pool of pool_size connections, which should be at least the number of threads
+    using the client concurrently.
+    """
+
+    def __init__(self, api_key: str, base_url: str = OMDB_URL, connect_timeout_seconds: float = 1.0,
+                 read_timeout_seconds: float = 2.0, max_attempts: int = 2, pool_size: int = 8,
+                 retry_budget: RetryBudget = None, circuit_breaker: CircuitBreaker = None):
+        self.__api_key = api_key
+        self.__base_url = base_url
+        self.__timeout = (connect_timeout_seconds, read_timeout_seconds)
+        self.__max_attempts = max_attempts
+        self.__retry_budget = retry_budget if retry_budget is not None else RetryBudget()
+        self.__circuit_breaker = circuit_breaker if circuit_breaker is not None else CircuitBreaker()
+        self.__lock = Lock()
+        self.__stats: Dict[str, int] = {'requests': 0, 'retries': 0, 'failures': 0, 'rejected': 0}
+
+        self.__pool_size = pool_size
+        self.__session = self.__create_session()
+
+        # Pooled connections must not be shared with a parent process, so a forked worker opens its own
+        reopen_after_fork(self)
+
+    def __create_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.__pool_size)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def reopen(self):
+        """ Replaces the pooled connections and the lock guarding the statistics. """
+        self.__lock = Lock()
+        self.__session = self.__create_session()
+
+    @property
+    def circuit_breaker(self) -> CircuitBreaker:
+        return self.__circuit_breaker
+
+    @property
+    def stats(self) -> Dict:
+        with self.__lock:
+            stats = dict(self.__stats)
+        stats['circuit'] = self.__circuit_breaker.state
+        stats['retry_tokens'] = self.__retry_budget.tokens
+        return stats
+
+    def __count(self, name: str):
+        with self.__lock:
+            self.__stats[name] += 1
+
+    def get_movie_info(self, movie_title: str, release_year: int = None) -> Dict:
+        """ Returns the OMDb record of the given movie.
+
+        Responses for movies that OMDb does not know are returned as they are. Timeouts, connection errors and
+        server errors are retried while the retry budget allows, after which OMDbException is raised. While the
+        circuit is open this method raises CircuitOpenException without contacting OMDb.
+        """
+        params = {'t': movie_title, 'apikey': self.__api_key}
+        if release_year is not None:
+            params['y'] = release_year
+
+        self.__retry_budget.deposit()
+
+        for attempt in range(self.__max_attempts):
+            if attempt > 0:
+                if not self.__retry_budget.withdraw():
+                    break
+                self.__count('retries')
+
+            if not self.__circuit_breaker.allow_request():
+                self.__count('rejected')
+                raise CircuitOpenException(f"OMDb circuit is open, not looking up {movie_title}")
+
+            self.__count('requests')
+            try:
+                response = self.__session.get(self.__base_url, params=params, timeout=self.__timeout)
+                if response.status_code >= 500:
+                    raise OMDbException(f"OMDb responded with status {response.status_code}")
+                movie_info = response.json()
+            except (requests.RequestException, ValueError, OMDbException):
+                self.__count('failures')
+                self.__circuit_breaker.record_failure()
+                continue
+
+            self.__circuit_breaker.record_success()
+            return movie_info
+
+        raise OMDbException(f"OMDb lookup of {movie_title} failed")
@@ -0,0 +1,169 @@
+"""Local stand-in for the OMDb API, for exercising the poster lookups of CS235Flix without network access.
+
+Run from the CS235Flix directory:
+
+    $ python -m movie_app.adapters.omdb_standin --port 8081 --latency 0.2 --failure-rate 0.1
+
+then point the app at it by setting OMDB_URL = 'http://127.0.0.1:8081/' in the .env file.
+
+Every title is found, with a poster URL derived from the title, except for a deterministic not_found_rate share of
+titles. The server also serves those posters, as plain PNG images. Each response is delayed by latency seconds, plus
+up to jitter seconds. A failure_rate share of requests is answered with 503 Service Unavailable, and a hang_rate
+share is held for hang_seconds before being answered, which is longer than any sensible client read timeout.
+"""
+import argparse
+import json
+import random
+import struct
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from typing import Dict
+from urllib.parse import parse_qs, urlparse, quote, unquote
+
+
+class StandInSettings:
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, failure_rate: float = 0.0,
+                 hang_rate: float = 0.0, hang_seconds: float = 30.0, not_found_rate: float = 0.0, seed: int = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.not_found_rate = not_found_rate
+        self.random = random.Random(seed)
+        self.lock = Lock()
+        self.stats: Dict[str, int] = {'requests': 0, 'failures': 0, 'hangs': 0, 'not_found': 0, 'poster_requests': 0}
+
+    def count(self, name: str):
+        with self.lock:
+            self.stats[name] += 1
+
+    def draw(self) -> float:
+        with self.lock:
+            return self.random.random()
+
+
+def title_is_found(movie_title: str, not_found_rate: float) -> bool:
+    return zlib.crc32(movie_title.encode()) % 1000 >= not_found_rate * 1000
+
+
+def poster_image(movie_title: str, width: int = 300, height: int = 444) -> bytes:
+    """ Returns a PNG image of a single colour derived from the title. """
+    colour = struct.pack('>I', zlib.crc32(movie_title.encode()))[:3]
+    rows = b''.join(b'\x00' + colour * width for _ in range(height))
+
+    def chunk(chunk_type: bytes, data: bytes) -> bytes:
+        return struct.pack('>I', len(data)) + chunk_type + data + struct.pack('>I', zlib.crc32(chunk_type + data))
+
+    return b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)) + \
+        chunk(b'IDAT', zlib.compress(rows)) + chunk(b'IEND', b'')
+
+
+class StandInRequestHandler(BaseHTTPRequestHandler):
+    settings: StandInSettings = None
+
+    def do_GET(self):
+        settings = self.settings
+        url = urlparse(self.path)
+
+        if url.path.startswith('/posters/'):
+            self.__respond_with_poster(unquote(url.path[len('/posters/'):-len('.png')]))
+            return
+
+        settings.count('requests')
+        params = {name: values[0] for name, values in parse_qs(url.query).items()}
+
+        delay = settings.latency + settings.jitter * settings.draw()
+        outcome = settings.draw()
+
+        if outcome < settings.hang_rate:
+            settings.count('hangs')
+            delay = settings.hang_seconds
+        elif outcome < settings.hang_rate + settings.failure_rate:
+            settings.count('failures')
+            time.sleep(delay)
+            self.__respond(503, {'Response': 'False', 'Error': 'Service unavailable'})
+            return
+
+        time.sleep(delay)
+
+        movie_title = params.get('t', '')
+        if not movie_title or not title_is_found(movie_title, settings.not_found_rate):
+            settings.count('not_found')
+            self.__respond(200, {'Response': 'False', 'Error': 'Movie not found!'})
+            return
+
+        self.__respond(200, {
+            'Title': movie_title,
+            'Year': params.get('y', 'N/A'),
+            'Poster': f"http://{self.headers.get('Host', 'localhost')}/posters/{quote(movie_title)}.png",
+            'Response': 'True'
+        })
+
+    def __respond_with_poster(self, movie_title: str):
+        self.settings.count('poster_requests')
+        content = poster_image(movie_title)
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/png')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def __respond(self, status: int, body: Dict):
+        content = json.dumps(body).encode()
+        try:
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+        except OSError:
+            pass    # Ignore exception, the client gave up waiting for the response
+
+    def log_message(self, format, *args):
+        pass    # Keep load tests quiet
+
+
+def create_server(settings: StandInSettings, host: str = '127.0.0.1', port: int = 0) -> ThreadingHTTPServer:
+    """ Returns a stand-in server bound to the given port, or to a free port if port is 0. """
+    handler = type('ConfiguredStandInRequestHandler', (StandInRequestHandler,), {'settings': settings})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def start_in_background(settings: StandInSettings, host: str = '127.0.0.1', port: int = 0):
+    """ Starts a stand-in server on a daemon thread and returns it along with its base URL. """
+    server = create_server(settings, host, port)
+    Thread(target=server.serve_forever, args=(0.05,), daemon=True, name='omdb-standin').start()
+    return server, f"http://{host}:{server.server_address[1]}/"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='maximum random seconds added to the latency')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='share of requests answered with 503')
+    parser.add_argument('--hang-rate', type=float, default=0.0, help='share of requests held for --hang-seconds')
+    parser.add_argument('--hang-seconds', type=float, default=30.0)
+    parser.add_argument('--not-found-rate', type=float, default=0.0, help='share of titles without a record')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    settings = StandInSettings(args.latency, args.jitter, args.failure_rate, args.hang_rate, args.hang_seconds,
+                               args.not_found_rate, args.seed)
+    server = create_server(settings, args.host, args.port)
+    print(f"OMDb stand-in listening on http://{args.host}:{server.server_address[1]}/")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(settings.stats)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+import sqlite3
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Dict, Optional, Tuple
+
+from movie_app.prefork import reopen_after_fork
+
+cache_instance = None
+
+# Returned by PosterCache.get when there is no usable cache entry, as None is a valid (negative) cached result.
+MISSING = object()
+
+
+class PosterCache:
+    """ Two-tier cache of movie poster URLs keyed by movie title and release year.
+
+    The first tier is an in-process LRU dictionary. The second, optional tier is a SQLite file shared by every
+    process of the app, so a poster resolved by one worker, or before a restart, is not fetched again. Lookups that
+    found no poster are cached as None, with a shorter time to live than positive results.
+    """
+
+    def __init__(self, file_name: str = None, capacity: int = 4096, ttl_seconds: float = 30 * 24 * 60 * 60,
+                 negative_ttl_seconds: float = 24 * 60 * 60, clock: Callable[[], float] = time.time):
+        self.__capacity = capacity
+        self.__ttl_seconds = ttl_seconds
+        self.__negative_ttl_seconds = negative_ttl_seconds
+        self.__clock = clock
+        self.__entries: 'OrderedDict[Tuple[str, int], Tuple[Optional[str], float]]' = OrderedDict()
+        self.__lock = Lock()
+        self.__stats: Dict[str, int] = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0}
+
+        self.__file_name = file_name
+        self.__connection = None
+        if file_name is not None:
+            self.__connection = sqlite3.connect(file_name, check_same_thread=False, timeout=5)
+            with self.__connection:
+                self.__connection.execute('CREATE TABLE IF NOT EXISTS posters (title TEXT NOT NULL, '
+                                          'release_year INTEGER NOT NULL, url TEXT, fetched_at REAL NOT NULL, '
+                                          'PRIMARY KEY (title, release_year))')
+
+        # A forked worker starts with a lock and SQLite connection of its own
+        reopen_after_fork(self)
+
+    def reopen(self):
+        """ Replaces the lock and the connection to the persistent tier, keeping the cached entries. """
+        self.__lock = Lock()
+        if self.__file_name is not None:
+            self.__connection = sqlite3.connect(self.__file_name, check_same_thread=False, timeout=5)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        with self.__lock:
+            stats = dict(self.__stats)
+            stats['hits'] = stats['memory_hits'] + stats['disk_hits']
+            stats['size'] = len(self.__entries)
+        return stats
+
+    def __is_fresh(self, url: Optional[str], fetched_at: float) -> bool:
+        ttl_seconds = self.__ttl_seconds if url is not None else self.__negative_ttl_seconds
+        return self.__clock() - fetched_at < ttl_seconds
+
+    def __remember(self, key: Tuple[str, int], url: Optional[str], fetched_at: float):
+        # Caller holds the lock
+        self.__entries[key] = (url, fetched_at)
+        self.__entries.move_to_end(key)
+
+        while len(self.__entries) > self.__capacity:
+            self.__entries.popitem(last=False)
+            self.__stats['evictions'] += 1
+
+    def get(self, title: str, release_year: int = None):
+        """ Returns the cached poster URL (or None for a cached negative result) for the given movie.
+
+        If there is no fresh entry in either tier, this method returns MISSING.
+        """
+        key = (title, release_year or 0)
+
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None and self.__is_fresh(*entry):
+                self.__entries.move_to_end(key)
+                self.__stats['memory_hits'] += 1
+                return entry[0]
+
+            if self.__connection is not None:
+                row = self.__connection.execute('SELECT url, fetched_at FROM posters WHERE title = ? AND '
+                                                'release_year = ?', key).fetchone()
+                if row is not None and self.__is_fresh(*row):
+                    self.__remember(key, *row)
+                    self.__stats['disk_hits'] += 1
+                    return row[0]
+
+            self.__stats['misses'] += 1
+            return MISSING
+
+    def put(self, title: str, release_year: int, url: Optional[str]):
+        """ Stores the poster URL for the given movie in both tiers. A url of None records that there is no poster.
+        """
+        key = (title, release_year or 0)
+        fetched_at = self.__clock()
+
+        with self.__lock:
+            self.__remember(key, url, fetched_at)
+
+            if self.__connection is not None:
+                with self.__connection:
+                    self.__connection.execute('INSERT OR REPLACE INTO posters VALUES (?, ?, ?, ?)',
+                                              (key[0], key[1], url, fetched_at))
+
+    def clear(self):
+        """ Empties the in-process tier, leaving the persistent tier untouched. """
+        with self.__lock:
+            self.__entries.clear()
@@ -0,0 +1,271 @@
+"""Resolves movie posters ahead of page views, offline or in the background.
+
+Run the enrichment job from the CS235Flix directory:
+
+    $ python -m movie_app.adapters.poster_enrichment --workers 8
+
+It looks up the poster of every movie in the movie data file with at most --workers concurrent OMDb requests, and
+appends the results to the poster data file loaded by MemoryRepository.populate. The poster file doubles as the
+job's checkpoint: results are flushed to it every --checkpoint-every movies, and movies already in it are skipped,
+so an interrupted job continues where it stopped when run again. Movies whose lookups fail are not written, and
+are retried by the next run. When a poster directory is configured, the posters are also copied to it along with
+their thumbnails, ready for the poster proxy.
+"""
+import argparse
+import csv
+import logging
+import os
+import time
+from concurrent import futures
+from threading import Event, Thread
+from typing import Dict, Iterator, Optional, Set, Tuple
+
+from config import Config, DataPaths
+from movie_app.adapters.omdb_client import OMDbClient, OMDbException, CircuitOpenException, OMDB_URL
+from movie_app.datafilereaders.poster_file_csv_reader import POSTER_FILE_COLUMNS
+from movie_app.adapters.poster_store import PosterStore, PosterStoreException
+import movie_app.adapters.poster_cache as poster_cache
+
+logger = logging.getLogger(__name__)
+
+# Background poster warm-up created by create_app, started there or, under a pre-fork server, in one worker
+warm_up_instance = None
+
+OMDB_MOVIE_NOT_FOUND = "Movie not found!"
+OMDB_NO_POSTER = "N/A"
+
+
+def resolve_poster_url(client: OMDbClient, cache, movie_title: str, release_year: int = None) -> Optional[str]:
+    """ Returns the poster URL of the given movie from the cache, or from OMDb on a cache miss.
+
+    Definite answers from OMDb, including that the movie has no poster, are stored in the cache. Errors, such as an
+    exceeded request limit, are not, so they are retried by the next lookup. OMDbException is raised if OMDb
+    cannot be reached.
+    """
+    if cache is not None:
+        poster_url = cache.get(movie_title, release_year)
+        if poster_url is not poster_cache.MISSING:
+            return poster_url
+
+    poster_url, is_definite = lookup_poster_url(client, movie_title, release_year)
+
+    if cache is not None and is_definite:
+        cache.put(movie_title, release_year, poster_url)
+
+    return poster_url
+
+
+def lookup_poster_url(client: OMDbClient, movie_title: str, release_year: int = None) -> Tuple[Optional[str], bool]:
+    """ Returns the poster URL of the given movie from OMDb, and whether OMDb gave a definite answer. """
+    movie_info = client.get_movie_info(movie_title, release_year)
+    poster_url = movie_info.get("Poster")
+
+    if poster_url == OMDB_NO_POSTER:
+        poster_url = None
+
+    return poster_url, "Poster" in movie_info.keys() or movie_info.get("Error") == OMDB_MOVIE_NOT_FOUND
+
+
+def read_catalogue(file_name: str) -> Iterator[Tuple[int, str, int]]:
+    """ Yields the rank, title and release year of each movie in a movie data file, without building Movies. """
+    with open(file_name, mode='r', encoding='utf-8-sig') as csv_file:
+        for row in csv.DictReader(csv_file):
+            try:
+                yield int(row['Rank']), row['Title'].strip(), int(row['Year'])
+            except (ValueError, TypeError, AttributeError):
+                pass    # Ignore exception and skip movies with a malformed rank, title or year
+
+
+def read_completed_movies(file_name: str) -> Set[Tuple[str, int]]:
+    """ Returns the title and release year of each movie already in the poster data file.
+
+    A partial last line, left by a job that was stopped while writing, is removed from the file.
+    """
+    if not os.path.exists(file_name):
+        return set()
+
+    with open(file_name, mode='rb+') as poster_file:
+        content = poster_file.read()
+        if content and not content.endswith(b'\n'):
+            poster_file.truncate(content.rfind(b'\n') + 1)
+
+    with open(file_name, mode='r', encoding='utf-8-sig') as csv_file:
+        completed = set()
+        for row in csv.DictReader(csv_file):
+            try:
+                completed.add((row['Title'].strip(), int(row['Year'])))
+            except (ValueError, TypeError, AttributeError):
+                pass    # Ignore exception and look up the movie again
+
+        return completed
+
+
+def enrich_posters(movie_file_name: str, poster_file_name: str, client: OMDbClient, workers: int = 8,
+                   checkpoint_every: int = 100, limit: int = None, circuit_wait_seconds: float = 5.0,
+                   store: PosterStore = None) -> Dict[str, int]:
+    """ Looks up the poster of each movie in the movie data file that is not yet in the poster data file.
+
+    If a poster store is given, each poster found is also copied to the store, along with its thumbnails.
+    Returns the number of movies resolved, found without a poster, failed and skipped as already resolved.
+    """
+    completed = read_completed_movies(poster_file_name)
+    stats = {'resolved': 0, 'no_poster': 0, 'failed': 0, 'skipped': 0}
+    pending_rows = []
+
+    def look_up(movie_title: str, release_year: int):
+        # Wait out an open circuit instead of failing every remaining movie while OMDb is down
+        for _ in range(3):
+            try:
+                result = lookup_poster_url(client, movie_title, release_year)
+                break
+            except CircuitOpenException:
+                time.sleep(circuit_wait_seconds)
+        else:
+            result = lookup_poster_url(client, movie_title, release_year)
+
+        poster_url, is_definite = result
+        if store is not None and poster_url is not None:
+            # A poster that cannot be copied now is copied by the poster proxy when it is first requested
+            try:
+                store.store_from_url(movie_title, release_year, poster_url)
+            except PosterStoreException:
+                pass    # Ignore exception and keep the poster URL
+
+        return result
+
+    def collect(done_futures):
+        for future in done_futures:
+            rank, movie_title, release_year = in_flight.pop(future)
+            try:
+                poster_url, is_definite = future.result()
+            except OMDbException:
+                is_definite = False
+
+            if not is_definite:
+                stats['failed'] += 1
+                continue
+
+            stats['resolved' if poster_url is not None else 'no_poster'] += 1
+            pending_rows.append([rank, movie_title, release_year, poster_url or ''])
+
+    is_new_file = not os.path.exists(poster_file_name) or os.path.getsize(poster_file_name) == 0
+    with open(poster_file_name, mode='a', encoding='utf-8', newline='') as poster_file, \
+            futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix='enrichment') as executor:
+        writer = csv.writer(poster_file)
+        if is_new_file:
+            writer.writerow(POSTER_FILE_COLUMNS)
+
+        in_flight: Dict[futures.Future, Tuple[int, str, int]] = dict()
+        submitted = 0
+
+        for rank, movie_title, release_year in read_catalogue(movie_file_name):
+            if (movie_title, release_year) in completed:
+                stats['skipped'] += 1
+                continue
+            if limit is not None and submitted >= limit:
+                break
+
+            # Keep the number of queued lookups bounded, so large catalogues are streamed rather than loaded
+            if len(in_flight) >= workers * 2:
+                done, _ = futures.wait(in_flight.keys(), return_when=futures.FIRST_COMPLETED)
+                collect(done)
+
+            in_flight[executor.submit(look_up, movie_title, release_year)] = (rank, movie_title, release_year)
+            completed.add((movie_title, release_year))
+            submitted += 1
+
+            if len(pending_rows) >= checkpoint_every:
+                write_checkpoint(poster_file, writer, pending_rows)
+
+        collect(futures.wait(in_flight.keys()).done)
+        write_checkpoint(poster_file, writer, pending_rows)
+
+    return stats
+
+
+def write_checkpoint(poster_file, writer, pending_rows):
+    writer.writerows(pending_rows)
+    pending_rows.clear()
+    poster_file.flush()
+    os.fsync(poster_file.fileno())
+
+
+class PosterWarmUp(Thread):
+    """ Background thread that resolves, one at a time, the posters missing from the repository and the cache.
+
+    Lookups are spaced interval_seconds apart, and paused for pause_seconds whenever OMDb cannot be reached, so the
+    warm-up never competes with page views for OMDb requests.
+    """
+
+    def __init__(self, repository, client: OMDbClient, cache, interval_seconds: float = 0.2,
+                 pause_seconds: float = 30.0):
+        super().__init__(name='poster-warm-up', daemon=True)
+        self.__repository = repository
+        self.__client = client
+        self.__cache = cache
+        self.__interval_seconds = interval_seconds
+        self.__pause_seconds = pause_seconds
+        self.__stopped = Event()
+        self.__resolved = 0
+
+    @property
+    def resolved(self) -> int:
+        return self.__resolved
+
+    def stop(self):
+        self.__stopped.set()
+
+    def run(self):
+        for movie in self.__repository.get_movies_without_poster_urls():
+            if self.__stopped.is_set():
+                return
+
+            if self.__cache.get(movie.title, movie.release_year) is not poster_cache.MISSING:
+                continue
+
+            try:
+                resolve_poster_url(self.__client, self.__cache, movie.title, movie.release_year)
+                self.__resolved += 1
+            except OMDbException:
+                logger.info('Poster warm-up paused, OMDb is unavailable')
+                self.__stopped.wait(self.__pause_seconds)
+                continue
+
+            self.__stopped.wait(self.__interval_seconds)
+
+
+def start_warm_up():
+    """ Starts, in this process, the poster warm-up created by create_app if it has not been started yet.
+
+    Threads are not copied into forked processes, so a pre-fork server calls this in a worker after forking it.
+    """
+    if warm_up_instance is not None and warm_up_instance.ident is None:
+        warm_up_instance.start()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--movies', default=DataPaths.PROD_DATA_PATHS['movies'], help='movie data file')
+    parser.add_argument('--output', default=DataPaths.PROD_DATA_PATHS['posters'], help='poster data file')
+    parser.add_argument('--workers', type=int, default=8, help='maximum concurrent OMDb requests')
+    parser.add_argument('--checkpoint-every', type=int, default=100)
+    parser.add_argument('--limit', type=int, default=None, help='maximum movies to look up in this run')
+    parser.add_argument('--omdb-url', default=Config.OMDB_URL or OMDB_URL)
+    parser.add_argument('--poster-directory', default=Config.POSTER_DIRECTORY,
+                        help='poster store to copy posters and thumbnails to')
+    args = parser.parse_args()
+
+    client = OMDbClient(Config.OMDB_KEY, base_url=args.omdb_url, pool_size=args.workers,
+                        connect_timeout_seconds=Config.OMDB_CONNECT_TIMEOUT_SECONDS,
+                        read_timeout_seconds=Config.OMDB_READ_TIMEOUT_SECONDS)
+
+    start = time.perf_counter()
+    store = PosterStore(args.poster_directory) if args.poster_directory else None
+    stats = enrich_posters(args.movies, args.output, client, args.workers, args.checkpoint_every, args.limit,
+                           store=store)
+    print(f"{stats['resolved']} posters resolved, {stats['no_poster']} movies without posters, "
+          f"{stats['failed']} failed and {stats['skipped']} already resolved in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+import hashlib
+import io
+import os
+from pathlib import Path
+from threading import Lock, get_ident
+from typing import Dict, Optional, Tuple
+
+import requests
+from PIL import Image
+
+store_instance = None
+
+ORIGINAL = 'original'
+
+# Heights, in pixels, of the thumbnails generated for each poster. They match the heights the stylesheet displays
+# posters at on the browse pages and in the sidebar.
+THUMBNAIL_HEIGHTS = {'large': 400, 'small': 200}
+
+IMAGE_SIGNATURES = (
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+    (b'RIFF', 'image/webp')
+)
+
+
+class PosterStoreException(Exception):
+    def __init__(self, message=None):
+        pass
+
+
+class StoredPoster:
+    def __init__(self, path: str, etag: str, mimetype: str):
+        self.__path = path
+        self.__etag = etag
+        self.__mimetype = mimetype
+
+    @property
+    def path(self) -> str:
+        return self.__path
+
+    @property
+    def etag(self) -> str:
+        return self.__etag
+
+    @property
+    def mimetype(self) -> str:
+        return self.__mimetype
+
+
+def guess_image_type(image_bytes: bytes) -> Optional[str]:
+    for signature, mimetype in IMAGE_SIGNATURES:
+        if image_bytes.startswith(signature):
+            return mimetype
+    return None
+
+
+def download_image(url: str, session: requests.Session = None, timeout: Tuple[float, float] = (1.0, 5.0),
+                   max_bytes: int = 5 * 1024 * 1024) -> bytes:
+    """ Returns the bytes of the image at the given URL.
+
+    Raises PosterStoreException if the image cannot be downloaded, is larger than max_bytes or is not an image.
+    """
+    try:
+        with (session or requests).get(url, timeout=timeout, stream=True) as response:
+            response.raise_for_status()
+
+            image_bytes = bytearray()
+            for chunk in response.iter_content(64 * 1024):
+                image_bytes.extend(chunk)
+                if len(image_bytes) > max_bytes:
+                    raise PosterStoreException(f"Poster at {url} is larger than {max_bytes} bytes")
+    except requests.RequestException:
+        raise PosterStoreException(f"Poster at {url} could not be downloaded")
+
+    if guess_image_type(bytes(image_bytes)) is None:
+        raise PosterStoreException(f"Poster at {url} is not an image")
+
+    return bytes(image_bytes)
+
+
+class PosterStore:
+    """ Local copies of movie posters, along with downscaled thumbnails generated when each poster is stored.
+
+    Each version of a poster is a file named after its movie, so every process of the app shares the store. Files
+    are written to a temporary name and renamed, so readers never see a partly written poster.
+    """
+
+    def __init__(self, directory: str, thumbnail_heights: Dict[str, int] = None):
+        self.__directory = Path(directory)
+        self.__directory.mkdir(parents=True, exist_ok=True)
+        self.__thumbnail_heights = dict(THUMBNAIL_HEIGHTS if thumbnail_heights is None else thumbnail_heights)
+        self.__lock = Lock()
+        self.__etags: Dict[Tuple[str, int, int], str] = dict()
+
+    @property
+    def sizes(self):
+        return [ORIGINAL] + list(self.__thumbnail_heights.keys())
+
+    def __path(self, movie_title: str, release_year: int, size: str) -> Path:
+        movie_digest = hashlib.sha1(f"{movie_title}\n{release_year or 0}".encode()).hexdigest()
+        return self.__directory.joinpath(f"{movie_digest}.{size}")
+
+    def __etag(self, path: Path) -> Optional[str]:
+        # ETags are the hash of a file's contents, remembered until the file is replaced
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+
+        key = (str(path), stat.st_mtime_ns, stat.st_size)
+        with self.__lock:
+            etag = self.__etags.get(key)
+
+        if etag is None:
+            etag = hashlib.sha256(path.read_bytes()).hexdigest()
+            with self.__lock:
+                self.__etags[key] = etag
+
+        return etag
+
+    def get(self, movie_title: str, release_year: int, size: str = ORIGINAL) -> Optional[StoredPoster]:
+        """ Returns the stored poster of the given movie at the given size.
+
+        If the size has no thumbnail, for instance because Pillow is not installed, the original poster is
+        returned instead. If there is no stored poster for the movie, this method returns None.
+        """
+        if size not in self.sizes:
+            raise PosterStoreException(f"Unknown poster size {size}")
+
+        for candidate in (size, ORIGINAL):
+            path = self.__path(movie_title, release_year, candidate)
+            etag = self.__etag(path)
+            if etag is not None:
+                with open(path, mode='rb') as poster_file:
+                    mimetype = guess_image_type(poster_file.read(16)) or 'application/octet-stream'
+                return StoredPoster(str(path), etag, mimetype)
+
+        return None
+
+    def put(self, movie_title: str, release_year: int, image_bytes: bytes):
+        """ Stores the poster of the given movie and generates its thumbnails. """
+        if guess_image_type(image_bytes) is None:
+            raise PosterStoreException(f"Poster of {movie_title} is not an image")
+
+        self.__write(self.__path(movie_title, release_year, ORIGINAL), image_bytes)
+
+        try:
+            with Image.open(io.BytesIO(image_bytes)) as image:
+                image = image.convert('RGB')
+                for size, height in self.__thumbnail_heights.items():
+                    thumbnail = image.copy()
+                    thumbnail.thumbnail((10 * height, height), Image.LANCZOS)
+                    thumbnail_bytes = io.BytesIO()
+                    thumbnail.save(thumbnail_bytes, format='JPEG', quality=85, optimize=True, progressive=True)
+                    self.__write(self.__path(movie_title, release_year, size), thumbnail_bytes.getvalue())
+        except (OSError, ValueError):
+            pass    # Ignore exception, the original poster is served when there is no thumbnail
+
+    def __write(self, path: Path, content: bytes):
+        temp_path = path.with_name(f"{path.name}.{os.getpid()}.{get_ident()}.tmp")
+        temp_path.write_bytes(content)
+        os.replace(temp_path, path)
+
+    def store_from_url(self, movie_title: str, release_year: int, url: str, session: requests.Session = None):
+        """ Downloads the poster at the given URL and stores it for the given movie. """
+        self.put(movie_title, release_year, download_image(url, session))
@@ -0,0 +1,87 @@
+import heapq
+import re
+from bisect import bisect_left
+from typing import Dict, Hashable, List, Tuple
+
+from movie_app.adapters.frequency_counter import FrequencyCounter
+from movie_app.adapters.text_index import fold_text
+
+NAME_WORD_PATTERN = re.compile(r'[a-z0-9]+')
+
+# Completions of prefixes matching at least this many names are remembered until counts change, as ranking those
+# names costs more than finding them
+CACHED_MATCH_COUNT = 256
+MAX_CACHED_PREFIXES = 4096
+
+
+def name_key(name: str) -> str:
+    """ Returns the name case folded, without accents and with its words separated by single spaces. """
+    return ' '.join(NAME_WORD_PATTERN.findall(fold_text(name or '')))
+
+
+class PrefixIndex:
+    """ Completes name prefixes to the items with the most Movies, such as 'chris p' to Chris Pratt.
+
+    The index is a sorted array of name keys, so the keys starting with a prefix are found with two binary searches.
+    Each name is also indexed from the start of every later word in it, so 'pratt' completes to Chris Pratt too.
+    Items are ranked by their count in the repository's FrequencyCounter, and then by name.
+    """
+
+    def __init__(self, counter: FrequencyCounter):
+        self.__counter = counter
+        self.__entries: List[Tuple[str, str, Hashable]] = list()
+        self.__columns: Tuple[List[str], List[Tuple[str, Hashable]]] = (list(), list())
+        self.__is_sorted = True
+        self.__cache: Dict[Tuple[str, int], Tuple[int, List[Hashable]]] = dict()
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def add(self, name: str, item: Hashable):
+        words = name_key(name).split(' ')
+        for i in range(len(words)):
+            if words[i]:
+                self.__entries.append((' '.join(words[i:]), name, item))
+        self.__is_sorted = False
+
+    def __sorted_columns(self) -> Tuple[List[str], List[Tuple[str, Hashable]]]:
+        if not self.__is_sorted:
+            # Readers may use the columns while they are rebuilt, so both are replaced together in one assignment
+            entries = sorted(self.__entries, key=lambda entry: entry[:2])
+            self.__entries = entries
+            self.__columns = ([key for key, name, item in entries], [(name, item) for key, name, item in entries])
+            self.__is_sorted = True
+            self.__cache = dict()
+
+        return self.__columns
+
+    def complete(self, prefix: str, quantity: int) -> List[Hashable]:
+        """ Returns up to quantity items with a name, or a word in their name, starting with the prefix. """
+        key = name_key(prefix)
+        if not key or quantity <= 0:
+            return list()
+
+        # A prefix ending in a space or punctuation ends with a whole word, so 'chris ' does not complete to Christian
+        prefix = key + ' ' if not NAME_WORD_PATTERN.fullmatch(fold_text(prefix[-1])) else key
+
+        keys, names_and_items = self.__sorted_columns()
+        cache_key = (prefix, quantity)
+        version = self.__counter.total
+
+        cached = self.__cache.get(cache_key)
+        if cached is not None and cached[0] == version:
+            return list(cached[1])
+
+        start = bisect_left(keys, prefix)
+        stop = bisect_left(keys, prefix + '\uffff', start)
+        candidates = dict(names_and_items[start:stop])
+
+        completions = [item for name, item in heapq.nsmallest(
+            quantity, candidates.items(), key=lambda candidate: (-self.__counter.count(candidate[1]), candidate[0]))]
+
+        if stop - start >= CACHED_MATCH_COUNT:
+            if len(self.__cache) >= MAX_CACHED_PREFIXES:
+                self.__cache = dict()
+            self.__cache[cache_key] = (version, completions)
+
+        return list(completions)
@@ -0,0 +1,113 @@
+import sys
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Dict, Hashable, Iterable, List, Set, Tuple
+
+from movie_app.prefork import reopen_after_fork
+
+# Bytes counted towards the memory budget for each entry besides its result list, for the key, the tags and the
+# dictionaries holding them. The items of a result are shared with the repository's indexes, so are not counted.
+ENTRY_OVERHEAD_BYTES = 512
+
+
+class QueryCache:
+    """ LRU cache of repository query results, evicting the least recently used results once their estimated size
+    exceeds a memory budget.
+
+    Each result is stored with tags naming what it depends on, such as ('genre', 'Horror'). Invalidating a tag
+    evicts only the results with that tag, so adding a Movie need only evict the queries about its actors and
+    genres, and those about the whole catalogue, while the rest stay cached.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.__max_bytes = max_bytes
+        self.__entries: 'OrderedDict[Hashable, Tuple[List, int, Tuple[Hashable, ...]]]' = OrderedDict()
+        self.__keys_by_tag: Dict[Hashable, Set[Hashable]] = dict()
+        self.__bytes = 0
+        # Bumped by every invalidation, so a result computed while one happened is not stored
+        self.__generation = 0
+        self.__lock = Lock()
+        self.__stats: Dict[str, int] = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+
+        # A forked worker starts with a lock of its own
+        reopen_after_fork(self)
+
+    def __getstate__(self) -> Dict:
+        # Locks cannot be pickled, and a repository snapshot is saved before it answers any queries, so a pickled
+        # cache is an empty one with the same budget
+        return {'max_bytes': self.__max_bytes}
+
+    def __setstate__(self, state: Dict):
+        self.__init__(state['max_bytes'])
+
+    def reopen(self):
+        """ Replaces the lock, keeping the cached results. """
+        self.__lock = Lock()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        with self.__lock:
+            stats = dict(self.__stats)
+            stats['entries'] = len(self.__entries)
+            stats['bytes'] = self.__bytes
+        return stats
+
+    def copy(self, result: List) -> List:
+        """ Returns a copy of a cached result, which callers may change without changing the cached one. """
+        return list(result)
+
+    def get(self, key: Hashable, compute: Callable[[], List], tags: Iterable[Hashable]) -> List:
+        """ Returns a copy of the result cached under the key, or computes, caches and returns it. The result is
+        evicted when any of the tags is invalidated. The tags are read once the result is computed, so compute may
+        add to them.
+        """
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None:
+                self.__entries.move_to_end(key)
+                self.__stats['hits'] += 1
+                return self.copy(entry[0])
+            self.__stats['misses'] += 1
+            generation = self.__generation
+
+        result = compute()
+        size = sys.getsizeof(result) + ENTRY_OVERHEAD_BYTES
+        tags = tuple(tags)
+
+        with self.__lock:
+            if generation == self.__generation and key not in self.__entries and size <= self.__max_bytes:
+                self.__entries[key] = (self.copy(result), size, tags)
+                self.__bytes += size
+                for tag in tags:
+                    self.__keys_by_tag.setdefault(tag, set()).add(key)
+
+                while self.__bytes > self.__max_bytes:
+                    self.__remove(next(iter(self.__entries)))
+                    self.__stats['evictions'] += 1
+
+        return result
+
+    def invalidate(self, tags: Iterable[Hashable]):
+        """ Evicts the results with any of the tags. """
+        with self.__lock:
+            self.__generation += 1
+            for tag in tags:
+                for key in list(self.__keys_by_tag.get(tag, ())):
+                    self.__remove(key)
+                    self.__stats['invalidations'] += 1
+
+    def clear(self):
+        with self.__lock:
+            self.__generation += 1
+            self.__entries.clear()
+            self.__keys_by_tag.clear()
+            self.__bytes = 0
+
+    def __remove(self, key: Hashable):
+        result, size, tags = self.__entries.pop(key)
+        self.__bytes -= size
+        for tag in tags:
+            keys = self.__keys_by_tag[tag]
+            keys.discard(key)
+            if len(keys) == 0:
+                del self.__keys_by_tag[tag]
@@ -0,0 +1,149 @@
+from bisect import bisect_left, bisect_right
+from typing import List, Optional, Tuple, Union
+
+Number = Union[int, float]
+
+# Numeric Movie attributes that can be filtered on with range predicates, by the name used in browse URLs
+RANGE_ATTRIBUTES = {
+    'year': 'release_year',
+    'runtime': 'runtime_minutes',
+    'rating': 'external_rating',
+    'votes': 'rating_votes',
+    'revenue': 'revenue_millions',
+    'metascore': 'metascore'
+}
+
+
+class RangePredicate:
+    """ Matches Movies whose value of a numeric attribute lies between a minimum and a maximum.
+
+    Either bound may be None to leave that side of the range open. Movies without a value never match.
+    """
+
+    def __init__(self, attribute: str, minimum: Number = None, maximum: Number = None,
+                 include_minimum: bool = True, include_maximum: bool = True):
+        self.__attribute = attribute
+        self.__minimum = minimum
+        self.__maximum = maximum
+        self.__include_minimum = include_minimum
+        self.__include_maximum = include_maximum
+
+    @property
+    def attribute(self) -> str:
+        return self.__attribute
+
+    @property
+    def minimum(self) -> Optional[Number]:
+        return self.__minimum
+
+    @property
+    def maximum(self) -> Optional[Number]:
+        return self.__maximum
+
+    @property
+    def include_minimum(self) -> bool:
+        return self.__include_minimum
+
+    @property
+    def include_maximum(self) -> bool:
+        return self.__include_maximum
+
+    def __repr__(self) -> str:
+        lower = '' if self.__minimum is None else f"{self.__minimum} {'<=' if self.__include_minimum else '<'} "
+        upper = '' if self.__maximum is None else f" {'<=' if self.__include_maximum else '<'} {self.__maximum}"
+        return f"<RangePredicate {lower}{self.__attribute}{upper}>"
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, RangePredicate):
+            return False
+        return (self.__attribute, self.__minimum, self.__maximum, self.__include_minimum, self.__include_maximum) == \
+               (other.attribute, other.minimum, other.maximum, other.include_minimum, other.include_maximum)
+
+    def __hash__(self):
+        return hash((self.__attribute, self.__minimum, self.__maximum, self.__include_minimum,
+                     self.__include_maximum))
+
+    def matches(self, value: Optional[Number]) -> bool:
+        if value is None:
+            return False
+        if self.__minimum is not None and (value < self.__minimum or
+                                           (value == self.__minimum and not self.__include_minimum)):
+            return False
+        if self.__maximum is not None and (value > self.__maximum or
+                                           (value == self.__maximum and not self.__include_maximum)):
+            return False
+        return True
+
+
+class RangeIndex:
+    """ Sorted secondary index of the Movie ranks for one numeric attribute, answering range predicates with two
+    binary searches.
+
+    Ranks are appended as Movies are added and sorted by value on the first query after a change, so loading a
+    data file costs a single sort rather than an insertion per Movie.
+    """
+
+    def __init__(self):
+        self.__entries: List[Tuple[Number, int]] = list()
+        self.__columns: Tuple[List[Number], List[int]] = (list(), list())
+        self.__descending: Tuple[Tuple[List[Number], List[int]], List[int]] = (self.__columns, list())
+        self.__is_sorted = True
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def add(self, value: Number, rank: int):
+        self.__entries.append((value, rank))
+        self.__is_sorted = False
+
+    def __sorted_columns(self) -> Tuple[List[Number], List[int]]:
+        if not self.__is_sorted:
+            # Readers may use the columns while they are rebuilt, so both are replaced together in one assignment
+            entries = sorted(self.__entries)
+            self.__entries = entries
+            self.__columns = ([value for value, rank in entries], [rank for value, rank in entries])
+            self.__is_sorted = True
+
+        return self.__columns
+
+    def __bounds(self, predicate: RangePredicate) -> Tuple[List[int], int, int]:
+        values, ranks = self.__sorted_columns()
+        start, stop = 0, len(values)
+
+        if predicate.minimum is not None:
+            start = (bisect_left if predicate.include_minimum else bisect_right)(values, predicate.minimum)
+        if predicate.maximum is not None:
+            stop = (bisect_right if predicate.include_maximum else bisect_left)(values, predicate.maximum)
+
+        return ranks, start, max(start, stop)
+
+    def count(self, predicate: RangePredicate) -> int:
+        """ Returns the number of Movies matching the predicate, without collecting their ranks. """
+        ranks, start, stop = self.__bounds(predicate)
+        return stop - start
+
+    def ranks(self, predicate: RangePredicate) -> List[int]:
+        """ Returns the ranks of the Movies matching the predicate, in rank order. """
+        ranks, start, stop = self.__bounds(predicate)
+        return sorted(ranks[start:stop])
+
+    def sorted_ranks(self, descending: bool = False) -> List[int]:
+        """ Returns the ranks of all Movies ordered by value, with Movies of equal value in rank order. """
+        columns = self.__sorted_columns()
+        values, ranks = columns
+        if not descending:
+            return ranks
+
+        # The descending order is kept with the columns it was built from, so it is rebuilt along with them
+        sorted_columns, descending_ranks = self.__descending
+        if sorted_columns is not columns:
+            # Runs of equal values are taken from the highest value down, each run keeping its rank order
+            descending_ranks = list()
+            stop = len(values)
+            while stop > 0:
+                start = bisect_left(values, values[stop - 1], 0, stop)
+                descending_ranks.extend(ranks[start:stop])
+                stop = start
+            self.__descending = (columns, descending_ranks)
+
+        return descending_ranks
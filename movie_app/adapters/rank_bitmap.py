@@ -0,0 +1,164 @@
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, Union
+
+# Ranks are split into chunks of 2 ** 16 by their high bits. A chunk holding up to ARRAY_LIMIT ranks stores the low
+# bits in a sorted array of 16 bit integers. A fuller chunk stores them as a 2 ** 16 bit integer, which is smaller.
+CHUNK_BITS = 16
+CHUNK_BYTES = (1 << CHUNK_BITS) // 8
+LOW_MASK = (1 << CHUNK_BITS) - 1
+ARRAY_LIMIT = 4096
+
+Container = Union[array, int]
+
+# The positions of the set bits of each byte value
+BYTE_BITS = tuple(tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256))
+
+
+def container_length(container: Container) -> int:
+    return len(container) if isinstance(container, array) else bin(container).count('1')
+
+
+def container_bits(container: Container) -> int:
+    if not isinstance(container, array):
+        return container
+
+    data = bytearray(CHUNK_BYTES)
+    for low in container:
+        data[low >> 3] |= 1 << (low & 7)
+    return int.from_bytes(data, 'little')
+
+
+def container_values(container: Container) -> array:
+    if isinstance(container, array):
+        return container
+
+    values = array('H')
+    for i, byte in enumerate(container.to_bytes(CHUNK_BYTES, 'little')):
+        if byte:
+            values.extend((i << 3) + bit for bit in BYTE_BITS[byte])
+    return values
+
+
+def compact_container(bits: int) -> Container:
+    """ Returns the container holding the set bits, as an array unless there are more than ARRAY_LIMIT of them. """
+    return bits if container_length(bits) > ARRAY_LIMIT else container_values(bits)
+
+
+def filter_container(values: array, other: Container, keep_common: bool) -> array:
+    # Keeps the values in or, if keep_common is False, not in the other container, in order
+    if isinstance(other, array):
+        other_values = set(other)
+        return array('H', (low for low in values if (low in other_values) == keep_common))
+
+    data = other.to_bytes(CHUNK_BYTES, 'little')
+    return array('H', (low for low in values if bool(data[low >> 3] >> (low & 7) & 1) == keep_common))
+
+
+class RankBitmap:
+    """ Compressed set of Movie ranks supporting fast intersection, union and difference, in the manner of Roaring
+    bitmaps.
+
+    Ranks are held in chunks of 65536, each stored as a sorted array while it is sparse and as a bitset once it is
+    dense. Set operations work chunk by chunk, so a small set combines with a large one at the cost of the small one.
+    """
+
+    def __init__(self, ranks: Iterable[int] = ()):
+        self.__chunks: Dict[int, Container] = dict()
+        self.__length = 0
+        for rank in ranks:
+            self.add(rank)
+
+    @classmethod
+    def from_chunks(cls, chunks: Dict[int, Container]) -> 'RankBitmap':
+        bitmap = cls()
+        bitmap.__chunks = {high: container for high, container in chunks.items() if container_length(container) > 0}
+        bitmap.__length = sum(container_length(container) for container in bitmap.__chunks.values())
+        return bitmap
+
+    def __len__(self) -> int:
+        return self.__length
+
+    def __contains__(self, rank: int) -> bool:
+        container = self.__chunks.get(rank >> CHUNK_BITS)
+        if container is None:
+            return False
+
+        low = rank & LOW_MASK
+        if isinstance(container, array):
+            i = bisect_left(container, low)
+            return i < len(container) and container[i] == low
+        return bool(container >> low & 1)
+
+    def __iter__(self) -> Iterator[int]:
+        for high in sorted(self.__chunks.keys()):
+            base = high << CHUNK_BITS
+            for low in container_values(self.__chunks[high]):
+                yield base + low
+
+    def add(self, rank: int):
+        high, low = rank >> CHUNK_BITS, rank & LOW_MASK
+        container = self.__chunks.get(high)
+
+        if container is None:
+            self.__chunks[high] = array('H', [low])
+        elif isinstance(container, array):
+            i = bisect_left(container, low)
+            if i < len(container) and container[i] == low:
+                return
+            container.insert(i, low)
+            if len(container) > ARRAY_LIMIT:
+                self.__chunks[high] = container_bits(container)
+        else:
+            if container >> low & 1:
+                return
+            self.__chunks[high] = container | 1 << low
+
+        self.__length += 1
+
+    def __and__(self, other: 'RankBitmap') -> 'RankBitmap':
+        smaller, larger = (self, other) if len(self.__chunks) <= len(other.__chunks) else (other, self)
+        chunks = dict()
+
+        for high, container in smaller.__chunks.items():
+            other_container = larger.__chunks.get(high)
+            if other_container is None:
+                continue
+            if isinstance(container, array):
+                chunks[high] = filter_container(container, other_container, keep_common=True)
+            elif isinstance(other_container, array):
+                chunks[high] = filter_container(other_container, container, keep_common=True)
+            else:
+                chunks[high] = compact_container(container & other_container)
+
+        return RankBitmap.from_chunks(chunks)
+
+    def __or__(self, other: 'RankBitmap') -> 'RankBitmap':
+        chunks = {high: array('H', container) if isinstance(container, array) else container
+                  for high, container in self.__chunks.items()}
+
+        for high, container in other.__chunks.items():
+            own_container = chunks.get(high)
+            if own_container is None:
+                chunks[high] = array('H', container) if isinstance(container, array) else container
+            elif isinstance(own_container, array) and isinstance(container, array) and \
+                    len(own_container) + len(container) <= ARRAY_LIMIT:
+                chunks[high] = array('H', sorted(set(own_container).union(container)))
+            else:
+                chunks[high] = compact_container(container_bits(own_container) | container_bits(container))
+
+        return RankBitmap.from_chunks(chunks)
+
+    def __sub__(self, other: 'RankBitmap') -> 'RankBitmap':
+        chunks = dict()
+
+        for high, container in self.__chunks.items():
+            other_container = other.__chunks.get(high)
+            if other_container is None:
+                chunks[high] = array('H', container) if isinstance(container, array) else container
+            elif isinstance(container, array):
+                chunks[high] = filter_container(container, other_container, keep_common=False)
+            else:
+                chunks[high] = compact_container(container & ~container_bits(other_container))
+
+        return RankBitmap.from_chunks(chunks)
@@ -1,13 +1,18 @@
 import abc
-from typing import List
+from typing import Dict, List, Optional, Tuple
 
 from movie_app.domainmodel import Actor, Director, Genre, Movie, Review, User, WatchList
 from movie_app.datafilereaders import MovieFileCSVReader, UserFileCSVReader, ReviewFileCSVReader, \
-    WatchListFileCSVReader, WatchingSimFileCSVReader
+    WatchListFileCSVReader, WatchingSimFileCSVReader, PosterFileCSVReader
 from movie_app.activitysimulations import MovieWatchingSimulation
+from movie_app.adapters.movie_query import MovieQuery
+from movie_app.adapters.range_index import RangePredicate, RANGE_ATTRIBUTES
 
 repo_instance = None
 
+# The fields get_movie_ranks_page finds pages of Movies by
+PAGE_FIELDS = ('director', 'actor', 'genre')
+
 
 class RepositoryException(Exception):
 
@@ -91,6 +96,35 @@ class AbstractRepository(abc.ABC):
         """
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def get_version(self) -> int:
+        """ Returns the number of changes made to the repository, such as Movies and Reviews added to it and Movies
+        added to or removed from Watchlists.
+
+        The version only ever increases, so anything rendered from the repository is up to date while its version is
+        the same.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_load_token(self) -> str:
+        """ Returns a token chosen when the repository was populated or loaded, which tells apart repositories
+        whose versions count changes from different starting points.
+
+        Processes forked after the repository is loaded share its token.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_movie_version(self, movie_rank: int) -> int:
+        """ Returns the number of changes made to the Movie with the given rank, counting its addition to the
+        repository and each Review added to or removed from it.
+
+        The version only ever increases, so anything rendered from a Movie is up to date while its version is the
+        same. If there is no Movie with the given rank, this method returns 0.
+        """
+        raise NotImplementedError
+
     @abc.abstractmethod
     def get_movies_by_rank(self, rank_list: List[int]) -> List[Movie]:
         """ Returns a list of Movies with ranks that match those in the given list, from this repository.
@@ -131,6 +165,101 @@ class AbstractRepository(abc.ABC):
         """
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def get_movie_ranks_page(self, field: str, item_list: list, anchor: int = None, backward: bool = False,
+                             quantity: int = 3, sort_attribute: str = None,
+                             descending: bool = False) -> Tuple[List[int], int]:
+        """ Returns a page of the ranks returned by get_movie_ranks_by_director, get_movie_ranks_by_actors or
+        get_movie_ranks_by_genres, for a field of 'director', 'actor' or 'genre' and a list of Directors, Actors or
+        Genres, along with the number of ranks on all of the pages.
+
+        The page holds up to quantity ranks, in rank order, following the anchor rank, or the first ones if there is
+        no anchor. If backward is True, it holds the ranks preceding the anchor instead, or the last ones. Finding
+        a page costs the same however deep into the ranks it is.
+
+        When a sort_attribute is given, the ranks are ordered as sort_movie_ranks orders them instead, and when
+        descending is True without one, they are in reverse rank order.
+        """
+        if field not in PAGE_FIELDS:
+            raise RepositoryException(f'Movie pages can only be found by {", ".join(PAGE_FIELDS)}')
+        if anchor is not None and not isinstance(anchor, int):
+            raise RepositoryException('Page anchor needs to be a Movie rank')
+        if not isinstance(quantity, int) or quantity <= 0:
+            raise RepositoryException('Number of Movies on a page needs to be a positive integer value')
+        if sort_attribute is not None and sort_attribute not in RANGE_ATTRIBUTES.values():
+            raise RepositoryException('Movies cannot be sorted by the attribute provided')
+
+    @abc.abstractmethod
+    def get_movie_ranks_by_ranges(self, predicates: List[RangePredicate], director: Director = None,
+                                  actor_list: List[Actor] = None, genre_list: List[Genre] = None) -> List[int]:
+        """ Returns a list of ranks for Movies matching all of the given range predicates, such as a metascore of at
+        least 80 and a runtime under 120 minutes.
+
+        When a Director, a list of Actors or a list of Genres is given, only Movies that are also returned by
+        get_movie_ranks_by_director, get_movie_ranks_by_actors or get_movie_ranks_by_genres for them are included.
+        If there are no such Movies, this method returns an empty list.
+        """
+        for predicate in predicates:
+            if not isinstance(predicate, RangePredicate) or predicate.attribute not in RANGE_ATTRIBUTES.values():
+                raise RepositoryException('Range predicate provided is either of the wrong type or on an attribute '
+                                          'that cannot be filtered on')
+
+    @abc.abstractmethod
+    def get_movie_ranks_by_query(self, query: MovieQuery, sort_attribute: str = None,
+                                 descending: bool = False) -> List[int]:
+        """ Returns the ranks of Movies matching a Boolean query over their actors, genres, directors and release
+        years, such as '(genre:Action OR genre:Sci-Fi) AND NOT genre:Horror'. Names match ignoring case and accents.
+
+        The ranks are ordered by the given numeric attribute of their Movies, as sort_movie_ranks orders them, or by
+        rank if no attribute is given.
+        """
+        if not isinstance(query, MovieQuery):
+            raise RepositoryException('Query provided is of the wrong type')
+        if sort_attribute is not None and sort_attribute not in RANGE_ATTRIBUTES.values():
+            raise RepositoryException('Movies cannot be sorted by the attribute provided')
+
+    @abc.abstractmethod
+    def get_query_cache_stats(self) -> Dict[str, int]:
+        """ Returns the numbers of hits, misses, evictions and invalidations of the cache of query results, and the
+        number of results it holds along with an estimate of their size in bytes.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def sort_movie_ranks(self, rank_list: List[int], attribute: str, descending: bool = False) -> List[int]:
+        """ Returns the ranks in the given list, ordered by the given numeric attribute of their Movies, such as
+        revenue_millions. Movies missing the attribute come last, and Movies with equal values keep their order.
+
+        Ranks of Movies that are not in the repository are left out.
+        """
+        if attribute not in RANGE_ATTRIBUTES.values():
+            raise RepositoryException('Movies cannot be sorted by the attribute provided')
+
+    @abc.abstractmethod
+    def search_movie_ranks(self, query: str, cursor: int = 0, quantity: int = 10) -> Tuple[List[int], int]:
+        """ Returns the ranks of Movies whose title or description contains all of the words in the query, ordered by
+        relevance, and the number of such Movies. Words within quotes must appear together as a phrase.
+
+        Only the ranks from position cursor onwards are returned, and at most quantity of them.
+        """
+        if not isinstance(cursor, int) or cursor < 0 or not isinstance(quantity, int) or quantity <= 0:
+            raise RepositoryException('Cursor needs to be a non-negative and quantity a positive integer value')
+
+    @abc.abstractmethod
+    def search_movie_ranks_page(self, query: str, anchor: int = None, backward: bool = False,
+                                quantity: int = 10) -> Tuple[List[int], int]:
+        """ Returns a page of the ranks returned by search_movie_ranks for the query, along with the number of ranks
+        on all of the pages.
+
+        The page holds up to quantity ranks, in order of relevance, following the anchor rank, or the first ones if
+        the anchor does not match the query. If backward is True, it holds the ranks preceding the anchor instead, or
+        the last ones.
+        """
+        if anchor is not None and not isinstance(anchor, int):
+            raise RepositoryException('Page anchor needs to be a Movie rank')
+        if not isinstance(quantity, int) or quantity <= 0:
+            raise RepositoryException('Number of Movies on a page needs to be a positive integer value')
+
     @abc.abstractmethod
     def get_most_common_directors(self, quantity: int) -> List[Director]:
         """ Returns the specified number of the most common Directors of Movies stored in the repository"""
@@ -146,6 +275,85 @@ class AbstractRepository(abc.ABC):
         """ Returns the specified number of the most common Genres of Movies stored in the repository"""
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def complete_actor_names(self, prefix: str, quantity: int) -> List[Actor]:
+        """ Returns up to the specified number of Actors whose name, or a word in their name, starts with the prefix.
+        The Actors of the most Movies come first.
+
+        Case and accents are ignored. If no Actor names start with the prefix, this method returns an empty list.
+        """
+        if not isinstance(quantity, int) or quantity <= 0:
+            raise RepositoryException('Number of Actor name completions needs to be a positive integer value')
+
+    @abc.abstractmethod
+    def complete_director_names(self, prefix: str, quantity: int) -> List[Director]:
+        """ Returns up to the specified number of Directors whose name, or a word in their name, starts with the prefix.
+        The Directors of the most Movies come first.
+
+        Case and accents are ignored. If no Director names start with the prefix, this method returns an empty list.
+        """
+        if not isinstance(quantity, int) or quantity <= 0:
+            raise RepositoryException('Number of Director name completions needs to be a positive integer value')
+
+    @abc.abstractmethod
+    def complete_genre_names(self, prefix: str, quantity: int) -> List[Genre]:
+        """ Returns up to the specified number of Genres whose name, or a word in their name, starts with the prefix.
+        The Genres of the most Movies come first.
+
+        Case and accents are ignored. If no Genre names start with the prefix, this method returns an empty list.
+        """
+        if not isinstance(quantity, int) or quantity <= 0:
+            raise RepositoryException('Number of Genre name completions needs to be a positive integer value')
+
+    @abc.abstractmethod
+    def resolve_actor_names(self, actor_full_name: str, quantity: int) -> List[Actor]:
+        """ Returns up to the specified number of Actors whose name is the given name, ignoring case and accents, or is
+        within a few typos of it. The closest names come first, and Actors of more Movies before others as close.
+
+        If no Actor names are close to the given name, this method returns an empty list.
+        """
+        if not isinstance(quantity, int) or quantity <= 0:
+            raise RepositoryException('Number of resolved Actor names needs to be a positive integer value')
+
+    @abc.abstractmethod
+    def resolve_director_names(self, director_full_name: str, quantity: int) -> List[Director]:
+        """ Returns up to the specified number of Directors whose name is the given name, ignoring case and accents, or
+        is within a few typos of it. The closest names come first, and Directors of more Movies before others as close.
+
+        If no Director names are close to the given name, this method returns an empty list.
+        """
+        if not isinstance(quantity, int) or quantity <= 0:
+            raise RepositoryException('Number of resolved Director names needs to be a positive integer value')
+
+    @abc.abstractmethod
+    def add_poster_url(self, movie: Movie, poster_url: Optional[str]):
+        """ Adds the poster URL of a Movie to the repository. A poster URL of None records that there is no poster.
+        """
+        if not isinstance(movie, Movie):
+            raise RepositoryException('Movie provided is of the wrong type')
+
+    @abc.abstractmethod
+    def get_poster_url(self, movie: Movie) -> Optional[str]:
+        """ Returns the poster URL of the given Movie.
+
+        If the Movie has no poster, or its poster URL is not in the repository, this method returns None.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def has_poster_url(self, movie: Movie) -> bool:
+        """ Checks whether the poster of the given Movie has been looked up, including Movies known to have no poster.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_movies_without_poster_urls(self) -> List[Movie]:
+        """ Returns a list of Movies, in rank order, that have not had their poster looked up.
+
+        Movies known to have no poster are not included.
+        """
+        raise NotImplementedError
+
     @abc.abstractmethod
     def add_review(self, review: Review):
         """ Adds a Review to the repository.
@@ -160,6 +368,12 @@ class AbstractRepository(abc.ABC):
         if review.movie is None or review not in review.movie.reviews:
             raise RepositoryException('Review is not correctly linked to a Movie')
 
+    @abc.abstractmethod
+    def remove_review(self, review: Review):
+        """ Removes a Review from the repository, and from the reviews of its User and Movie. """
+        if not isinstance(review, Review):
+            raise RepositoryException('Review provided is of the wrong type')
+
     @abc.abstractmethod
     def get_review(self, review_id: int) -> Review:
         """ Returns Review with the given ID from the repository.
@@ -190,6 +404,16 @@ class AbstractRepository(abc.ABC):
         """
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def resolve_user_names(self, user_name: str, quantity: int) -> List[User]:
+        """ Returns up to the specified number of Users whose username is the given username, ignoring case and
+        accents, or is within a few typos of it. The closest usernames come first.
+
+        If no usernames are close to the given username, this method returns an empty list.
+        """
+        if not isinstance(quantity, int) or quantity <= 0:
+            raise RepositoryException('Number of resolved usernames needs to be a positive integer value')
+
     @abc.abstractmethod
     def get_user_by_id(self, user_id: int) -> User:
         """ Returns the User with the given ID from the repository.
@@ -218,6 +442,24 @@ class AbstractRepository(abc.ABC):
         if watchlist.user is None or watchlist is not watchlist.user.watchlist:
             raise RepositoryException('Watchlist not correctly linked to a User')
 
+    @abc.abstractmethod
+    def add_movie_to_watchlist(self, watchlist: WatchList, movie: Movie):
+        """ Adds a Movie to a Watchlist in the repository.
+
+        If the Movie is not in the repository, this method raises a RepositoryException and doesn't update the
+        Watchlist.
+        """
+        if not isinstance(watchlist, WatchList) or watchlist.user is None:
+            raise RepositoryException('Watchlist provided is either of the wrong type or not linked to a User')
+        if not isinstance(movie, Movie):
+            raise RepositoryException('Movie provided is of the wrong type')
+
+    @abc.abstractmethod
+    def remove_movie_from_watchlist(self, watchlist: WatchList, movie: Movie):
+        """ Removes a Movie from a Watchlist in the repository. """
+        if not isinstance(watchlist, WatchList) or watchlist.user is None:
+            raise RepositoryException('Watchlist provided is either of the wrong type or not linked to a User')
+
     @abc.abstractmethod
     def get_watchlist_by_user_id(self, user_id: int) -> WatchList:
         """ Returns Watchlist for the User with the given ID from the repository.
@@ -302,6 +544,21 @@ class AbstractRepository(abc.ABC):
         """
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def set_poster_file_csv_reader(self, poster_file_reader: PosterFileCSVReader):
+        """ Sets a PosterFileCSVReader object for the repository. """
+        if not isinstance(poster_file_reader, PosterFileCSVReader) or poster_file_reader.file_name is None:
+            raise RepositoryException('Poster file CSV reader provided is either of the wrong type or does not have '
+                                      'a valid csv filename')
+
+    @abc.abstractmethod
+    def get_poster_file_csv_reader(self) -> PosterFileCSVReader:
+        """ Returns the PosterFileCSVReader object from the repository.
+
+        If there is no PosterFileCSVReader object, this method returns None.
+        """
+        raise NotImplementedError
+
     @abc.abstractmethod
     def add_watching_sim(self, watching_sim: MovieWatchingSimulation):
         """ Adds a MovieWatchingSimulation object to the repository. """
@@ -375,6 +632,12 @@ class AbstractRepository(abc.ABC):
         """
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def load_posters(self):
+        """ Loads the poster URL data from the provided PosterFileCSVReader object.
+        """
+        raise NotImplementedError
+
     @abc.abstractmethod
     def populate(self, data_path_dict):
         """ Creates required file reader objects using data stored within CSV files,
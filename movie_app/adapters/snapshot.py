@@ -0,0 +1,243 @@
+import copyreg
+import gc
+import hashlib
+import os
+import pickle
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from movie_app.adapters.memory_repository import MemoryRepository
+from movie_app.domainmodel import Actor, Director, Genre, Movie, User, WatchList, Review
+from movie_app.activitysimulations import MovieWatchingSimulation
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+# Packages defining the classes stored in a snapshot. A snapshot saved by other versions of their code may lack
+# attributes the current code expects, such as a newly added index, so it is rebuilt.
+SNAPSHOT_CODE_PACKAGES = ('adapters', 'domainmodel', 'activitysimulations')
+
+# Domain classes in the order they are recreated when a snapshot is loaded. An object's hash may only depend on
+# attributes that refer to objects of an earlier class, e.g. a Review's hash uses its Movie and User.
+DOMAIN_CLASSES = (Actor, Director, Genre, Movie, User, WatchList, Review, MovieWatchingSimulation)
+CONTAINER_TYPES = (list, tuple, set, frozenset, dict)
+
+
+@contextmanager
+def paused_garbage_collection():
+    """ Disables the cyclic garbage collector while a large object graph is built.
+
+    Snapshots create objects far faster than they become garbage, so collections triggered by allocation counts
+    would repeatedly traverse the partially loaded repository without freeing anything.
+    """
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+def fingerprint_data_files(data_path_dict, with_hashes: bool = True) -> Dict[str, Dict]:
+    """ Returns the path, modification time, size and (optionally) SHA-256 hash of each CSV data file.
+
+    Missing files are given a modification time, size and hash of None.
+    """
+    fingerprints = dict()
+
+    for name, file_name in sorted(data_path_dict.items()):
+        # Optional data files, such as the poster file, are recorded as missing so that creating them is noticed
+        exists = os.path.exists(file_name)
+        stat = os.stat(file_name) if exists else None
+        fingerprints[name] = {
+            'path': str(Path(file_name).resolve()),
+            'mtime_ns': stat.st_mtime_ns if exists else None,
+            'size': stat.st_size if exists else None,
+            'sha256': hash_file(file_name) if with_hashes and exists else None
+        }
+
+    return fingerprints
+
+
+def hash_file(file_name: str) -> str:
+    sha256 = hashlib.sha256()
+
+    with open(file_name, mode='rb') as data_file:
+        for block in iter(lambda: data_file.read(1 << 20), b''):
+            sha256.update(block)
+
+    return sha256.hexdigest()
+
+
+def fingerprint_code() -> str:
+    """ Returns the SHA-256 hash of the source files of the packages whose objects are stored in snapshots. """
+    sha256 = hashlib.sha256()
+    package_root = Path(__file__).resolve().parent.parent
+
+    for package in SNAPSHOT_CODE_PACKAGES:
+        for source_file in sorted(package_root.joinpath(package).glob('*.py')):
+            sha256.update(source_file.name.encode())
+            sha256.update(source_file.read_bytes())
+
+    return sha256.hexdigest()
+
+
+def snapshot_is_current(snapshot_sources: Dict[str, Dict], data_path_dict) -> bool:
+    """ Checks the data files recorded in a snapshot against the data files on disk.
+
+    Files with unchanged modification times and sizes are trusted without being read. Any other file is hashed, so
+    a file that was touched but not edited does not force a rebuild.
+    """
+    current_sources = fingerprint_data_files(data_path_dict, with_hashes=False)
+
+    if current_sources.keys() != snapshot_sources.keys():
+        return False
+
+    for name, current in current_sources.items():
+        recorded = snapshot_sources[name]
+
+        if current['path'] != recorded['path']:
+            return False
+        if current['mtime_ns'] == recorded['mtime_ns'] and current['size'] == recorded['size']:
+            continue
+        if current['size'] != recorded['size'] or hash_file(data_path_dict[name]) != recorded['sha256']:
+            return False
+
+    return True
+
+
+def collect_domain_objects(root) -> List:
+    """ Returns every domain object reachable from root, grouped in DOMAIN_CLASSES order.
+
+    The object graph is walked iteratively, so long chains of Actor colleagues or User and Movie links do not
+    exhaust the interpreter stack.
+    """
+    seen = set()
+    found = {cls: list() for cls in DOMAIN_CLASSES}
+    app_classes: Dict[type, bool] = dict()
+    pending = [root]
+
+    while pending:
+        obj = pending.pop()
+        cls = type(obj)
+
+        if cls is dict:
+            pending.extend(obj.keys())
+            pending.extend(obj.values())
+            continue
+        if cls in CONTAINER_TYPES:
+            pending.extend(obj)
+            continue
+
+        # Only objects defined by this application are walked; strings, numbers and dates hold no references
+        if cls not in app_classes:
+            app_classes[cls] = cls.__module__.startswith('movie_app') and hasattr(obj, '__dict__')
+        if not app_classes[cls] or id(obj) in seen:
+            continue
+
+        seen.add(id(obj))
+        if cls in found:
+            found[cls].append(obj)
+        pending.extend(vars(obj).values())
+
+    return [obj for cls in DOMAIN_CLASSES for obj in found[cls]]
+
+
+def key_state(obj) -> Dict:
+    """ Returns the attributes an object needs before it can be hashed. """
+    earlier_classes = DOMAIN_CLASSES[:DOMAIN_CLASSES.index(type(obj))]
+
+    return {name: value for name, value in vars(obj).items()
+            if not isinstance(value, CONTAINER_TYPES) and
+            (not isinstance(value, DOMAIN_CLASSES) or isinstance(value, earlier_classes))}
+
+
+class SnapshotPickler(pickle.Pickler):
+    """ Pickles domain objects in two passes to keep the pickle stack shallow.
+
+    The first pass creates each domain object with only the attributes its hash depends on. The second pass
+    records the full state of each object, which then only refers to objects that have already been pickled.
+    """
+
+    def __init__(self, file, domain_objects: List):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.__domain_object_ids = {id(obj) for obj in domain_objects}
+
+    def reducer_override(self, obj):
+        if id(obj) in self.__domain_object_ids:
+            return copyreg.__newobj__, (type(obj),), key_state(obj)
+        return NotImplemented
+
+
+def save_snapshot(repository: MemoryRepository, snapshot_path: str, data_path_dict):
+    """ Writes the populated repository, along with fingerprints of its data files, to the snapshot file. """
+    with paused_garbage_collection():
+        domain_objects = collect_domain_objects(repository)
+
+    header = {
+        'version': SNAPSHOT_FORMAT_VERSION,
+        'code': fingerprint_code(),
+        'sources': fingerprint_data_files(data_path_dict)
+    }
+
+    temp_path = f"{snapshot_path}.{os.getpid()}.tmp"
+    with paused_garbage_collection(), open(temp_path, mode='wb') as snapshot_file:
+        pickle.dump(header, snapshot_file, protocol=pickle.HIGHEST_PROTOCOL)
+        pickler = SnapshotPickler(snapshot_file, domain_objects)
+        pickler.dump((domain_objects, [vars(obj) for obj in domain_objects], repository))
+
+    # Replace the snapshot in one step so that concurrently starting processes never read a partial file
+    os.replace(temp_path, snapshot_path)
+
+
+def load_snapshot(snapshot_path: str, data_path_dict) -> Optional[MemoryRepository]:
+    """ Returns the repository stored in the snapshot file.
+
+    If the snapshot is missing, unreadable, from another format version, saved by other code or older than the data
+    files, this method returns None.
+    """
+    try:
+        with open(snapshot_path, mode='rb') as snapshot_file:
+            header = pickle.load(snapshot_file)
+            if header.get('version') != SNAPSHOT_FORMAT_VERSION or header.get('code') != fingerprint_code() or \
+                    not snapshot_is_current(header.get('sources', dict()), data_path_dict):
+                return None
+
+            with paused_garbage_collection():
+                domain_objects, states, repository = pickle.load(snapshot_file)
+
+                for obj, state in zip(domain_objects, states):
+                    obj.__dict__.update(state)
+    except Exception:
+        # Any snapshot that cannot be read is treated as stale and rebuilt from the data files.
+        return None
+
+    restore_id_counters(domain_objects)
+    repository.renew_load_token()
+    return repository
+
+
+def restore_id_counters(domain_objects: List):
+    """ Continues User, Review and MovieWatchingSimulation IDs after the largest ID in the snapshot. """
+    for cls in (User, Review, MovieWatchingSimulation):
+        ids = [obj.id for obj in domain_objects if type(obj) is cls and obj.id is not None]
+        cls.reset_id(max(ids, default=0) + 1)
+
+
+def load_or_populate(data_path_dict, snapshot_path: str) -> MemoryRepository:
+    """ Returns a repository loaded from the snapshot file, or populated from the data files when the snapshot is
+    missing or stale. A stale snapshot is rebuilt from the newly populated repository.
+    """
+    repository = load_snapshot(snapshot_path, data_path_dict)
+
+    if repository is None:
+        repository = MemoryRepository()
+        repository.populate(data_path_dict)
+
+        try:
+            save_snapshot(repository, snapshot_path, data_path_dict)
+        except OSError:
+            pass    # Ignore exception, the repository is still usable without a snapshot
+
+    return repository
@@ -0,0 +1,304 @@
+import heapq
+import math
+from bisect import bisect_left
+import re
+import unicodedata
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+PHRASE_PATTERN = re.compile(r'"([^"]*)"')
+
+STOP_WORDS = frozenset("""
+a about after all also an and any are as at be been but by can could did do does for from had has have he her his
+how i if in into is it its just more most no not of on one or our out over she so some such than that the their them
+then there these they this those through to up was we were what when where which while who will with would you your
+""".split())
+
+# BM25 parameters, and the number of times a title word counts towards its term frequency
+BM25_K1 = 1.2
+BM25_B = 0.75
+TITLE_WEIGHT = 3
+
+# Title and description positions are kept apart, so a phrase never spans the end of a title
+DESCRIPTION_POSITION_OFFSET = 1000
+
+
+def fold_text(text: str) -> str:
+    """ Returns the text case folded and with accents removed, e.g. 'Amélie' becomes 'amelie'. """
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    return ''.join(character for character in decomposed if not unicodedata.combining(character))
+
+
+def tokenize(text: str) -> List[str]:
+    """ Returns the stemmed words of the text, in order, leaving out stop words. """
+    words = [word.split("'")[0] for word in WORD_PATTERN.findall(fold_text(text or ''))]
+    return [stem(word) for word in words if word not in STOP_WORDS]
+
+
+class PorterStemmer:
+    """ The Porter (1980) suffix stripping algorithm, which reduces English words such as 'criminals', 'criminal'
+    and 'criminality' to a shared stem.
+    """
+
+    VOWELS = frozenset('aeiou')
+    STEP_2_RULES = (
+        ('ational', 'ate'), ('tional', 'tion'), ('enci', 'ence'), ('anci', 'ance'), ('izer', 'ize'), ('abli', 'able'),
+        ('alli', 'al'), ('entli', 'ent'), ('eli', 'e'), ('ousli', 'ous'), ('ization', 'ize'), ('ation', 'ate'),
+        ('ator', 'ate'), ('alism', 'al'), ('iveness', 'ive'), ('fulness', 'ful'), ('ousness', 'ous'),
+        ('aliti', 'al'), ('iviti', 'ive'), ('biliti', 'ble'))
+    STEP_3_RULES = (
+        ('icate', 'ic'), ('ative', ''), ('alize', 'al'), ('iciti', 'ic'), ('ical', 'ic'), ('ful', ''), ('ness', ''))
+    STEP_4_RULES = tuple((suffix, '') for suffix in (
+        'al', 'ance', 'ence', 'er', 'ic', 'able', 'ible', 'ant', 'ement', 'ment', 'ent', 'ion', 'ou', 'ism', 'ate',
+        'iti', 'ous', 'ive', 'ize'))
+
+    def __init__(self):
+        self.__cache: Dict[str, str] = dict()
+
+    def __is_consonant(self, word: str, i: int) -> bool:
+        if word[i] in self.VOWELS:
+            return False
+        if word[i] == 'y':
+            return i == 0 or not self.__is_consonant(word, i - 1)
+        return True
+
+    def __measure(self, stem: str) -> int:
+        """ Returns m, the number of vowel-consonant sequences in the stem. """
+        forms = ''.join('c' if self.__is_consonant(stem, i) else 'v' for i in range(len(stem)))
+        return len(re.findall(r'v+c+', forms))
+
+    def __has_vowel(self, stem: str) -> bool:
+        return any(not self.__is_consonant(stem, i) for i in range(len(stem)))
+
+    def __ends_double_consonant(self, word: str) -> bool:
+        return len(word) >= 2 and word[-1] == word[-2] and self.__is_consonant(word, len(word) - 1)
+
+    def __ends_cvc(self, word: str) -> bool:
+        return len(word) >= 3 and self.__is_consonant(word, len(word) - 3) and \
+            not self.__is_consonant(word, len(word) - 2) and self.__is_consonant(word, len(word) - 1) and \
+            word[-1] not in 'wxy'
+
+    def __replace(self, word: str, rules: Iterable[Tuple[str, str]], minimum_measure: int) -> str:
+        # Only the longest matching suffix is considered, so suffixes ending others are listed after them
+        for suffix, replacement in rules:
+            if word.endswith(suffix):
+                stem = word[:-len(suffix)]
+                if self.__measure(stem) <= minimum_measure or (suffix == 'ion' and not stem.endswith(('s', 't'))):
+                    return word
+                return stem + replacement
+        return word
+
+    def __step_1(self, word: str) -> str:
+        if word.endswith('sses') or word.endswith('ies'):
+            word = word[:-2]
+        elif word.endswith('s') and not word.endswith('ss'):
+            word = word[:-1]
+
+        if word.endswith('eed'):
+            if self.__measure(word[:-3]) > 0:
+                word = word[:-1]
+        else:
+            for suffix in ('ed', 'ing'):
+                if word.endswith(suffix) and self.__has_vowel(word[:-len(suffix)]):
+                    word = word[:-len(suffix)]
+                    if word.endswith(('at', 'bl', 'iz')):
+                        word += 'e'
+                    elif self.__ends_double_consonant(word) and word[-1] not in 'lsz':
+                        word = word[:-1]
+                    elif self.__measure(word) == 1 and self.__ends_cvc(word):
+                        word += 'e'
+                    break
+
+        if word.endswith('y') and self.__has_vowel(word[:-1]):
+            word = word[:-1] + 'i'
+        return word
+
+    def __step_2_to_4(self, word: str) -> str:
+        word = self.__replace(word, self.STEP_2_RULES, 0)
+        word = self.__replace(word, self.STEP_3_RULES, 0)
+        return self.__replace(word, self.STEP_4_RULES, 1)
+
+    def __step_5(self, word: str) -> str:
+        if word.endswith('e'):
+            stem = word[:-1]
+            measure = self.__measure(stem)
+            if measure > 1 or (measure == 1 and not self.__ends_cvc(stem)):
+                word = stem
+
+        if self.__measure(word) > 1 and self.__ends_double_consonant(word) and word.endswith('l'):
+            word = word[:-1]
+        return word
+
+    def stem(self, word: str) -> str:
+        if len(word) <= 2 or not word.isalpha():
+            return word
+
+        stemmed = self.__cache.get(word)
+        if stemmed is None:
+            stemmed = self.__step_5(self.__step_2_to_4(self.__step_1(word)))
+            if len(self.__cache) < 100000:
+                self.__cache[word] = stemmed
+        return stemmed
+
+
+stem = PorterStemmer().stem
+
+
+class Postings:
+    """ Positional postings of one term: parallel arrays of Movie ranks, term frequencies and offsets into a shared
+    array of word positions.
+    """
+
+    __slots__ = ('ranks', 'frequencies', 'offsets', 'positions')
+
+    def __init__(self):
+        self.ranks = array('I')
+        self.frequencies = array('I')
+        self.offsets = array('I')
+        self.positions = array('I')
+
+    def add(self, rank: int, frequency: int, positions: List[int]):
+        if len(self.ranks) > 0 and rank < self.ranks[-1]:
+            # Movies are usually added in rank order. When one is not, the arrays are rebuilt to keep ranks sorted.
+            entries = [(self.ranks[i], self.frequencies[i], self.positions_at(i)) for i in range(len(self.ranks))]
+            entries.insert(bisect_left(self.ranks, rank), (rank, frequency, positions))
+            self.__init__()
+            for entry in entries:
+                self.add(*entry)
+            return
+
+        self.ranks.append(rank)
+        self.frequencies.append(frequency)
+        self.offsets.append(len(self.positions))
+        self.positions.extend(positions)
+
+    def find(self, rank: int) -> int:
+        """ Returns the index of the rank in the postings, or -1 if the term is not in that Movie. """
+        i = bisect_left(self.ranks, rank)
+        return i if i < len(self.ranks) and self.ranks[i] == rank else -1
+
+    def positions_at(self, i: int) -> array:
+        end = self.offsets[i + 1] if i + 1 < len(self.offsets) else len(self.positions)
+        return self.positions[self.offsets[i]:end]
+
+
+class TextIndex:
+    """ Inverted index over Movie titles and descriptions, ranking matches with BM25.
+
+    Movies are indexed as they are added. A query matches Movies containing all of its words, and each quoted
+    phrase in it, e.g. 'intergalactic "fanatical warrior"'.
+    """
+
+    def __init__(self):
+        self.__postings: Dict[str, Postings] = dict()
+        self.__document_lengths: Dict[int, int] = dict()
+        self.__total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.__document_lengths)
+
+    def add(self, rank: int, title: str, description: str):
+        if rank in self.__document_lengths:
+            return
+
+        term_positions: Dict[str, List[int]] = dict()
+        title_terms = tokenize(title)
+        description_terms = tokenize(description)
+
+        for position, term in enumerate(title_terms):
+            term_positions.setdefault(term, list()).append(position)
+        for position, term in enumerate(description_terms, start=DESCRIPTION_POSITION_OFFSET):
+            term_positions.setdefault(term, list()).append(position)
+
+        for term, positions in term_positions.items():
+            title_count = sum(1 for position in positions if position < DESCRIPTION_POSITION_OFFSET)
+            frequency = len(positions) + (TITLE_WEIGHT - 1) * title_count
+            self.__postings.setdefault(term, Postings()).add(rank, frequency, positions)
+
+        length = len(description_terms) + TITLE_WEIGHT * len(title_terms)
+        self.__document_lengths[rank] = length
+        self.__total_length += length
+
+    def __idf(self, postings: Postings) -> float:
+        document_count = len(postings.ranks)
+        return math.log(1 + (len(self.__document_lengths) - document_count + 0.5) / (document_count + 0.5))
+
+    def search(self, query: str, cursor: int = 0, quantity: int = 10) -> Tuple[List[int], int]:
+        """ Returns the ranks of the matching Movies from position cursor of the BM25 ordering, at most quantity of
+        them, along with the number of matching Movies. Movies with equal scores are ordered by rank.
+        """
+        scores = self.__scores(query)
+        top = heapq.nsmallest(cursor + quantity, scores.items(), key=lambda item: (-item[1], item[0]))
+        return [rank for rank, score in top[cursor:]], len(scores)
+
+    def search_page(self, query: str, anchor: int = None, backward: bool = False,
+                    quantity: int = 10) -> Tuple[List[int], int]:
+        """ Returns the ranks of at most quantity matching Movies following the anchor rank in the BM25 ordering, or
+        preceding it if backward is True, along with the number of matching Movies. Without a matching anchor, the
+        first or, if backward is True, the last Movies are returned.
+
+        Only the anchor's score and rank are compared, so a page costs the same however deep into the ordering it is.
+        """
+        scores = self.__scores(query)
+        keys = ((-score, rank) for rank, score in scores.items())
+
+        if anchor in scores:
+            anchor_key = (-scores[anchor], anchor)
+            keys = (key for key in keys if (key < anchor_key if backward else key > anchor_key))
+
+        top = heapq.nlargest(quantity, keys)[::-1] if backward else heapq.nsmallest(quantity, keys)
+        return [rank for score, rank in top], len(scores)
+
+    def __scores(self, query: str) -> Dict[int, float]:
+        phrases = [tokenize(phrase) for phrase in PHRASE_PATTERN.findall(query)]
+        terms = tokenize(PHRASE_PATTERN.sub(' ', query)) + [term for phrase in phrases for term in phrase]
+        posting_lists = [self.__postings.get(term) for term in dict.fromkeys(terms)]
+
+        if len(posting_lists) == 0 or any(postings is None for postings in posting_lists):
+            return dict()
+
+        # Score the rarest term first. Later terms only score the Movies matched so far, probing their postings
+        # with binary searches when there are far fewer of those Movies than postings.
+        average_length = self.__total_length / len(self.__document_lengths)
+        scores: Optional[Dict[int, float]] = None
+
+        for postings in sorted(posting_lists, key=lambda p: len(p.ranks)):
+            if scores is None:
+                matches = zip(postings.ranks, postings.frequencies)
+            elif len(scores) * 16 < len(postings.ranks):
+                found = ((rank, postings.find(rank)) for rank in scores.keys())
+                matches = [(rank, postings.frequencies[i]) for rank, i in found if i >= 0]
+            else:
+                matches = [(rank, frequency) for rank, frequency in zip(postings.ranks, postings.frequencies)
+                           if rank in scores]
+
+            # BM25 term weight, idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * length / average length))
+            idf = self.__idf(postings)
+            weight = idf * (BM25_K1 + 1)
+            base = BM25_K1 * (1 - BM25_B)
+            slope = BM25_K1 * BM25_B / average_length
+            document_lengths = self.__document_lengths
+            term_scores = {rank: weight * frequency / (frequency + base + slope * document_lengths[rank])
+                           for rank, frequency in matches}
+
+            scores = term_scores if scores is None else {rank: scores[rank] + score
+                                                         for rank, score in term_scores.items()}
+
+        for phrase in phrases:
+            if len(phrase) > 1:
+                scores = {rank: score for rank, score in scores.items() if self.__contains_phrase(rank, phrase)}
+
+        return scores
+
+    def __contains_phrase(self, rank: int, phrase: List[str]) -> bool:
+        starts = None
+
+        for offset, term in enumerate(phrase):
+            postings = self.__postings[term]
+            term_starts = {position - offset for position in postings.positions_at(postings.find(rank))}
+            starts = term_starts if starts is None else starts & term_starts
+            if not starts:
+                return False
+
+        return True
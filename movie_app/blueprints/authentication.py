@@ -99,8 +99,11 @@ def login():
             return redirect(url_for('home_bp.home'))
 
         except services.UnknownUserException:
-            # Username not known to the system, set a suitable error message.
+            # Username not known to the system, set a suitable error message suggesting the closest username.
             username_not_recognised = 'Sorry that username not recognised. Please enter another.'
+            suggestions = services.get_user_name_suggestions(form.username.data, 1, repo.repo_instance)
+            if len(suggestions) > 0:
+                username_not_recognised = f"Sorry that username not recognised. Did you mean {suggestions[0]}?"
 
         except services.AuthenticationException:
             # Authentication failed, set a suitable error message.
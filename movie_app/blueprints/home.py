@@ -6,11 +6,11 @@ home_blueprint = Blueprint('home_bp', __name__)
 
 
 @home_blueprint.route('/', methods=['GET'])
+@utilities.conditional_page
+@utilities.cached_page
 def home():
+    # The lists of the most common directors, actors and genres are rendered by the top_lists template global
     return render_template(
         'home.html',
-        random_movies=utilities.get_random_movies(),
-        common_director_urls=utilities.get_most_common_directors_and_urls(),
-        common_actor_urls=utilities.get_most_common_actors_and_urls(),
-        common_genre_urls=utilities.get_most_common_genres_and_urls()
+        random_movies=utilities.get_random_movies()
     )
@@ -1,3 +1,5 @@
+from typing import Dict, Optional, Tuple
+
 from flask import Blueprint, render_template, redirect, request, url_for, session, flash
 
 from better_profanity import profanity
@@ -9,13 +11,54 @@ import movie_app.adapters.repository as repo
 import movie_app.blueprints.utilities as utilities
 import movie_app.services.movie_services as services
 import movie_app.services.user_services as user_services
-from movie_app.domainmodel import Movie, Genre
+from movie_app.domainmodel import Movie, Director, Genre
 
 from movie_app.blueprints.authentication import login_required
 
 # Configure Blueprint
 movie_blueprint = Blueprint('movie_bp', __name__)
 
+# Number of close names suggested for a name that does not match any Director or Actor
+SUGGESTED_NAMES = 3
+
+
+# Browse pages show this many Movies, unless the URL asks for between 1 and MAX_MOVIES_PER_PAGE of them
+MOVIES_PER_PAGE = 3
+MAX_MOVIES_PER_PAGE = 30
+
+
+def get_page_size(size: str) -> int:
+    """ Returns the number of Movies to show on a browse page, given the size query parameter. """
+    try:
+        return min(max(int(size), 1), MAX_MOVIES_PER_PAGE)
+    except (TypeError, ValueError):
+        return MOVIES_PER_PAGE
+
+
+def get_page_size_argument(movies_per_page: int):
+    """ Returns the size query parameter of a browse page URL, which is left out for the default size. """
+    return movies_per_page if movies_per_page != MOVIES_PER_PAGE else None
+
+
+def get_page_urls(endpoint: str, page: Dict, movies_per_page: int, **url_args) -> Tuple[Optional[str], ...]:
+    """ Returns the URLs of the first, previous, next and last pages of a page of Movies returned by
+    services.get_movie_page, each None if there is no such page.
+    """
+    url_args['size'] = get_page_size_argument(movies_per_page)
+    first_movie_url, prev_movie_url, next_movie_url, last_movie_url = None, None, None, None
+
+    if page['previous_cursor'] is not None:
+        # There are preceding Movies, so generate URLs for the 'previous' and 'first' navigation buttons.
+        prev_movie_url = url_for(endpoint, **url_args, cursor=page['previous_cursor'])
+        first_movie_url = url_for(endpoint, **url_args)
+
+    if page['next_cursor'] is not None:
+        # There are further Movies, so generate URLs for the 'next' and 'last' navigation buttons.
+        next_movie_url = url_for(endpoint, **url_args, cursor=page['next_cursor'])
+        last_movie_url = url_for(endpoint, **url_args, cursor=page['last_cursor'])
+
+    return first_movie_url, prev_movie_url, next_movie_url, last_movie_url
+
 
 class ProfanityFree:
     def __init__(self, message=None):
@@ -41,84 +84,58 @@ class ReviewForm(FlaskForm):
 
 
 class MovieSearchForm(FlaskForm):
-    choices = ['Director', 'Actor', 'Genre']
+    choices = ['Title or description', 'Director', 'Actor', 'Genre', 'Runtime, rating, votes, revenue or metascore',
+               'Query, e.g. (genre:Action OR genre:Sci-Fi) NOT genre:Horror']
     select = SelectField('Search for Movie by:', choices=choices)
     search = StringField('')
     submit = SubmitField('Search')
 
 
 @movie_blueprint.route('/movies_by_director', methods=['GET'])
+@utilities.conditional_page
+@utilities.cached_page
 def movies_by_director():
-    movies_per_page = 3
-
-    # Read query parameters
+    # Read query parameters, e.g. director=James Gunn&sort=-rating&size=10
     director_full_name = request.args.get('director')
+    sort = request.args.get('sort', '')
     cursor = request.args.get('cursor')
-    movie_to_show_reviews = request.args.get('view_reviews_for')
-
-    try:
-        # Try converting movie_to_show_reviews from string to int.
-        movie_to_show_reviews = int(movie_to_show_reviews)
-    except TypeError:
-        # No view_reviews_for query parameter, so set to a non-existent movie rank.
-        movie_to_show_reviews = -1
-
-    try:
-        # Try converting cursor from string to int.
-        cursor = int(cursor)
-    except TypeError:
-        # No cursor query parameter, so initialise cursor to start at the beginning.
-        cursor = 0
+    movies_per_page = get_page_size(request.args.get('size'))
+    movie_to_show_reviews = utilities.get_movie_to_show_reviews()
 
     # Retrieve Movie ranks for Movies with the given director.
+    did_you_mean_urls = dict()
     try:
         director = services.get_director(director_full_name, repo.repo_instance)
+        director_full_name = director.director_full_name
     except services.ServicesException:
         director = None
+        for suggestion in services.get_director_name_suggestions(
+                director_full_name, SUGGESTED_NAMES, repo.repo_instance):
+            did_you_mean_urls[suggestion] = url_for('movie_bp.movies_by_director', director=suggestion)
 
-    movie_ranks = services.get_movie_ranks_by_director(director, repo.repo_instance)
-
-    # Retrieve only a batch of Movies to display on the Web page
-    movies = services.get_movies_by_rank(movie_ranks[cursor:cursor + movies_per_page], repo.repo_instance)
+    # Order the Movies as requested, e.g. sort=-rating for the highest rated first. Unknown orders leave rank order.
+    try:
+        sort_attribute, descending = services.parse_sort_order(sort)
+    except services.ServicesException:
+        sort, sort_attribute, descending = '', None, False
 
-    first_movie_url = None
-    last_movie_url = None
-    next_movie_url = None
-    prev_movie_url = None
+    # Retrieve only the page of Movies to display on the Web page
+    director_list = [director] if director is not None else []
+    page = services.get_movie_page(
+        'director', director_list, cursor, movies_per_page, sort_attribute, descending, repo.repo_instance)
+    movies = services.get_movies_by_rank(page['ranks'], repo.repo_instance)
 
-    director_urls = dict()
-    actor_urls = dict()
-    genre_urls = dict()
     view_review_urls = dict()
-    add_review_urls = dict()
-    add_watchlist_urls = dict()
-    image_urls = dict()
-
-    director_urls[director_full_name] = url_for('movie_bp.movies_by_director', director=director_full_name)
 
     for movie in movies:
-        actor_urls.update(utilities.get_actor_urls_for_movie(movie))
-        genre_urls.update(utilities.get_genre_urls_for_movie(movie))
         view_review_urls[movie.rank] = url_for('movie_bp.movies_by_director', director=director_full_name,
+                                               sort=sort or None, size=get_page_size_argument(movies_per_page),
                                                cursor=cursor, view_reviews_for=movie.rank)
-        add_review_urls[movie.rank] = url_for('movie_bp.create_movie_review', add_review_for=movie.rank)
-        add_watchlist_urls[movie.rank] = url_for('user_activity_bp.browse_watchlist', movie=movie.rank)
-        image_urls[movie.rank] = utilities.get_image_url_for_movie(movie.title)
 
-    if cursor > 0:
-        # There are preceding Movies, so generate URLs for the 'previous' and 'first' navigation buttons.
-        prev_movie_url = url_for(
-            'movie_bp.movies_by_director', director=director_full_name, cursor=cursor - movies_per_page)
-        first_movie_url = url_for('movie_bp.movies_by_director', director=director_full_name)
+    image_urls = utilities.get_image_urls_for_movies(movies)
 
-    if cursor + movies_per_page < len(movie_ranks):
-        # There are further Movies, so generate URLs for the 'next' and 'last' navigation buttons.
-        next_movie_url = url_for(
-            'movie_bp.movies_by_director', director=director_full_name, cursor=cursor + movies_per_page)
-        last_cursor = movies_per_page * int(len(movie_ranks) / movies_per_page)
-        if len(movie_ranks) % movies_per_page == 0:
-            last_cursor -= movies_per_page
-        last_movie_url = url_for('movie_bp.movies_by_director', director=director_full_name, cursor=last_cursor)
+    first_movie_url, prev_movie_url, next_movie_url, last_movie_url = get_page_urls(
+        'movie_bp.movies_by_director', page, movies_per_page, director=director_full_name, sort=sort or None)
 
     # Generate the webpage to display the Movies.
     return render_template(
@@ -126,98 +143,66 @@ def movies_by_director():
         title='Movies',
         movies_title='Movies directed by ' + director_full_name,
         movies=movies,
+        number_of_movies=page['number_of_movies'],
+        did_you_mean_urls=did_you_mean_urls,
         random_movies=utilities.get_random_movies(len(movies) * 2),
         first_movie_url=first_movie_url,
         last_movie_url=last_movie_url,
         prev_movie_url=prev_movie_url,
         next_movie_url=next_movie_url,
-        director_urls=director_urls,
-        actor_urls=actor_urls,
-        genre_urls=genre_urls,
         view_review_urls=view_review_urls,
-        add_review_urls=add_review_urls,
         show_reviews_for_movie=movie_to_show_reviews,
-        image_urls=image_urls,
-        add_watchlist_urls=add_watchlist_urls
+        image_urls=image_urls
     )
 
 
 @movie_blueprint.route('/movies_by_actors', methods=['GET'])
+@utilities.conditional_page
+@utilities.cached_page
 def movies_by_actors():
-    movies_per_page = 3
-
-    # Read query parameters
+    # Read query parameters, e.g. actors=Chris Pratt/Zoe Saldana&sort=-rating&size=10
     actor_full_names_string = request.args.get('actors')
     actor_full_names = actor_full_names_string.split('/')
+    sort = request.args.get('sort', '')
     cursor = request.args.get('cursor')
-    movie_to_show_reviews = request.args.get('view_reviews_for')
-
-    try:
-        # Try converting movie_to_show_reviews from string to int.
-        movie_to_show_reviews = int(movie_to_show_reviews)
-    except TypeError:
-        # No view_reviews_for query parameter, so set to a non-existent movie rank.
-        movie_to_show_reviews = -1
-
-    try:
-        # Try converting cursor from string to int.
-        cursor = int(cursor)
-    except TypeError:
-        # No cursor query parameter, so initialise cursor to start at the beginning.
-        cursor = 0
+    movies_per_page = get_page_size(request.args.get('size'))
+    movie_to_show_reviews = utilities.get_movie_to_show_reviews()
 
     # Retrieve Movie ranks for Movies with the given actors.
     actors = []
+    did_you_mean_urls = dict()
 
     for name in actor_full_names:
         try:
             actors.append(services.get_actor(name, repo.repo_instance))
         except services.ServicesException:
-            pass  # Ignore exception and do not add actor to list
-
-    movie_ranks = services.get_movie_ranks_by_actors(actors, repo.repo_instance)
+            # Do not add actor to list, but suggest the Actors with names close to it in its place
+            for suggestion in services.get_actor_name_suggestions(name, SUGGESTED_NAMES, repo.repo_instance):
+                suggested_names = [suggestion if other == name else other for other in actor_full_names]
+                did_you_mean_urls[suggestion] = url_for('movie_bp.movies_by_actors', actors='/'.join(suggested_names))
 
-    # Retrieve only a batch of Movies to display on the Web page
-    movies = services.get_movies_by_rank(movie_ranks[cursor:cursor + movies_per_page], repo.repo_instance)
+    # Order the Movies as requested, e.g. sort=-rating for the highest rated first. Unknown orders leave rank order.
+    try:
+        sort_attribute, descending = services.parse_sort_order(sort)
+    except services.ServicesException:
+        sort, sort_attribute, descending = '', None, False
 
-    first_movie_url = None
-    last_movie_url = None
-    next_movie_url = None
-    prev_movie_url = None
+    # Retrieve only the page of Movies to display on the Web page
+    page = services.get_movie_page(
+        'actor', actors, cursor, movies_per_page, sort_attribute, descending, repo.repo_instance)
+    movies = services.get_movies_by_rank(page['ranks'], repo.repo_instance)
 
-    director_urls = dict()
-    actor_urls = dict()
-    genre_urls = dict()
     view_review_urls = dict()
-    add_review_urls = dict()
-    add_watchlist_urls = dict()
-    image_urls = dict()
 
     for movie in movies:
-        director_full_name = movie.director.director_full_name
-        director_urls[director_full_name] = url_for('movie_bp.movies_by_director', director=director_full_name)
-        actor_urls.update(utilities.get_actor_urls_for_movie(movie))
-        genre_urls.update(utilities.get_genre_urls_for_movie(movie))
         view_review_urls[movie.rank] = url_for('movie_bp.movies_by_actors', actors=actor_full_names_string,
+                                               sort=sort or None, size=get_page_size_argument(movies_per_page),
                                                cursor=cursor, view_reviews_for=movie.rank)
-        add_review_urls[movie.rank] = url_for('movie_bp.create_movie_review', add_review_for=movie.rank)
-        add_watchlist_urls[movie.rank] = url_for('user_activity_bp.browse_watchlist', movie=movie.rank)
-        image_urls[movie.rank] = utilities.get_image_url_for_movie(movie.title)
 
-    if cursor > 0:
-        # There are preceding Movies, so generate URLs for the 'previous' and 'first' navigation buttons.
-        prev_movie_url = url_for(
-            'movie_bp.movies_by_actors', actors=actor_full_names_string, cursor=cursor - movies_per_page)
-        first_movie_url = url_for('movie_bp.movies_by_actors', actors=actor_full_names_string)
+    image_urls = utilities.get_image_urls_for_movies(movies)
 
-    if cursor + movies_per_page < len(movie_ranks):
-        # There are further Movies, so generate URLs for the 'next' and 'last' navigation buttons.
-        next_movie_url = url_for(
-            'movie_bp.movies_by_actors', actors=actor_full_names_string, cursor=cursor + movies_per_page)
-        last_cursor = movies_per_page * int(len(movie_ranks) / movies_per_page)
-        if len(movie_ranks) % movies_per_page == 0:
-            last_cursor -= movies_per_page
-        last_movie_url = url_for('movie_bp.movies_by_actors', actors=actor_full_names_string, cursor=last_cursor)
+    first_movie_url, prev_movie_url, next_movie_url, last_movie_url = get_page_urls(
+        'movie_bp.movies_by_actors', page, movies_per_page, actors=actor_full_names_string, sort=sort or None)
 
     # Generate the webpage to display the Movies.
     return render_template(
@@ -225,91 +210,55 @@ def movies_by_actors():
         title='Movies',
         movies_title=f"Movies with actors: {', '.join(actor_full_names)}",
         movies=movies,
+        number_of_movies=page['number_of_movies'],
+        did_you_mean_urls=did_you_mean_urls,
         random_movies=utilities.get_random_movies(len(movies) * 2),
         first_movie_url=first_movie_url,
         last_movie_url=last_movie_url,
         prev_movie_url=prev_movie_url,
         next_movie_url=next_movie_url,
-        director_urls=director_urls,
-        actor_urls=actor_urls,
-        genre_urls=genre_urls,
         view_review_urls=view_review_urls,
-        add_review_urls=add_review_urls,
         show_reviews_for_movie=movie_to_show_reviews,
-        image_urls=image_urls,
-        add_watchlist_urls=add_watchlist_urls
+        image_urls=image_urls
     )
 
 
 @movie_blueprint.route('/movies_by_genres', methods=['GET'])
+@utilities.conditional_page
+@utilities.cached_page
 def movies_by_genres():
-    movies_per_page = 3
-
-    # Read query parameters
+    # Read query parameters, e.g. genres=Comedy/Horror&sort=-rating&size=10
     genre_names_string = request.args.get('genres')
     genre_names = genre_names_string.split('/')
+    sort = request.args.get('sort', '')
     cursor = request.args.get('cursor')
-    movie_to_show_reviews = request.args.get('view_reviews_for')
-
-    try:
-        # Try converting movie_to_show_reviews from string to int.
-        movie_to_show_reviews = int(movie_to_show_reviews)
-    except TypeError:
-        # No view_reviews_for query parameter, so set to a non-existent movie rank.
-        movie_to_show_reviews = -1
-
-    try:
-        # Try converting cursor from string to int.
-        cursor = int(cursor)
-    except TypeError:
-        # No cursor query parameter, so initialise cursor to start at the beginning.
-        cursor = 0
+    movies_per_page = get_page_size(request.args.get('size'))
+    movie_to_show_reviews = utilities.get_movie_to_show_reviews()
 
     # Retrieve Movie ranks for Movies with the given genres.
     genres = [Genre(genre_name) for genre_name in genre_names]
-    movie_ranks = services.get_movie_ranks_by_genres(genres, repo.repo_instance)
-
-    # Retrieve only a batch of Movies to display on the Web page
-    movies = services.get_movies_by_rank(movie_ranks[cursor:cursor + movies_per_page], repo.repo_instance)
+    # Order the Movies as requested, e.g. sort=-rating for the highest rated first. Unknown orders leave rank order.
+    try:
+        sort_attribute, descending = services.parse_sort_order(sort)
+    except services.ServicesException:
+        sort, sort_attribute, descending = '', None, False
 
-    first_movie_url = None
-    last_movie_url = None
-    next_movie_url = None
-    prev_movie_url = None
+    # Retrieve only the page of Movies to display on the Web page
+    page = services.get_movie_page(
+        'genre', genres, cursor, movies_per_page, sort_attribute, descending, repo.repo_instance)
+    movies = services.get_movies_by_rank(page['ranks'], repo.repo_instance)
 
-    director_urls = dict()
-    actor_urls = dict()
-    genre_urls = dict()
     view_review_urls = dict()
-    add_review_urls = dict()
-    add_watchlist_urls = dict()
-    image_urls = dict()
 
     for movie in movies:
-        director_full_name = movie.director.director_full_name
-        director_urls[director_full_name] = url_for('movie_bp.movies_by_director', director=director_full_name)
-        actor_urls.update(utilities.get_actor_urls_for_movie(movie))
-        genre_urls.update(utilities.get_genre_urls_for_movie(movie))
         view_review_urls[movie.rank] = url_for('movie_bp.movies_by_genres', genres=genre_names_string,
+                                               sort=sort or None, size=get_page_size_argument(movies_per_page),
                                                cursor=cursor, view_reviews_for=movie.rank)
-        add_review_urls[movie.rank] = url_for('movie_bp.create_movie_review', add_review_for=movie.rank)
-        add_watchlist_urls[movie.rank] = url_for('user_activity_bp.browse_watchlist', movie=movie.rank)
-        image_urls[movie.rank] = utilities.get_image_url_for_movie(movie.title)
 
-    if cursor > 0:
-        # There are preceding Movies, so generate URLs for the 'previous' and 'first' navigation buttons.
-        prev_movie_url = url_for(
-            'movie_bp.movies_by_genres', genres=genre_names_string, cursor=cursor - movies_per_page)
-        first_movie_url = url_for('movie_bp.movies_by_genres', genres=genre_names_string)
+    image_urls = utilities.get_image_urls_for_movies(movies)
 
-    if cursor + movies_per_page < len(movie_ranks):
-        # There are further Movies, so generate URLs for the 'next' and 'last' navigation buttons.
-        next_movie_url = url_for(
-            'movie_bp.movies_by_genres', genres=genre_names_string, cursor=cursor + movies_per_page)
-        last_cursor = movies_per_page * int(len(movie_ranks) / movies_per_page)
-        if len(movie_ranks) % movies_per_page == 0:
-            last_cursor -= movies_per_page
-        last_movie_url = url_for('movie_bp.movies_by_genres', genres=genre_names_string, cursor=last_cursor)
+    first_movie_url, prev_movie_url, next_movie_url, last_movie_url = get_page_urls(
+        'movie_bp.movies_by_genres', page, movies_per_page, genres=genre_names_string, sort=sort or None)
 
     # Generate the webpage to display the Movies.
     return render_template(
@@ -317,19 +266,183 @@ def movies_by_genres():
         title='Movies',
         movies_title=f"Movies with genres: {', '.join(genre_names)}",
         movies=movies,
+        number_of_movies=page['number_of_movies'],
+        random_movies=utilities.get_random_movies(len(movies) * 2),
+        first_movie_url=first_movie_url,
+        last_movie_url=last_movie_url,
+        prev_movie_url=prev_movie_url,
+        next_movie_url=next_movie_url,
+        view_review_urls=view_review_urls,
+        show_reviews_for_movie=movie_to_show_reviews,
+        image_urls=image_urls
+    )
+
+
+@movie_blueprint.route('/movies_by_ranges', methods=['GET'])
+@utilities.conditional_page
+@utilities.cached_page
+def movies_by_ranges():
+    # Read query parameters, e.g. ranges=metascore>=80/runtime<120&size=10. Director, actors and genres further narrow
+    # the Movies down, and are carried over to the navigation URLs.
+    ranges_string = request.args.get('ranges', '')
+    filter_args = {name: request.args.get(name) for name in ('director', 'actors', 'genres')
+                   if request.args.get(name)}
+    cursor = request.args.get('cursor')
+    movies_per_page = get_page_size(request.args.get('size'))
+    movie_to_show_reviews = utilities.get_movie_to_show_reviews()
+
+    # Retrieve Movie ranks for Movies matching the given range conditions.
+    conditions = [condition for condition in ranges_string.split('/') if condition.strip()]
+    predicates = []
+
+    for condition in conditions:
+        try:
+            predicates.append(services.parse_range_condition(condition))
+        except services.ServicesException:
+            pass  # Ignore exception and do not filter on the condition
+
+    director = Director(filter_args['director']) if 'director' in filter_args else None
+    genres = [Genre(name) for name in filter_args['genres'].split('/')] if 'genres' in filter_args else None
+    actors = None
+
+    if 'actors' in filter_args:
+        actors = []
+        for name in filter_args['actors'].split('/'):
+            try:
+                actors.append(services.get_actor(name, repo.repo_instance))
+            except services.ServicesException:
+                pass  # Ignore exception and do not add actor to list
+
+    movie_ranks = services.get_movie_ranks_by_ranges(predicates, repo.repo_instance, director, actors, genres)
+
+    # Retrieve only the page of Movies to display on the Web page
+    page = services.get_list_page(movie_ranks, cursor, movies_per_page)
+    movies = services.get_movies_by_rank(page['ranks'], repo.repo_instance)
+
+    view_review_urls = dict()
+
+    for movie in movies:
+        view_review_urls[movie.rank] = url_for('movie_bp.movies_by_ranges', ranges=ranges_string, **filter_args,
+                                               size=get_page_size_argument(movies_per_page), cursor=cursor,
+                                               view_reviews_for=movie.rank)
+
+    image_urls = utilities.get_image_urls_for_movies(movies)
+
+    first_movie_url, prev_movie_url, next_movie_url, last_movie_url = get_page_urls(
+        'movie_bp.movies_by_ranges', page, movies_per_page, ranges=ranges_string, **filter_args)
+
+    # Generate the webpage to display the Movies.
+    return render_template(
+        'movies/movies.html',
+        title='Movies',
+        movies_title=f"Movies with {', '.join(conditions + list(filter_args.values())) or 'any attributes'}",
+        movies=movies,
+        random_movies=utilities.get_random_movies(len(movies) * 2),
+        first_movie_url=first_movie_url,
+        last_movie_url=last_movie_url,
+        prev_movie_url=prev_movie_url,
+        next_movie_url=next_movie_url,
+        view_review_urls=view_review_urls,
+        show_reviews_for_movie=movie_to_show_reviews,
+        image_urls=image_urls
+    )
+
+
+@movie_blueprint.route('/movies_by_text', methods=['GET'])
+@utilities.conditional_page
+@utilities.cached_page
+def movies_by_text():
+    # Read query parameters, e.g. query=intergalactic criminals&size=10
+    query = request.args.get('query', '')
+    cursor = request.args.get('cursor')
+    movies_per_page = get_page_size(request.args.get('size'))
+    movie_to_show_reviews = utilities.get_movie_to_show_reviews()
+
+    # Retrieve the ranks of only the page of the most relevant Movies, and the number of matching Movies.
+    page = services.get_text_search_page(query, cursor, movies_per_page, repo.repo_instance)
+    movies = services.get_movies_by_rank(page['ranks'], repo.repo_instance)
+
+    view_review_urls = dict()
+
+    for movie in movies:
+        view_review_urls[movie.rank] = url_for('movie_bp.movies_by_text', query=query,
+                                               size=get_page_size_argument(movies_per_page), cursor=cursor,
+                                               view_reviews_for=movie.rank)
+
+    image_urls = utilities.get_image_urls_for_movies(movies)
+
+    first_movie_url, prev_movie_url, next_movie_url, last_movie_url = get_page_urls(
+        'movie_bp.movies_by_text', page, movies_per_page, query=query)
+
+    # Generate the webpage to display the Movies.
+    return render_template(
+        'movies/movies.html',
+        title='Movies',
+        movies_title=f"Movies matching: {query}" if page['number_of_movies'] > 0 else
+        f"No movies found matching: {query}",
+        movies=movies,
         random_movies=utilities.get_random_movies(len(movies) * 2),
         first_movie_url=first_movie_url,
         last_movie_url=last_movie_url,
         prev_movie_url=prev_movie_url,
         next_movie_url=next_movie_url,
-        director_urls=director_urls,
-        actor_urls=actor_urls,
-        genre_urls=genre_urls,
         view_review_urls=view_review_urls,
-        add_review_urls=add_review_urls,
         show_reviews_for_movie=movie_to_show_reviews,
-        image_urls=image_urls,
-        add_watchlist_urls=add_watchlist_urls
+        image_urls=image_urls
+    )
+
+
+@movie_blueprint.route('/movies_by_query', methods=['GET'])
+@utilities.conditional_page
+@utilities.cached_page
+def movies_by_query():
+    # Read query parameters, e.g. query=(genre:Action OR genre:Sci-Fi) NOT genre:Horror&sort=-rating&size=10
+    query = request.args.get('query', '')
+    sort = request.args.get('sort', '')
+    cursor = request.args.get('cursor')
+    movies_per_page = get_page_size(request.args.get('size'))
+    movie_to_show_reviews = utilities.get_movie_to_show_reviews()
+
+    # Retrieve Movie ranks for Movies matching the query, in the requested order.
+    try:
+        sort_attribute, descending = services.parse_sort_order(sort)
+        movie_ranks = services.get_movie_ranks_by_query(
+            services.parse_movie_query(query), repo.repo_instance, sort_attribute, descending)
+        movies_title = f"Movies matching: {query}" if len(movie_ranks) > 0 else f"No movies found matching: {query}"
+    except services.ServicesException as e:
+        movie_ranks = []
+        movies_title = f"Query is not valid: {e}"
+
+    # Retrieve only the page of Movies to display on the Web page
+    page = services.get_list_page(movie_ranks, cursor, movies_per_page)
+    movies = services.get_movies_by_rank(page['ranks'], repo.repo_instance)
+
+    view_review_urls = dict()
+
+    for movie in movies:
+        view_review_urls[movie.rank] = url_for('movie_bp.movies_by_query', query=query, sort=sort or None,
+                                               size=get_page_size_argument(movies_per_page), cursor=cursor,
+                                               view_reviews_for=movie.rank)
+
+    image_urls = utilities.get_image_urls_for_movies(movies)
+
+    first_movie_url, prev_movie_url, next_movie_url, last_movie_url = get_page_urls(
+        'movie_bp.movies_by_query', page, movies_per_page, query=query, sort=sort or None)
+
+    # Generate the webpage to display the Movies.
+    return render_template(
+        'movies/movies.html',
+        title='Movies',
+        movies_title=movies_title,
+        movies=movies,
+        random_movies=utilities.get_random_movies(len(movies) * 2),
+        first_movie_url=first_movie_url,
+        last_movie_url=last_movie_url,
+        prev_movie_url=prev_movie_url,
+        next_movie_url=next_movie_url,
+        view_review_urls=view_review_urls,
+        show_reviews_for_movie=movie_to_show_reviews,
+        image_urls=image_urls
     )
 
 
@@ -349,7 +462,8 @@ def create_movie_review():
             form.movie_rank.data = review.movie.rank
             form.review_text.data = review.review_text
             form.rating.data = review.rating
-            services.remove_review(review)
+            services.remove_review(review, repo.repo_instance)
+            utilities.invalidate_movie_fragments(review.movie.rank)
         except user_services.ServicesException:
             pass    # Ignore exception and don't edit review
 
@@ -361,6 +475,9 @@ def create_movie_review():
         # Using the service layer to create and store the new review.
         services.create_review(movie_rank, form.review_text.data, form.rating.data, username, repo.repo_instance)
 
+        # Evict the cached cards and pages showing the Movie, which are the only ones the new review changes.
+        utilities.invalidate_movie_fragments(movie_rank)
+
         # Retrieve the Movie that was reviewed.
         movie: Movie = services.get_movies_by_rank([movie_rank], repo.repo_instance)[0]
 
@@ -384,13 +501,12 @@ def create_movie_review():
     director_urls = dict()
     actor_urls = dict()
     genre_urls = dict()
-    image_urls = dict()
 
     director_full_name = movie.director.director_full_name
     director_urls[director_full_name] = url_for('movie_bp.movies_by_director', director=director_full_name)
     actor_urls.update(utilities.get_actor_urls_for_movie(movie))
     genre_urls.update(utilities.get_genre_urls_for_movie(movie))
-    image_urls[movie.rank] = utilities.get_image_url_for_movie(movie.title)
+    image_urls = utilities.get_image_urls_for_movies([movie])
 
     return render_template(
         'movies/create_movie_review.html',
@@ -413,7 +529,13 @@ def search_for_movies():
     if request.method == 'POST':
         choice = search_form.select.data.lower()
 
-        if 'director' in choice:
+        if 'title' in choice:
+            return redirect(url_for('movie_bp.movies_by_text', query=search_form.data['search']))
+
+        elif 'query' in choice:
+            return redirect(url_for('movie_bp.movies_by_query', query=search_form.data['search']))
+
+        elif 'director' in choice:
             director_full_name = search_form.data['search']
             return redirect(url_for('movie_bp.movies_by_director', director=director_full_name))
 
@@ -425,6 +547,10 @@ def search_for_movies():
             genre_names_string = '/'.join([name.strip() for name in search_form.data['search'].split(',')])
             return redirect(url_for('movie_bp.movies_by_genres', genres=genre_names_string))
 
+        elif 'metascore' in choice:
+            ranges_string = '/'.join([condition.strip() for condition in search_form.data['search'].split(',')])
+            return redirect(url_for('movie_bp.movies_by_ranges', ranges=ranges_string))
+
         else:
             flash('No movies found with the given attributes!')
             return redirect('/search_for_movies')
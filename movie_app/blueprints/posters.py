@@ -0,0 +1,57 @@
+from flask import Blueprint, request, redirect, url_for, send_file, abort, make_response
+import requests
+from requests.adapters import HTTPAdapter
+
+import movie_app.adapters.repository as repo
+import movie_app.adapters.poster_store as poster_store
+import movie_app.blueprints.utilities as utilities
+import movie_app.services.movie_services as services
+
+# Versioned poster URLs are never revalidated, as a new poster is given a new version
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'public, no-cache'
+
+# Configure Blueprint
+posters_blueprint = Blueprint('posters_bp', __name__)
+
+poster_session = requests.Session()
+poster_session.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=utilities.POSTER_WORKERS))
+poster_session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=utilities.POSTER_WORKERS))
+
+
+@posters_blueprint.route('/posters/<int:rank>', methods=['GET'])
+def poster(rank: int):
+    store = poster_store.store_instance
+    size = request.args.get('size', poster_store.ORIGINAL)
+
+    if store is None or size not in store.sizes:
+        abort(404)
+
+    try:
+        movie = services.get_movies_by_rank([rank], repo.repo_instance)[0]
+    except (services.ServicesException, IndexError):
+        abort(404)
+
+    stored_poster = store.get(movie.title, movie.release_year, size)
+
+    if stored_poster is None:
+        # Copy the poster from OMDb the first time it is requested
+        poster_url = utilities.get_poster_url_for_movie(movie)
+        try:
+            if poster_url is None:
+                raise poster_store.PosterStoreException(f"{movie} has no poster")
+            store.store_from_url(movie.title, movie.release_year, poster_url, poster_session)
+        except poster_store.PosterStoreException:
+            return redirect(url_for('static', filename=utilities.PLACEHOLDER_IMAGE))
+
+        stored_poster = store.get(movie.title, movie.release_year, size)
+
+    if stored_poster.etag in request.if_none_match:
+        response = make_response('', 304)
+    else:
+        response = send_file(stored_poster.path, mimetype=stored_poster.mimetype, add_etags=False, conditional=False)
+
+    response.set_etag(stored_poster.etag)
+    is_versioned = request.args.get('v') == utilities.poster_version(stored_poster)
+    response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL if is_versioned else REVALIDATE_CACHE_CONTROL
+    return response
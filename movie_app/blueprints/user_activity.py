@@ -53,8 +53,8 @@ def browse_watchlist():
             if movie_rank is not None:
                 movie_rank = int(movie_rank)
                 movie = movie_services.get_movies_by_rank([movie_rank], repo.repo_instance)[0]
-                user.watchlist.add_movie(movie)
-        except movie_services.ServicesException:
+                services.add_movie_to_watchlist(user, movie, repo.repo_instance)
+        except (movie_services.ServicesException, services.ServicesException):
             pass    # Ignore exception and don't modify watchlist
     except auth_services.UnknownUserException:
         pass    # Ignore exception and don't modify watchlist
@@ -67,7 +67,8 @@ def browse_watchlist():
             director_urls[director_full_name] = url_for('movie_bp.movies_by_director', director=director_full_name)
             actor_urls.update(utilities.get_actor_urls_for_movie(movie))
             genre_urls.update(utilities.get_genre_urls_for_movie(movie))
-            image_urls[movie.rank] = utilities.get_image_url_for_movie(movie.title)
+
+        image_urls = utilities.get_image_urls_for_movies(list(watchlist))
 
     # Generate the webpage to display the Watchlist for the user.
     return render_template(
@@ -1,9 +1,32 @@
-from flask import Blueprint, url_for
-import requests
+import hashlib
+import time
+from concurrent import futures
+from functools import wraps
+from typing import Callable, Dict, Hashable, Iterable, List, Tuple
+
+from flask import Blueprint, url_for, jsonify, current_app, g, request, render_template, session, make_response
+from markupsafe import Markup
 import movie_app.adapters.repository as repo
+import movie_app.adapters.fragment_cache as fragment_cache
+import movie_app.adapters.poster_cache as poster_cache
+import movie_app.adapters.omdb_client as omdb_client
+import movie_app.adapters.poster_store as poster_store
+from movie_app.adapters.poster_enrichment import resolve_poster_url
 import movie_app.services.movie_services as services
 from movie_app.domainmodel import Movie
-from config import Config
+
+POSTER_WORKERS = 8
+POSTER_DEADLINE_SECONDS = 1.5
+PLACEHOLDER_IMAGE = 'images/poster_placeholder.svg'
+AUTOCOMPLETE_QUANTITY = 10
+MAX_AUTOCOMPLETE_QUANTITY = 50
+
+# Tags the pages showing a placeholder poster, which are not kept in the page cache as the poster may be found later
+PLACEHOLDER_TAG = ('placeholder',)
+
+# Poster lookups share one pool of threads. The OMDb client keeps a connection pool of the same size, so no lookup
+# waits for, or discards, a connection.
+poster_executor = futures.ThreadPoolExecutor(max_workers=POSTER_WORKERS, thread_name_prefix='poster')
 
 # Configure Blueprint
 utilities_blueprint = Blueprint('utilities_bp', __name__)
@@ -55,17 +78,247 @@ def get_genre_urls_for_movie(movie: Movie):
     return genre_urls
 
 
+def render_fragment(key: Hashable, movie_ranks: Iterable[int], render: Callable[[], str]) -> Markup:
+    """ Returns the HTML rendered by render, from the fragment cache if it was rendered before. The fragment is
+    evicted when any of the Movies with the ranks changes.
+    """
+    tags = [fragment_cache.movie_tag(rank) for rank in movie_ranks]
+    if 'page_tags' in g:
+        g.page_tags.update(tags)
+
+    cache = fragment_cache.cache_instance
+    return Markup(cache.get(key, render, tags) if cache is not None else render())
+
+
+@utilities_blueprint.app_template_global()
+def movie_card(movie: Movie, view_review_url: str, show_reviews: bool, image_url: str) -> Markup:
+    # A card only changes with its Movie's version, the page's link to its reviews, its poster and the user logging in
+    logged_in = 'username' in session
+    key = ('movie_card', movie.rank, repo.repo_instance.get_movie_version(movie.rank), view_review_url, show_reviews,
+           image_url, logged_in)
+
+    return render_fragment(key, [movie.rank], lambda: render_template(
+        'movies/movie_card.html', movie=movie, view_review_url=view_review_url, show_reviews=show_reviews,
+        image_url=image_url, logged_in=logged_in))
+
+
+@utilities_blueprint.app_template_global()
+def sidebar_movie(movie: Dict) -> Markup:
+    key = ('sidebar_movie', movie['rank'], repo.repo_instance.get_movie_version(movie['rank']), movie['img_url'])
+    return render_fragment(key, [movie['rank']], lambda: render_template('sidebar_movie.html', movie=movie))
+
+
+@utilities_blueprint.app_template_global()
+def top_lists(quantity=10) -> Markup:
+    # Only adding Movies changes the most common directors, actors and genres, and each adds to the number of Movies
+    key = ('top_lists', quantity, repo.repo_instance.get_number_of_movies())
+    return render_fragment(key, [], lambda: render_template(
+        'top_lists.html',
+        common_director_urls=get_most_common_directors_and_urls(quantity),
+        common_actor_urls=get_most_common_actors_and_urls(quantity),
+        common_genre_urls=get_most_common_genres_and_urls(quantity)
+    ))
+
+
+def invalidate_movie_fragments(movie_rank: int):
+    """ Evicts the cached fragments and pages showing the Movie with the rank. """
+    for cache in (fragment_cache.cache_instance, fragment_cache.page_cache_instance):
+        if cache is not None:
+            cache.invalidate_movie(movie_rank)
+
+
+def cached_page(view):
+    """ Caches the pages shown to anonymous users by the view, when a page cache is configured.
+
+    Pages are keyed by URL and the number of Movies, and tagged with the Movies they show, so a new Review of a Movie
+    evicts only the pages showing it. The recommendations in the sidebar of a cached page stay the same until then.
+    """
+    @wraps(view)
+    def wrapped_view(**kwargs):
+        cache = fragment_cache.page_cache_instance
+        if cache is None or 'username' in session:
+            return view(**kwargs)
+
+        g.page_tags = set()
+
+        def render_page():
+            page = view(**kwargs)
+            if g.get('placeholder_posters'):
+                g.page_tags.add(PLACEHOLDER_TAG)
+            return page
+
+        page = cache.get((request.full_path, repo.repo_instance.get_number_of_movies()), render_page, g.page_tags)
+        if PLACEHOLDER_TAG in g.page_tags:
+            cache.invalidate([PLACEHOLDER_TAG])
+        return page
+    return wrapped_view
+
+
+def get_page_etag(version: int) -> str:
+    """ Returns the ETag of a page rendered from the repository at the version, for the user logged in if any.
+
+    The repository's load token is part of the ETag, so pages rendered before a restart are not taken as current,
+    while the workers forked from one preloaded repository share its ETags.
+    """
+    page_state = f"{repo.repo_instance.get_load_token()}:{version}:{session.get('username', '')}"
+    return hashlib.sha1(page_state.encode()).hexdigest()[:20]
+
+
+def conditional_page(view):
+    """ Tags the pages of the view with a weak ETag derived from the repository version, and answers requests
+    revalidating a page with 304 Not Modified while the version and user are the same, without rendering templates
+    or looking up posters.
+
+    Pages showing placeholder posters are sent without an ETag, so they are fetched again once the posters are found.
+    """
+    @wraps(view)
+    def wrapped_view(**kwargs):
+        # The version is read before rendering, so a change made meanwhile cannot go unnoticed by the next request
+        etag = get_page_etag(repo.repo_instance.get_version())
+        if request.if_none_match.contains_weak(etag):
+            response = current_app.response_class(status=304)
+            response.set_etag(etag, weak=True)
+        else:
+            response = make_response(view(**kwargs))
+            if not g.get('placeholder_posters'):
+                response.set_etag(etag, weak=True)
+
+        # Browsers keep pages, which depend on the user logged in, but revalidate them before showing them again
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        return response
+    return wrapped_view
+
+
+def get_movie_to_show_reviews() -> int:
+    """ Returns the rank of the Movie whose reviews are shown, from the view_reviews_for query parameter, or a
+    non-existent rank if the parameter is missing or malformed.
+    """
+    try:
+        return int(request.args.get('view_reviews_for'))
+    except (TypeError, ValueError):
+        return -1
+
+
 def get_random_movies(quantity=3):
     movies = services.get_random_movies(quantity, repo.repo_instance)
+    image_urls = get_image_urls({movie['rank']: (movie['title'], movie['release_year']) for movie in movies},
+                                size='small')
     for movie in movies:
-        movie['img_url'] = get_image_url_for_movie(movie['title'])
+        movie['img_url'] = image_urls[movie['rank']]
 
     return movies
 
 
-def get_image_url_for_movie(movie_title: str):
-    url = f"http://www.omdbapi.com/?t={movie_title}&apikey={Config.OMDB_KEY}"
-    movie_info = requests.get(url).json()
+def get_image_urls_for_movies(movies: List[Movie], size: str = 'large') -> Dict[int, str]:
+    return get_image_urls({movie.rank: (movie.title, movie.release_year) for movie in movies}, size)
+
+
+def get_image_urls(movie_titles_by_rank: Dict[int, Tuple[str, int]], size: str = 'large') -> Dict[int, str]:
+    """ Returns the poster URL of each movie, keyed by rank, resolving the uncached posters concurrently.
+
+    Posters loaded with the repository or held in the poster cache are returned straight away. Posters that are not
+    resolved by the page deadline, or could not be resolved at all, are given the placeholder image. Their lookups
+    continue in the background and fill the poster cache for later pages.
+
+    When a poster store is configured, posters are served by the poster proxy at the given size instead of by OMDb.
+    """
+    cache = poster_cache.cache_instance
+    image_urls = dict()
+    pending = dict()
+
+    for rank, (movie_title, release_year) in movie_titles_by_rank.items():
+        movie = repo.repo_instance.get_movie_by_rank(rank) if repo.repo_instance is not None else None
+        if movie is not None and repo.repo_instance.has_poster_url(movie):
+            image_urls[rank] = repo.repo_instance.get_poster_url(movie)
+            continue
+
+        image_url = cache.get(movie_title, release_year) if cache is not None else poster_cache.MISSING
+        if image_url is poster_cache.MISSING:
+            pending[poster_executor.submit(get_image_url_for_movie, movie_title, release_year)] = rank
+        else:
+            image_urls[rank] = image_url
+
+    if pending:
+        done, _ = futures.wait(pending.keys(), timeout=max(0.0, get_poster_deadline() - time.monotonic()))
+        for future in done:
+            if future.exception() is None:
+                image_urls[pending[future]] = future.result()
+        # The posters still being looked up are shown as placeholders, so the page showing them is not cached
+        if len(done) < len(pending):
+            g.placeholder_posters = True
+
+    placeholder_url = url_for('static', filename=PLACEHOLDER_IMAGE)
+    store = poster_store.store_instance
+
+    if store is not None:
+        for rank, image_url in image_urls.items():
+            if image_url is not None:
+                image_urls[rank] = get_proxy_image_url(store, rank, *movie_titles_by_rank[rank], size)
+
+    return {rank: image_urls.get(rank) or placeholder_url for rank in movie_titles_by_rank.keys()}
+
+
+def get_proxy_image_url(store, rank: int, movie_title: str, release_year: int, size: str) -> str:
+    # Posters already copied are linked with their version, which lets browsers cache them indefinitely
+    size = size if size in store.sizes else poster_store.ORIGINAL
+    stored_poster = store.get(movie_title, release_year, size)
+    version = poster_version(stored_poster) if stored_poster is not None else None
+    return url_for('posters_bp.poster', rank=rank, size=size, v=version)
+
+
+def poster_version(stored_poster) -> str:
+    return stored_poster.etag[:16]
+
+
+def get_poster_url_for_movie(movie: Movie):
+    """ Returns the OMDb poster URL of the given Movie, from the repository if it has been looked up already. """
+    if repo.repo_instance is not None and repo.repo_instance.has_poster_url(movie):
+        return repo.repo_instance.get_poster_url(movie)
+    return get_image_url_for_movie(movie.title, movie.release_year)
+
+
+def get_poster_deadline() -> float:
+    # The deadline is shared by all posters of a page, such as those of the browsed movies and of the sidebar
+    if 'poster_deadline' not in g:
+        g.poster_deadline = time.monotonic() + current_app.config.get('POSTER_DEADLINE_SECONDS',
+                                                                      POSTER_DEADLINE_SECONDS)
+    return g.poster_deadline
+
+
+def get_image_url_for_movie(movie_title: str, release_year: int = None):
+    try:
+        return resolve_poster_url(omdb_client.client_instance, poster_cache.cache_instance, movie_title, release_year)
+    except omdb_client.OMDbException:
+        return None     # Ignore exception and show the placeholder, OMDb is unavailable
+
+
+@utilities_blueprint.route('/poster_cache_stats', methods=['GET'])
+def poster_cache_stats():
+    cache = poster_cache.cache_instance
+    return jsonify(cache.stats if cache is not None else dict())
+
+
+@utilities_blueprint.route('/omdb_client_stats', methods=['GET'])
+def omdb_client_stats():
+    client = omdb_client.client_instance
+    return jsonify(client.stats if client is not None else dict())
+
+
+@utilities_blueprint.route('/autocomplete', methods=['GET'])
+def autocomplete():
+    # Completes the actor, director and genre names starting with the prefix, those of the most movies first
+    prefix = request.args.get('prefix', '')
+    kind = request.args.get('kind')
+    quantity = request.args.get('limit', AUTOCOMPLETE_QUANTITY, type=int)
+    quantity = min(max(quantity, 1), MAX_AUTOCOMPLETE_QUANTITY)
+
+    completions = services.complete_names(prefix, quantity, repo.repo_instance)
+    url_makers = {
+        'actors': lambda name: url_for('movie_bp.movies_by_actors', actors=name),
+        'directors': lambda name: url_for('movie_bp.movies_by_director', director=name),
+        'genres': lambda name: url_for('movie_bp.movies_by_genres', genres=name)
+    }
 
-    if "Poster" in movie_info.keys():
-        return movie_info["Poster"]
+    return jsonify({kind_of_name: [{'name': name, 'url': url_makers[kind_of_name](name)} for name in names]
+                    for kind_of_name, names in completions.items() if kind is None or kind == kind_of_name})
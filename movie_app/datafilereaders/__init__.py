@@ -3,3 +3,4 @@ from .review_file_csv_reader import ReviewFileCSVReader
 from .user_file_csv_reader import UserFileCSVReader
 from .watchlist_file_csv_reader import WatchListFileCSVReader
 from .watching_sim_file_csv_reader import WatchingSimFileCSVReader
+from .poster_file_csv_reader import PosterFileCSVReader
@@ -1,5 +1,5 @@
 import csv
-from typing import List, Iterable
+from typing import List, Dict, Set, Iterable
 from pathlib import Path
 
 from movie_app.domainmodel.movie import Movie
@@ -17,9 +17,10 @@ class MovieFileCSVReader:
             self.__file_name = None
 
         self.__dataset_of_movies: List[Movie] = list()
-        self.__dataset_of_actors: List[Actor] = list()
-        self.__dataset_of_directors: List[Director] = list()
-        self.__dataset_of_genres: List[Genre] = list()
+        self.__movie_set: Set[Movie] = set()
+        self.__dataset_of_actors: Dict[str, Actor] = dict()
+        self.__dataset_of_directors: Dict[str, Director] = dict()
+        self.__dataset_of_genres: Dict[str, Genre] = dict()
 
     @property
     def file_name(self) -> str:
@@ -31,15 +32,15 @@ class MovieFileCSVReader:
 
     @property
     def dataset_of_actors(self) -> Iterable[Actor]:
-        return iter(self.__dataset_of_actors)
+        return iter(self.__dataset_of_actors.values())
 
     @property
     def dataset_of_directors(self) -> Iterable[Director]:
-        return iter(self.__dataset_of_directors)
+        return iter(self.__dataset_of_directors.values())
 
     @property
     def dataset_of_genres(self) -> Iterable[Genre]:
-        return iter(self.__dataset_of_genres)
+        return iter(self.__dataset_of_genres.values())
 
     def read_csv_file(self):
         with open(self.__file_name, mode='r', encoding='utf-8-sig') as csv_file:
@@ -99,25 +100,22 @@ class MovieFileCSVReader:
                 movie.metascore = metascore
 
                 for actor in actors:
-                    colleagues = [c for c in actors if not actor.check_if_this_actor_worked_with(c) and c is not actor]
-
-                    if actor not in self.__dataset_of_actors and actor.actor_full_name is not None:
-                        for colleague in colleagues:
-                            actor.add_actor_colleague(colleague)
-                        self.__dataset_of_actors.append(actor)
-                    elif actor in self.__dataset_of_actors:
-                        pos = self.__dataset_of_actors.index(actor)
-                        for colleague in colleagues:
-                            self.__dataset_of_actors[pos].add_actor_colleague(colleague)
+                    if actor.actor_full_name is not None:
+                        # The first Actor object read for a name collects the colleagues from every Movie row
+                        dataset_actor = self.__dataset_of_actors.setdefault(actor.actor_full_name, actor)
+                        for colleague in actors:
+                            if colleague is not actor:
+                                dataset_actor.add_actor_colleague(colleague)
                     movie.add_actor(actor)
 
-                if director not in self.__dataset_of_directors and director.director_full_name is not None:
-                    self.__dataset_of_directors.append(director)
+                if director.director_full_name is not None:
+                    self.__dataset_of_directors.setdefault(director.director_full_name, director)
 
                 for genre in genres:
                     movie.add_genre(genre)
-                    if genre not in self.__dataset_of_genres and genre.genre_name is not None:
-                        self.__dataset_of_genres.append(genre)
+                    if genre.genre_name is not None:
+                        self.__dataset_of_genres.setdefault(genre.genre_name, genre)
 
-                if movie not in self.dataset_of_movies and movie.title is not None:
+                if movie not in self.__movie_set and movie.title is not None:
+                    self.__movie_set.add(movie)
                     self.__dataset_of_movies.append(movie)
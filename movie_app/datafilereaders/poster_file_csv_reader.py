@@ -0,0 +1,44 @@
+import csv
+from typing import Dict, Iterable, Optional, Tuple
+from pathlib import Path
+
+from movie_app.domainmodel import Movie
+
+POSTER_FILE_COLUMNS = ['Rank', 'Title', 'Year', 'Poster']
+
+
+class PosterFileCSVReader:
+
+    def __init__(self, file_name: str, movies: Dict[int, Movie]):
+        if isinstance(file_name, str) and Path(file_name).exists() and '.csv' in file_name:
+            self.__file_name = file_name
+        else:
+            self.__file_name = None
+
+        self.__dataset_of_posters: Dict[Movie, Optional[str]] = dict()
+        self.__dataset_of_movies: Dict[int, Movie] = movies
+
+    @property
+    def file_name(self) -> str:
+        return self.__file_name
+
+    @property
+    def dataset_of_posters(self) -> Iterable[Tuple[Movie, Optional[str]]]:
+        """ Iterates over each Movie with a known poster URL, or None if the Movie is known to have no poster. """
+        return iter(self.__dataset_of_posters.items())
+
+    def read_csv_file(self):
+        # Posters are matched to movies by title and release year, as the file may come from a larger catalogue
+        movies_by_title = {(movie.title, movie.release_year): movie for movie in self.__dataset_of_movies.values()}
+
+        with open(self.__file_name, mode='r', encoding='utf-8-sig') as csv_file:
+            poster_file_reader = csv.DictReader(csv_file)
+
+            for row in poster_file_reader:
+                try:
+                    movie = movies_by_title.get((row['Title'].strip(), int(row['Year'])))
+                except (ValueError, TypeError, AttributeError):
+                    movie = None    # Ignore exception and skip rows with a malformed title or year
+
+                if movie is not None:
+                    self.__dataset_of_posters[movie] = row['Poster'] or None
@@ -1,21 +1,27 @@
 import csv
-from typing import List, Dict, Iterable
+import logging
+from typing import List, Dict, Iterable, Set, Union
 from pathlib import Path
 
 from movie_app.domainmodel import Review, Movie, User
+from movie_app.datafilereaders.user_index import index_users_by_id
+
+logger = logging.getLogger(__name__)
 
 
 class ReviewFileCSVReader:
 
-    def __init__(self, file_name: str, movies: Dict[int, Movie], users: List[User]):
+    def __init__(self, file_name: str, movies: Dict[int, Movie], users: Union[List[User], Dict[int, User]]):
         if isinstance(file_name, str) and Path(file_name).exists() and '.csv' in file_name:
             self.__file_name = file_name
         else:
             self.__file_name = None
 
         self.__dataset_of_reviews: List[Review] = list()
+        self.__review_set: Set[Review] = set()
         self.__dataset_of_movies: Dict[int, Movie] = movies
-        self.__dataset_of_users: List[User] = users
+        self.__dataset_of_users: Dict[int, User] = index_users_by_id(users)
+        self.__unresolved_user_ids: Set[int] = set()
 
     @property
     def file_name(self) -> str:
@@ -25,6 +31,10 @@ class ReviewFileCSVReader:
     def dataset_of_reviews(self) -> Iterable[Review]:
         return iter(self.__dataset_of_reviews)
 
+    @property
+    def unresolved_user_ids(self) -> List[int]:
+        return sorted(self.__unresolved_user_ids)
+
     def read_csv_file(self):
         with open(self.__file_name, mode='r', encoding='utf-8-sig') as csv_file:
             review_file_reader = csv.DictReader(csv_file)
@@ -52,12 +62,18 @@ class ReviewFileCSVReader:
                 if movie_rank in self.__dataset_of_movies.keys():
                     review_movie = self.__dataset_of_movies[movie_rank]
 
-                review_user = next((user for user in self.__dataset_of_users if user.id == user_id), None)
+                review_user = self.__dataset_of_users.get(user_id)
+                if review_user is None and user_id is not None:
+                    self.__unresolved_user_ids.add(user_id)
 
                 review = Review(review_movie, review_text, rating)
 
                 if review_user is not None and review_user.id is not None:
                     review_user.add_review(review)
 
-                if review not in self.__dataset_of_reviews and review.movie is not None and review.user is not None:
+                if review not in self.__review_set and review.movie is not None and review.user is not None:
+                    self.__review_set.add(review)
                     self.__dataset_of_reviews.append(review)
+
+        if len(self.__unresolved_user_ids) > 0:
+            logger.warning('%s: Reviews skipped for unknown user IDs %s', self.__file_name, self.unresolved_user_ids)
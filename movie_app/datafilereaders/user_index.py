@@ -0,0 +1,18 @@
+from typing import Dict, Iterable, Union
+
+from movie_app.domainmodel import User
+
+
+def index_users_by_id(users: Union[Iterable[User], Dict[int, User]]) -> Dict[int, User]:
+    """ Returns a map of user ID to User, built once so readers can resolve user IDs without scanning.
+
+    A dictionary that is already keyed by user ID is used as is. Otherwise the first User read for each ID is kept.
+    """
+    if isinstance(users, dict):
+        return users
+
+    users_by_id: Dict[int, User] = dict()
+    for user in users:
+        users_by_id.setdefault(user.id, user)
+
+    return users_by_id
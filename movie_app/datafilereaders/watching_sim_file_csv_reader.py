@@ -1,22 +1,29 @@
 import csv
-from typing import List, Dict, Iterable
+import logging
+from typing import List, Dict, Iterable, Set, Tuple, Union
 from pathlib import Path
 
 from movie_app.activitysimulations import MovieWatchingSimulation
 from movie_app.domainmodel import Movie, User, Review
+from movie_app.datafilereaders.user_index import index_users_by_id
+
+logger = logging.getLogger(__name__)
 
 
 class WatchingSimFileCSVReader:
 
-    def __init__(self, file_name: str, movies: Dict[int, Movie], users: List[User], reviews: Dict[int, Review]):
+    def __init__(self, file_name: str, movies: Dict[int, Movie], users: Union[List[User], Dict[int, User]],
+                 reviews: Dict[int, Review]):
         if isinstance(file_name, str) and Path(file_name).exists() and '.csv' in file_name:
             self.__file_name = file_name
         else:
             self.__file_name = None
 
         self.__dataset_of_watching_sims: List[MovieWatchingSimulation] = list()
+        self.__watching_sim_keys: Set[Tuple[int, Tuple[int, ...], Tuple[int, ...]]] = set()
         self.__dataset_of_movies: Dict[int, Movie] = movies
-        self.__dataset_of_users: List[User] = users
+        self.__dataset_of_users: Dict[int, User] = index_users_by_id(users)
+        self.__unresolved_user_ids: Set[int] = set()
         self.__dataset_of_reviews: Dict[int, Review] = reviews
 
     @property
@@ -27,6 +34,10 @@ class WatchingSimFileCSVReader:
     def dataset_of_watching_sims(self) -> Iterable[MovieWatchingSimulation]:
         return iter(self.__dataset_of_watching_sims)
 
+    @property
+    def unresolved_user_ids(self) -> List[int]:
+        return sorted(self.__unresolved_user_ids)
+
     def read_csv_file(self):
         with open(self.__file_name, mode='r', encoding='utf-8-sig') as csv_file:
             watching_sim_file_reader = csv.DictReader(csv_file)
@@ -44,13 +55,17 @@ class WatchingSimFileCSVReader:
 
                 if watching_sim_movie is not None:
                     watching_simulation = MovieWatchingSimulation(watching_sim_movie)
+                    user_ids: Dict[int, None] = dict()  # IDs of the users added, in order and without duplicates
 
                     for val in row['User IDs'].split(','):
                         try:
                             user_id = int(val)
-                            watching_sim_user = next((user for user in self.__dataset_of_users
-                                                      if user.id == user_id), None)
-                            watching_simulation.add_user(watching_sim_user)
+                            watching_sim_user = self.__dataset_of_users.get(user_id)
+                            if watching_sim_user is None:
+                                self.__unresolved_user_ids.add(user_id)
+                            elif user_id not in user_ids:
+                                user_ids[user_id] = None
+                                watching_simulation.add_user(watching_sim_user)
                         except ValueError:
                             pass    # Ignore exception and don't add user to watching simulation
 
@@ -70,5 +85,13 @@ class WatchingSimFileCSVReader:
                         except ValueError:
                             pass    # Ignore exception and don't add review to watching simulation
 
-                    if watching_simulation not in self.__dataset_of_watching_sims:
+                    # Keyed on the same Movie, users and Reviews that make two watching simulations equal
+                    review_ids = tuple(review.id for review in watching_simulation.reviews)
+                    watching_sim_key = (movie_rank, tuple(user_ids), review_ids)
+                    if watching_sim_key not in self.__watching_sim_keys:
+                        self.__watching_sim_keys.add(watching_sim_key)
                         self.__dataset_of_watching_sims.append(watching_simulation)
+
+        if len(self.__unresolved_user_ids) > 0:
+            logger.warning('%s: Watching simulation users skipped for unknown user IDs %s', self.__file_name,
+                           self.unresolved_user_ids)
@@ -1,21 +1,27 @@
 import csv
-from typing import List, Dict, Iterable
+import logging
+from typing import List, Dict, Iterable, Set, Union
 from pathlib import Path
 
 from movie_app.domainmodel import WatchList, Movie, User
+from movie_app.datafilereaders.user_index import index_users_by_id
+
+logger = logging.getLogger(__name__)
 
 
 class WatchListFileCSVReader:
 
-    def __init__(self, file_name: str, movies: Dict[int, Movie], users: List[User]):
+    def __init__(self, file_name: str, movies: Dict[int, Movie], users: Union[List[User], Dict[int, User]]):
         if isinstance(file_name, str) and Path(file_name).exists() and '.csv' in file_name:
             self.__file_name = file_name
         else:
             self.__file_name = None
 
         self.__dataset_of_watch_lists: List[WatchList] = list()
+        self.__watch_list_set: Set[WatchList] = set()
         self.__dataset_of_movies: Dict[int, Movie] = movies
-        self.__dataset_of_users: List[User] = users
+        self.__dataset_of_users: Dict[int, User] = index_users_by_id(users)
+        self.__unresolved_user_ids: Set[int] = set()
 
     @property
     def file_name(self) -> str:
@@ -25,6 +31,10 @@ class WatchListFileCSVReader:
     def dataset_of_watch_lists(self) -> Iterable[WatchList]:
         return iter(self.__dataset_of_watch_lists)
 
+    @property
+    def unresolved_user_ids(self) -> List[int]:
+        return sorted(self.__unresolved_user_ids)
+
     def read_csv_file(self):
         with open(self.__file_name, mode='r', encoding='utf-8-sig') as csv_file:
             watchlist_file_reader = csv.DictReader(csv_file)
@@ -35,7 +45,9 @@ class WatchListFileCSVReader:
                 except ValueError:
                     user_id = None
 
-                watchlist_user = next((user for user in self.__dataset_of_users if user.id == user_id), None)
+                watchlist_user = self.__dataset_of_users.get(user_id)
+                if watchlist_user is None and user_id is not None:
+                    self.__unresolved_user_ids.add(user_id)
 
                 if watchlist_user is not None and watchlist_user.id is not None:
                     for val in row['Movie Ranks'].split(','):
@@ -48,5 +60,10 @@ class WatchListFileCSVReader:
                         except ValueError:
                             pass    # Ignore exception and don't add movie to watchlist
 
-                    if watchlist_user.watchlist not in self.__dataset_of_watch_lists:
+                    if watchlist_user.watchlist not in self.__watch_list_set:
+                        self.__watch_list_set.add(watchlist_user.watchlist)
                         self.__dataset_of_watch_lists.append(watchlist_user.watchlist)
+
+        if len(self.__unresolved_user_ids) > 0:
+            logger.warning('%s: Watchlists skipped for unknown user IDs %s', self.__file_name,
+                           self.unresolved_user_ids)
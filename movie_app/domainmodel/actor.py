@@ -1,4 +1,4 @@
-from typing import List
+from typing import Set
 
 
 class Actor:
@@ -8,7 +8,7 @@ class Actor:
             self.__actor_full_name = actor_full_name.strip()
         else:
             self.__actor_full_name = None
-        self.__colleagues: List[Actor] = list()
+        self.__colleagues: Set[Actor] = set()
 
     @property
     def actor_full_name(self) -> str:
@@ -35,7 +35,7 @@ class Actor:
     def add_actor_colleague(self, colleague: 'Actor'):
         if isinstance(colleague, Actor) and colleague not in self.__colleagues and self != colleague and \
                 colleague.__actor_full_name is not None:
-            self.__colleagues.append(colleague)
+            self.__colleagues.add(colleague)
 
     def check_if_this_actor_worked_with(self, colleague: 'Actor'):
-        return colleague in self.__colleagues
+        return isinstance(colleague, Actor) and colleague in self.__colleagues
@@ -86,5 +86,5 @@ class Review:
         return hash((self.__movie, self.__timestamp, self.__user))
 
     @staticmethod
-    def reset_id():
-        Review.__review_id = 1
+    def reset_id(next_id: int = 1):
+        Review.__review_id = next_id
@@ -1,4 +1,4 @@
-from typing import List, Iterable
+from typing import Callable, List, Iterable
 from movie_app.domainmodel.movie import Movie
 from movie_app.domainmodel.review import Review
 from movie_app.domainmodel.watchlist import WatchList
@@ -23,6 +23,7 @@ class User:
         self.__reviews: List[Review] = list()
         self.__time_spent_watching_movies_minutes: int = 0
         self.__watchlist: WatchList = WatchList()
+        self.__watch_listeners: List[Callable[['User', Movie], None]] = list()
 
         self.__watchlist.user = self
         User.__user_id += 1
@@ -77,8 +78,14 @@ class User:
         if isinstance(movie, Movie) and movie.title is not None and movie.runtime_minutes is not None:
             if movie not in self.__watched_movies:
                 self.__watched_movies.append(movie)
+                for listener in self.__watch_listeners:
+                    listener(self, movie)
             self.__time_spent_watching_movies_minutes += movie.runtime_minutes
 
+    def add_watch_listener(self, listener: Callable[['User', Movie], None]):
+        if callable(listener) and listener not in self.__watch_listeners:
+            self.__watch_listeners.append(listener)
+
     def remove_watched_movie(self, movie: Movie):
         if movie in self.__watched_movies:
             self.__watched_movies.remove(movie)
@@ -99,5 +106,5 @@ class User:
             review.movie.remove_review(review)
 
     @staticmethod
-    def reset_id():
-        User.__user_id = 1
+    def reset_id(next_id: int = 1):
+        User.__user_id = next_id
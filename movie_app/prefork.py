@@ -0,0 +1,101 @@
+"""Support for sharing one preloaded repository between the workers of a pre-fork WSGI server."""
+import fcntl
+import gc
+import os
+import weakref
+from typing import Dict
+
+SMAPS_FIELDS = {
+    'Rss': 'rss',
+    'Pss': 'pss',
+    'Shared_Clean': 'shared_clean',
+    'Shared_Dirty': 'shared_dirty',
+    'Private_Clean': 'private_clean',
+    'Private_Dirty': 'private_dirty'
+}
+
+# Objects reopened in each forked child process, held weakly so they are dropped once nothing else refers to them
+objects_to_reopen = weakref.WeakSet()
+
+# Files of the locks held by this process, kept open so the locks are held until it exits
+held_lock_files = list()
+
+
+def freeze_preloaded_heap():
+    """ Moves every object allocated so far into the garbage collector's permanent generation.
+
+    Call this in the master process after the app and its repository have been created, and before workers are
+    forked. Collections in the workers then never visit the preloaded objects, so they do not write to the pages
+    holding them and the pages stay shared with the master.
+    """
+    gc.collect()
+    gc.freeze()
+
+
+def reopen_after_fork(obj):
+    """ Calls obj.reopen() in each child process forked after this call, for as long as obj is alive.
+
+    A forked worker may inherit a lock while another thread of its parent holds it, and must not share connections
+    with its parent, so objects holding them replace them in reopen.
+    """
+    objects_to_reopen.add(obj)
+
+
+def reopen_objects():
+    """ Calls reopen() on each object passed to reopen_after_fork that is still alive. """
+    for obj in list(objects_to_reopen):
+        obj.reopen()
+
+
+# Registered once, as handlers registered with register_at_fork cannot be removed
+os.register_at_fork(after_in_child=reopen_objects)
+
+
+def acquire_process_lock(path: str) -> bool:
+    """ Returns whether this process took the exclusive lock on the file at path, creating the file if needed.
+
+    The lock is held until this process exits, so only one of the workers of a server holds it at a time, and a
+    worker forked after the holder exits can take it over.
+    """
+    lock_file = open(path, mode='a')
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return False
+
+    held_lock_files.append(lock_file)
+    return True
+
+
+def memory_usage(pid: int = None) -> Dict[str, int]:
+    """ Returns the resident memory of a process, in kB, split into shared and private pages.
+
+    Only Linux provides the /proc/<pid>/smaps_rollup file read by this function; other platforms raise OSError.
+    """
+    if pid is None:
+        pid = os.getpid()
+
+    usage = {key: 0 for key in SMAPS_FIELDS.values()}
+
+    with open(f"/proc/{pid}/smaps_rollup", mode='r') as smaps_file:
+        for line in smaps_file:
+            field, _, value = line.partition(':')
+            if field in SMAPS_FIELDS:
+                usage[SMAPS_FIELDS[field]] = int(value.split()[0])
+
+    usage['shared'] = usage['shared_clean'] + usage['shared_dirty']
+    usage['private'] = usage['private_clean'] + usage['private_dirty']
+    return usage
+
+
+def format_memory_report(usage_by_process: Dict[str, Dict[str, int]]) -> str:
+    """ Returns a table of resident, shared and private memory for each named process. """
+    lines = [f"{'process':<20} {'rss kB':>10} {'pss kB':>10} {'shared kB':>10} {'private kB':>11} "
+             f"{'private dirty kB':>17}"]
+
+    for name, usage in usage_by_process.items():
+        lines.append(f"{name:<20} {usage['rss']:>10} {usage['pss']:>10} {usage['shared']:>10} "
+                     f"{usage['private']:>11} {usage['private_dirty']:>17}")
+
+    return '\n'.join(lines)
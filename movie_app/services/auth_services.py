@@ -1,3 +1,5 @@
+from typing import List
+
 from werkzeug.security import generate_password_hash, check_password_hash
 
 from movie_app.adapters.repository import AbstractRepository
@@ -38,6 +40,11 @@ def get_user(user_name: str, repo: AbstractRepository):
     return user
 
 
+def get_user_name_suggestions(user_name: str, quantity: int, repo: AbstractRepository) -> List[str]:
+    users = repo.resolve_user_names(user_name, quantity)
+    return [user.user_name for user in users]
+
+
 def authenticate_user(username: str, password: str, repo: AbstractRepository):
     authenticated = False
 
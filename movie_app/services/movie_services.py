@@ -1,10 +1,22 @@
-from typing import List, Iterable
+from typing import Callable, Dict, List, Iterable, Optional, Tuple
+import base64
 import random
+import re
 
 from movie_app.adapters.repository import AbstractRepository
+import movie_app.adapters.movie_query as movie_query
+from movie_app.adapters.prefix_index import name_key
+from movie_app.adapters.range_index import RangePredicate, RANGE_ATTRIBUTES
 from movie_app.domainmodel import Movie, Actor, Director, Genre, Review
 
 
+# A range condition of a browse URL, such as 'metascore>=80' or 'runtime<120'
+RANGE_CONDITION_PATTERN = re.compile(r'^\s*([a-z]+)\s*(>=|<=|>|<|=)\s*(\d+(?:\.\d+)?)\s*$')
+
+# A page cursor names the Movie a page starts after ('a') or ends before ('b'), or the end of the Movies
+PAGE_CURSOR_PATTERN = re.compile(r'^([ab])(\d*)$')
+
+
 class ServicesException(Exception):
     def __init__(self, message=None):
         pass
@@ -13,17 +25,35 @@ class ServicesException(Exception):
 def get_director(director_full_name: str, repo: AbstractRepository) -> Director:
     director = repo.get_director(director_full_name)
     if director is None:
-        raise ServicesException('Director does not exist in the repository')
+        # Accept the name typed with different case, accents or spacing, such as 'james GUNN'
+        directors = repo.resolve_director_names(director_full_name, 1)
+        if len(directors) == 0 or name_key(directors[0].director_full_name) != name_key(director_full_name):
+            raise ServicesException('Director does not exist in the repository')
+        director = directors[0]
     return director
 
 
 def get_actor(actor_full_name: str, repo: AbstractRepository) -> Actor:
     actor = repo.get_actor(actor_full_name)
     if actor is None:
-        raise ServicesException('Actor does not exist in the repository')
+        # Accept the name typed with different case, accents or spacing, such as 'chris PRATT'
+        actors = repo.resolve_actor_names(actor_full_name, 1)
+        if len(actors) == 0 or name_key(actors[0].actor_full_name) != name_key(actor_full_name):
+            raise ServicesException('Actor does not exist in the repository')
+        actor = actors[0]
     return actor
 
 
+def get_director_name_suggestions(director_full_name: str, quantity: int, repo: AbstractRepository) -> List[str]:
+    directors = repo.resolve_director_names(director_full_name, quantity)
+    return [director.director_full_name for director in directors]
+
+
+def get_actor_name_suggestions(actor_full_name: str, quantity: int, repo: AbstractRepository) -> List[str]:
+    actors = repo.resolve_actor_names(actor_full_name, quantity)
+    return [actor.actor_full_name for actor in actors]
+
+
 def get_movies_by_rank(rank_list: List[int], repo: AbstractRepository):
     movies = repo.get_movies_by_rank(rank_list)
     return movies
@@ -49,6 +79,165 @@ def get_movie_ranks_by_genres(genre_list: List[Genre], repo: AbstractRepository)
     return movie_ranks
 
 
+def encode_page_cursor(backward: bool, anchor: Optional[int]) -> str:
+    """ Returns the cursor of the page after the anchor rank, or before it if backward is True. Without an anchor,
+    the page before is the last page.
+    """
+    text = ('b' if backward else 'a') + ('' if anchor is None else str(anchor))
+    return base64.urlsafe_b64encode(text.encode()).decode().rstrip('=')
+
+
+def decode_page_cursor(cursor: str) -> Tuple[bool, Optional[int]]:
+    """ Returns whether a page cursor is for a page before its anchor, and the anchor rank. No cursor is for the
+    first page.
+    """
+    if not cursor:
+        return False, None
+
+    try:
+        text = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+    except ValueError:
+        raise ServicesException(f'Page cursor {cursor} is not valid')
+
+    match = PAGE_CURSOR_PATTERN.match(text)
+    if match is None or (match.group(1) == 'a' and match.group(2) == ''):
+        raise ServicesException(f'Page cursor {cursor} is not valid')
+    return match.group(1) == 'b', int(match.group(2)) if match.group(2) else None
+
+
+def get_page(find_ranks: Callable[[Optional[int], bool, int], Tuple[List[int], int]], cursor: str,
+             quantity: int) -> Dict:
+    """ Returns a page of Movies as a dictionary of the ranks on the page, the number of Movies on all pages, and the
+    cursors of the previous, next and last pages, each None if there is no such page.
+
+    Ranks are found by find_ranks(anchor, backward, quantity), which returns up to quantity ranks following the
+    anchor rank, or preceding it if backward is True, along with the number of Movies on all pages. Cursors name the
+    Movie a page starts after or ends before, so pages do not shift as Movies are added, and a cursor that cannot be
+    read is taken to be for the first page.
+    """
+    try:
+        backward, anchor = decode_page_cursor(cursor)
+    except ServicesException:
+        backward, anchor = False, None
+
+    # One Movie more than fits on the page is found, to tell whether there are more in that direction
+    ranks, number_of_movies = find_ranks(anchor, backward, quantity + 1)
+    if backward and len(ranks) <= quantity:
+        # Too few Movies precede the anchor to fill a page, so the first page is shown instead
+        backward, anchor = False, None
+        ranks, number_of_movies = find_ranks(None, False, quantity + 1)
+
+    if backward:
+        ranks = ranks[1:]
+        has_previous = True
+        has_next = len(find_ranks(ranks[-1], False, 1)[0]) > 0
+    else:
+        has_next = len(ranks) > quantity
+        ranks = ranks[:quantity]
+        has_previous = anchor is not None and len(find_ranks(ranks[0] if len(ranks) > 0 else anchor, True, 1)[0]) > 0
+
+    return {
+        'ranks': ranks,
+        'number_of_movies': number_of_movies,
+        'previous_cursor': encode_page_cursor(True, ranks[0] if len(ranks) > 0 else anchor) if has_previous else None,
+        'next_cursor': encode_page_cursor(False, ranks[-1]) if has_next else None,
+        'last_cursor': encode_page_cursor(True, None) if has_next else None
+    }
+
+
+def get_movie_page(field: str, item_list: list, cursor: str, quantity: int, sort_attribute: Optional[str],
+                   descending: bool, repo: AbstractRepository) -> Dict:
+    """ Returns a page, as get_page does, of the Movies with the given Director, Actors or Genres, for a field of
+    'director', 'actor' or 'genre', in a sort order returned by parse_sort_order.
+
+    Pages are found in the repository's indexes, or in its presorted orders of the catalogue, without sorting the
+    Movies on other pages.
+    """
+    def find_ranks(anchor: Optional[int], backward: bool, size: int) -> Tuple[List[int], int]:
+        return repo.get_movie_ranks_page(field, item_list, anchor, backward, size, sort_attribute, descending)
+
+    return get_page(find_ranks, cursor, quantity)
+
+
+def get_text_search_page(query: str, cursor: str, quantity: int, repo: AbstractRepository) -> Dict:
+    """ Returns a page, as get_page does, of the Movies whose title or description matches the query, ordered by
+    relevance.
+    """
+    def find_ranks(anchor: Optional[int], backward: bool, size: int) -> Tuple[List[int], int]:
+        return repo.search_movie_ranks_page(query, anchor, backward, size)
+
+    return get_page(find_ranks, cursor, quantity)
+
+
+def get_list_page(movie_ranks: List[int], cursor: str, quantity: int) -> Dict:
+    """ Returns a page, as get_page does, of the Movies in a list of ranks.
+
+    The anchor is looked up in the list, which costs no more than the query the list was returned by.
+    """
+    def find_ranks(anchor: Optional[int], backward: bool, size: int) -> Tuple[List[int], int]:
+        try:
+            position = movie_ranks.index(anchor)
+        except ValueError:
+            # No anchor, or one that is no longer listed, is for the first or last Movies
+            position = len(movie_ranks) if backward else -1
+
+        if backward:
+            return movie_ranks[max(position - size, 0):position], len(movie_ranks)
+        return movie_ranks[position + 1:position + 1 + size], len(movie_ranks)
+
+    return get_page(find_ranks, cursor, quantity)
+
+
+def parse_range_condition(condition: str) -> RangePredicate:
+    match = RANGE_CONDITION_PATTERN.match(condition.lower())
+    if match is None or match.group(1) not in RANGE_ATTRIBUTES.keys():
+        raise ServicesException(f'Range condition {condition} is not valid')
+
+    name, operator, number = match.groups()
+    value = float(number) if '.' in number else int(number)
+    attribute = RANGE_ATTRIBUTES[name]
+
+    if operator == '=':
+        return RangePredicate(attribute, value, value)
+    if operator in ('>=', '>'):
+        return RangePredicate(attribute, minimum=value, include_minimum=operator == '>=')
+    return RangePredicate(attribute, maximum=value, include_maximum=operator == '<=')
+
+
+def get_movie_ranks_by_ranges(predicates: List[RangePredicate], repo: AbstractRepository, director: Director = None,
+                              actor_list: List[Actor] = None, genre_list: List[Genre] = None) -> List[int]:
+    movie_ranks = repo.get_movie_ranks_by_ranges(predicates, director, actor_list, genre_list)
+    return movie_ranks
+
+
+def parse_movie_query(query: str) -> movie_query.MovieQuery:
+    try:
+        return movie_query.parse_movie_query(query)
+    except movie_query.MovieQueryException as e:
+        raise ServicesException(str(e))
+
+
+def parse_sort_order(sort: str) -> Tuple[Optional[str], bool]:
+    """ Returns the attribute and direction of a browse URL sort order, such as '-rating' for the highest rated
+    Movies first. Sorting by 'rank', or not at all, returns no attribute.
+    """
+    sort = (sort or '').strip().lower()
+    descending = sort.startswith('-')
+    name = sort.lstrip('-')
+
+    if name in ('', 'rank'):
+        return None, descending
+    if name not in RANGE_ATTRIBUTES.keys():
+        raise ServicesException(f'Sort order {sort} is not valid')
+    return RANGE_ATTRIBUTES[name], descending
+
+
+def get_movie_ranks_by_query(query: movie_query.MovieQuery, repo: AbstractRepository, sort_attribute: str = None,
+                             descending: bool = False) -> List[int]:
+    movie_ranks = repo.get_movie_ranks_by_query(query, sort_attribute, descending)
+    return movie_ranks
+
+
 def get_most_common_director_names(quantity: int, repo: AbstractRepository) -> List[str]:
     directors = repo.get_most_common_directors(quantity)
     director_names = [director.director_full_name for director in directors]
@@ -70,6 +259,18 @@ def get_most_common_genre_names(quantity: int, repo: AbstractRepository) -> List
     return genre_names
 
 
+def complete_names(prefix: str, quantity: int, repo: AbstractRepository) -> Dict[str, List[str]]:
+    actors = repo.complete_actor_names(prefix, quantity)
+    directors = repo.complete_director_names(prefix, quantity)
+    genres = repo.complete_genre_names(prefix, quantity)
+
+    return {
+        'actors': [actor.actor_full_name for actor in actors],
+        'directors': [director.director_full_name for director in directors],
+        'genres': [genre.genre_name for genre in genres]
+    }
+
+
 def get_random_movies(quantity: int, repo: AbstractRepository):
     movie_count = repo.get_number_of_movies()
 
@@ -105,8 +306,9 @@ def create_review(movie_rank: int, review_text: str, rating: int, user_name: str
     repo.add_review(review)
 
 
-def remove_review(review: Review):
-    review.user.remove_review(review)
+def remove_review(review: Review, repo: AbstractRepository):
+    # Remove the review from the repository, and from the lists of User and Movie reviews
+    repo.remove_review(review)
 
 
 def get_reviews_for_movie(movie_rank: int, repo: AbstractRepository):
@@ -120,6 +322,7 @@ def get_reviews_for_movie(movie_rank: int, repo: AbstractRepository):
 
 def movie_to_dict(movie: Movie):
     movie_dict = {
+        'rank': movie.rank,
         'title': movie.title,
         'release_year': movie.release_year,
         'description': movie.description
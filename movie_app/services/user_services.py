@@ -1,5 +1,5 @@
-from movie_app.adapters.repository import AbstractRepository
-from movie_app.domainmodel import User, Review, WatchList
+from movie_app.adapters.repository import AbstractRepository, RepositoryException
+from movie_app.domainmodel import Movie, User, Review, WatchList
 
 
 class ServicesException(Exception):
@@ -12,3 +12,10 @@ def get_review(review_id: int, repo: AbstractRepository) -> Review:
     if review is None:
         raise ServicesException('Review does not exist in the repository')
     return review
+
+
+def add_movie_to_watchlist(user: User, movie: Movie, repo: AbstractRepository):
+    try:
+        repo.add_movie_to_watchlist(user.watchlist, movie)
+    except RepositoryException:
+        raise ServicesException('Movie does not exist in the repository')
@@ -1,6 +1,13 @@
 from movie_app.datafilereaders import MovieFileCSVReader, UserFileCSVReader, ReviewFileCSVReader, \
     WatchListFileCSVReader, WatchingSimFileCSVReader
 from movie_app.adapters.memory_repository import MemoryRepository
+from movie_app.adapters.omdb_standin import StandInSettings, start_in_background
+import movie_app.adapters.omdb_client as omdb_client
+import movie_app.adapters.poster_cache as poster_cache
+import movie_app.adapters.poster_store as poster_store
+import movie_app.adapters.fragment_cache as fragment_cache
+import movie_app.adapters.repository as repo
+from movie_app import create_app
 from config import DataPaths
 
 import pytest
@@ -82,3 +89,42 @@ def in_memory_repo():
     repo = MemoryRepository()
     repo.populate(test_data)
     return repo
+
+
+@pytest.fixture()
+def standin():
+    settings = StandInSettings(seed=1)
+    server, base_url = start_in_background(settings)
+    yield settings, base_url
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture()
+def client_config():
+    # Settings applied over the test app's configuration, override this fixture in a test module to change them
+    return dict()
+
+
+@pytest.fixture()
+def client(standin, client_config, monkeypatch):
+    settings, base_url = standin
+
+    # create_app replaces these, so restore them for the other tests
+    for module, name in ((repo, 'repo_instance'), (poster_cache, 'cache_instance'),
+                         (omdb_client, 'client_instance'), (poster_store, 'store_instance'),
+                         (fragment_cache, 'cache_instance'), (fragment_cache, 'page_cache_instance')):
+        monkeypatch.setattr(module, name, None)
+
+    app = create_app({
+        'TESTING': True,
+        'WTF_CSRF_ENABLED': False,
+        'TEST_DATA_PATHS': test_data,
+        'REPOSITORY_SNAPSHOT': None,
+        'POSTER_CACHE_FILE': None,
+        'POSTER_WARMUP': False,
+        'POSTER_DIRECTORY': None,
+        'OMDB_URL': base_url,
+        **client_config
+    })
+    return app.test_client()
@@ -0,0 +1,91 @@
+from movie_app.adapters.repository import RepositoryException
+import movie_app.adapters.omdb_client as omdb_client
+import movie_app.adapters.repository as repo
+import movie_app.services.movie_services as services
+from movie_app.domainmodel import Movie
+
+import pytest
+
+
+def test_repository_counts_changes(in_memory_repo):
+    version = in_memory_repo.get_version()
+    user = in_memory_repo.get_user('martin')
+    sing = in_memory_repo.get_movie_by_rank(4)
+
+    in_memory_repo.add_movie_to_watchlist(user.watchlist, sing)
+    assert sing in user.watchlist
+    assert in_memory_repo.get_version() == version + 1
+    in_memory_repo.add_movie_to_watchlist(user.watchlist, sing)
+    assert in_memory_repo.get_version() == version + 1
+
+    in_memory_repo.remove_movie_from_watchlist(user.watchlist, sing)
+    assert sing not in user.watchlist
+    assert in_memory_repo.get_version() == version + 2
+    assert in_memory_repo.get_movie_version(4) == 1
+
+    movie = Movie('Slither 2', 2017)
+    movie.rank = 20
+    in_memory_repo.add_movie(movie)
+    assert in_memory_repo.get_version() == version + 3
+    assert in_memory_repo.get_movie_version(20) == 1
+
+    with pytest.raises(RepositoryException):
+        in_memory_repo.add_movie_to_watchlist(user.watchlist, Movie('A Movie', 2020))
+
+
+def test_repository_counts_removed_reviews(in_memory_repo):
+    review = in_memory_repo.get_review(3)
+    version = in_memory_repo.get_version()
+
+    services.remove_review(review, in_memory_repo)
+    assert in_memory_repo.get_review(3) is None
+    assert review not in in_memory_repo.get_movie_by_rank(1).reviews
+    assert in_memory_repo.get_movie_version(1) == 4
+    assert in_memory_repo.get_version() == version + 1
+
+
+def test_unchanged_pages_are_not_modified(client):
+    response = client.get('/movies_by_genres', query_string={'genres': 'Sci-Fi'})
+    etag, is_weak = response.get_etag()
+    assert response.status_code == 200 and is_weak
+    assert 'no-cache' in response.headers['Cache-Control']
+
+    requests = omdb_client.client_instance.stats['requests']
+    response = client.get('/movies_by_genres', query_string={'genres': 'Sci-Fi'},
+                          headers={'If-None-Match': f'W/"{etag}"'})
+    assert response.status_code == 304
+    assert response.get_data() == b''
+    assert omdb_client.client_instance.stats['requests'] == requests
+
+
+def test_changes_and_logging_in_modify_pages(client):
+    etag, is_weak = client.get('/movies_by_genres', query_string={'genres': 'Sci-Fi'}).get_etag()
+
+    with client.session_transaction() as session:
+        session['username'] = 'martin'
+    response = client.get('/movies_by_genres', query_string={'genres': 'Sci-Fi'}, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    etag, is_weak = response.get_etag()
+
+    client.get('/browse_watchlist', query_string={'movie': 4})
+    response = client.get('/movies_by_genres', query_string={'genres': 'Sci-Fi'}, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    etag, is_weak = response.get_etag()
+
+    client.post('/review', data={'review_text': 'Great soundtrack.', 'rating': 9, 'movie_rank': 1})
+    response = client.get('/movies_by_genres', query_string={'genres': 'Sci-Fi'}, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert '3 reviews' in response.get_data(as_text=True)
+
+
+def test_pages_are_modified_once_the_repository_is_loaded_again(client, monkeypatch):
+    etag, is_weak = client.get('/movies_by_genres', query_string={'genres': 'Sci-Fi'}).get_etag()
+
+    # The ETag is the same in another worker process, but not once the repository is loaded again
+    monkeypatch.setattr('os.getpid', lambda: 1)
+    response = client.get('/movies_by_genres', query_string={'genres': 'Sci-Fi'}, headers={'If-None-Match': etag})
+    assert response.status_code == 304
+
+    repo.repo_instance.renew_load_token()
+    response = client.get('/movies_by_genres', query_string={'genres': 'Sci-Fi'}, headers={'If-None-Match': etag})
+    assert response.status_code == 200
@@ -1,6 +1,10 @@
 from movie_app.domainmodel import Actor, Director, Genre, Movie, User, Review, WatchList
+from movie_app.datafilereaders import ReviewFileCSVReader, PosterFileCSVReader, WatchingSimFileCSVReader
+from config import DataPaths
 import pytest
 
+test_data = DataPaths.TEST_DATA_PATHS
+
 
 @pytest.fixture()
 def movie_from_file(dataset_of_movies):
@@ -54,6 +58,16 @@ def test_movie_actor_colleagues(actor_from_file, movie_from_file):
     assert actors[1].check_if_this_actor_worked_with(actor1) is True
 
 
+def test_movie_file_reader_read_twice(movie_file_reader):
+    movie_file_reader.read_csv_file()
+    actors = list(movie_file_reader.dataset_of_actors)
+    movie_file_reader.read_csv_file()
+
+    assert sum(1 for _ in movie_file_reader.dataset_of_movies) == 11
+    assert all(a is b for a, b in zip(actors, movie_file_reader.dataset_of_actors))
+    assert len(actors) == sum(1 for _ in movie_file_reader.dataset_of_actors)
+
+
 def test_user_file_reader(user_file_reader):
     user_file_reader.read_csv_file()
     users = [user for user in user_file_reader.dataset_of_users]
@@ -93,6 +107,15 @@ def test_review_file_reader(review_file_reader):
     assert "entertaining" in reviews[2].review_text and reviews[2].rating == 8
 
 
+def test_review_file_reader_reports_unresolved_user_ids(dict_of_movies, dataset_of_users):
+    users_by_id = {user.id: user for user in dataset_of_users if user.id != 2}
+    review_file_reader = ReviewFileCSVReader(test_data["reviews"], dict_of_movies, users_by_id)
+    review_file_reader.read_csv_file()
+
+    assert sum(1 for _ in review_file_reader.dataset_of_reviews) == 5
+    assert review_file_reader.unresolved_user_ids == [2]
+
+
 def test_watchlist_file_reader(watchlist_file_reader):
     watchlist_file_reader.read_csv_file()
     watch_lists = [watchlist for watchlist in watchlist_file_reader.dataset_of_watch_lists]
@@ -137,3 +160,32 @@ def test_watching_sim_file_reader(watching_sim_file_reader):
     assert len(reviews) == 2
     assert reviews[0].movie == reviews[1].movie and reviews[0].movie == watching_sims[3].movie
     assert reviews[0].user in watching_sims[3].users and reviews[1].user in watching_sims[3].users
+
+
+def test_poster_file_reader(dict_of_movies):
+    poster_file_reader = PosterFileCSVReader(test_data["posters"], dict_of_movies)
+    poster_file_reader.read_csv_file()
+    posters = dict(poster_file_reader.dataset_of_posters)
+
+    # Rows are matched by title and year, so rows for other years or unknown movies are ignored
+    assert posters == {
+        Movie('Guardians of the Galaxy', 2014): 'http://posters.test/guardians_of_the_galaxy.jpg',
+        Movie('Prometheus', 2012): 'http://posters.test/prometheus.jpg',
+        Movie('Split', 2016): None
+    }
+
+
+def test_watching_sim_file_reader_reports_unresolved_user_ids(tmp_path, caplog, dict_of_movies, dataset_of_users,
+                                                              dataset_of_reviews):
+    watching_sims_file = tmp_path / 'watching_sims.csv'
+    watching_sims_file.write_text('ID,Movie Rank,User IDs,Review IDs\n1,6,"1,99,1",""\n2,6,"1,1",""\n3,4,"99",""\n')
+    watching_sim_file_reader = WatchingSimFileCSVReader(str(watching_sims_file), dict_of_movies, dataset_of_users,
+                                                        dataset_of_reviews)
+    watching_sim_file_reader.read_csv_file()
+
+    watching_sims = [watching_sim for watching_sim in watching_sim_file_reader.dataset_of_watching_sims]
+    assert len(watching_sims) == 2
+    assert [user.id for user in watching_sims[0].users] == [1]
+    assert sum(1 for _ in watching_sims[1].users) == 0
+    assert watching_sim_file_reader.unresolved_user_ids == [99]
+    assert 'unknown user IDs [99]' in caplog.text
@@ -0,0 +1,87 @@
+import movie_app.adapters.fragment_cache as fragment_cache
+from movie_app.adapters.fragment_cache import FragmentCache
+import movie_app.services.movie_services as services
+
+import pytest
+
+
+@pytest.fixture()
+def page_cache(client, monkeypatch):
+    cache = FragmentCache(max_bytes=1 << 20)
+    monkeypatch.setattr(fragment_cache, 'page_cache_instance', cache)
+    return cache
+
+
+def log_in(client, user_name='martin'):
+    with client.session_transaction() as session:
+        session['username'] = user_name
+
+
+def test_repository_versions_movies_by_their_reviews(in_memory_repo):
+    assert in_memory_repo.get_movie_version(1) == 3
+    assert in_memory_repo.get_movie_version(2) == 1
+    assert in_memory_repo.get_movie_version(100) == 0
+
+    services.create_review(1, 'Great soundtrack.', 9, 'martin', in_memory_repo)
+    assert in_memory_repo.get_movie_version(1) == 4
+    assert in_memory_repo.get_movie_version(2) == 1
+
+
+def test_fragment_cache_evicts_fragments_by_movie():
+    cache = FragmentCache(max_bytes=1 << 20)
+    card = cache.get(('card', 1), lambda: '<section>Guardians</section>', [fragment_cache.movie_tag(1)])
+    assert cache.get(('card', 1), lambda: '', [fragment_cache.movie_tag(1)]) is card
+    cache.get(('card', 2), lambda: '<section>Prometheus</section>', [fragment_cache.movie_tag(2)])
+
+    cache.invalidate_movie(1)
+    assert cache.stats['entries'] == 1
+    assert cache.get(('card', 2), lambda: '', [fragment_cache.movie_tag(2)]) == '<section>Prometheus</section>'
+
+
+def test_browse_pages_reuse_cached_movie_cards(client):
+    first_page = client.get('/movies_by_genres', query_string={'genres': 'Sci-Fi'}).get_data(as_text=True)
+    hits = fragment_cache.cache_instance.stats['hits']
+    second_page = client.get('/movies_by_genres', query_string={'genres': 'Sci-Fi'}).get_data(as_text=True)
+
+    # The three Movie cards come from the cache, the sidebar being a random choice of Movies
+    assert fragment_cache.cache_instance.stats['hits'] >= hits + 3
+    assert first_page.split('<aside')[0] == second_page.split('<aside')[0]
+    assert "movies_by_director?director=James+Gunn'" in second_page
+
+
+def test_review_evicts_only_the_cards_of_the_reviewed_movie(client):
+    log_in(client)
+    client.get('/movies_by_genres', query_string={'genres': 'Sci-Fi'})
+
+    response = client.post('/review', data={'review_text': 'Great soundtrack.', 'rating': 9, 'movie_rank': 1})
+    assert response.status_code == 302
+    assert fragment_cache.cache_instance.stats['invalidations'] >= 1
+
+    hits = fragment_cache.cache_instance.stats['hits']
+    page = client.get('/movies_by_genres', query_string={'genres': 'Sci-Fi'}).get_data(as_text=True)
+    assert '3 reviews' in page
+    assert fragment_cache.cache_instance.stats['hits'] >= hits + 2
+
+
+def test_page_cache_serves_only_anonymous_users(client, page_cache):
+    first_page = client.get('/movies_by_genres', query_string={'genres': 'Sci-Fi'}).get_data(as_text=True)
+    second_page = client.get('/movies_by_genres', query_string={'genres': 'Sci-Fi'}).get_data(as_text=True)
+    assert page_cache.stats['hits'] == 1
+    assert first_page == second_page
+
+    log_in(client)
+    page = client.get('/movies_by_genres', query_string={'genres': 'Sci-Fi'}).get_data(as_text=True)
+    assert page_cache.stats['hits'] == 1
+    assert 'Add to Watchlist' in page
+
+
+def test_review_evicts_the_cached_pages_showing_the_reviewed_movie(client, page_cache):
+    assert '2 reviews' in client.get('/movies_by_genres', query_string={'genres': 'Sci-Fi'}).get_data(as_text=True)
+
+    log_in(client)
+    client.post('/review', data={'review_text': 'Great soundtrack.', 'rating': 9, 'movie_rank': 1})
+    with client.session_transaction() as session:
+        session.pop('username')
+
+    assert '3 reviews' in client.get('/movies_by_genres', query_string={'genres': 'Sci-Fi'}).get_data(as_text=True)
+    assert page_cache.stats['invalidations'] == 1
@@ -0,0 +1,30 @@
+from movie_app.adapters.frequency_counter import FrequencyCounter
+
+
+def test_frequency_counter_orders_items_by_count():
+    counter = FrequencyCounter()
+    for item in ['a', 'b', 'b', 'c', 'c', 'c', 'd']:
+        counter.increment(item)
+
+    assert counter.most_common(3) == ['c', 'b', 'a']
+    assert counter.most_common(10) == ['c', 'b', 'a', 'd']
+    assert counter.most_common(0) == []
+    assert counter.count('c') == 3 and counter.count('e') == 0
+    assert counter.total == 7 and len(counter) == 4
+
+
+def test_frequency_counter_skips_empty_counts():
+    counter = FrequencyCounter()
+    for _ in range(1000):
+        counter.increment('popular')
+    counter.increment('rare')
+    counter.increment('rare')
+
+    # Only the counts 1000 and 2 are occupied, and the walk goes straight from one to the other
+    assert counter.most_common(2) == ['popular', 'rare']
+    counter.increment('rare')
+    assert counter.most_common(5) == ['popular', 'rare']
+
+    for _ in range(1000):
+        counter.increment('rare')
+    assert counter.most_common(2) == ['rare', 'popular']
@@ -1,9 +1,14 @@
 from movie_app.adapters.repository import RepositoryException
+from movie_app.adapters.range_index import RangePredicate
+from movie_app.adapters.memory_repository import MemoryRepository
 from movie_app.domainmodel import Actor, Director, Genre, Movie, Review, User, WatchList
 from movie_app.activitysimulations import MovieWatchingSimulation
+from config import DataPaths
 
 import pytest
 
+test_data = DataPaths.TEST_DATA_PATHS
+
 
 def test_repository_can_add_actor(in_memory_repo):
     actor = Actor("Bob Jones")
@@ -118,6 +123,28 @@ def test_repository_can_get_movie(in_memory_repo):
     assert movie == Movie('Sing', 2016)
 
 
+def test_repository_cannot_add_duplicate_movie(in_memory_repo):
+    movie = Movie('Sing', 2016)
+    movie.rank = 12
+    in_memory_repo.add_movie(movie)
+
+    assert in_memory_repo.get_movie_by_rank(12) is None
+    assert in_memory_repo.get_movie('Sing', 2016) is not movie
+    assert in_memory_repo.get_number_of_movies() == 11
+
+
+def test_repository_can_get_movie_with_normalized_title():
+    repo = MemoryRepository(normalize_movie_titles=True)
+    movie = Movie('The  Great Wall', 2016)
+    repo.add_movie(movie)
+
+    assert repo.get_movie('the great  wall ', 2016) is movie
+    assert repo.get_movie('the great wall', 2017) is None
+
+    repo.add_movie(Movie('THE GREAT WALL', 2016))
+    assert repo.get_number_of_movies() == 1
+
+
 def test_repository_can_get_movies_by_rank(in_memory_repo):
     movie = in_memory_repo.get_movie_by_rank(3)
     assert movie == Movie('Split', 2016)
@@ -210,6 +237,29 @@ def test_repository_cannot_get_movies_with_no_genres(in_memory_repo):
     assert len(movies_with_genres) == 0
 
 
+def test_repository_indexes_added_movie(in_memory_repo):
+    movie = Movie("Moana", 2016)
+    movie.rank = 12
+    movie.director = Director('James Gunn')
+    movie.add_actor(Actor('Chris Pratt'))
+    movie.add_genre(Genre('Horror'))
+    in_memory_repo.add_movie(movie)
+
+    assert in_memory_repo.get_movie_ranks_by_director(Director('James Gunn')) == [1, 11, 12]
+    assert 12 in in_memory_repo.get_movie_ranks_by_release_year(2016)
+    assert in_memory_repo.get_movie_ranks_by_actors([Actor('Chris Pratt')]) == [1, 10, 12]
+    assert in_memory_repo.get_movie_ranks_by_genres([Genre('Horror')])[-1] == 12
+
+
+def test_repository_ignores_unknown_entities_when_intersecting(in_memory_repo):
+    actors = [Actor('Chris Pratt'), Actor('Nobody')]
+    assert in_memory_repo.get_movie_ranks_by_actors(actors) == in_memory_repo.get_movie_ranks_by_actors(actors[:1])
+
+    genres = [Genre('Horror'), Genre('Sci-Fi'), Genre('Nothing')]
+    movie_ranks = in_memory_repo.get_movie_ranks_by_genres(genres)
+    assert in_memory_repo.get_movies_by_rank(movie_ranks) == [Movie('Slither', 2006)]
+
+
 def test_repository_can_add_review(in_memory_repo):
     user = User("Martin", "pw12345")
     movie = Movie('Sing', 2016)
@@ -341,6 +391,51 @@ def test_repository_can_get_users_watched_movie(in_memory_repo):
     assert len(in_memory_repo.get_users_watched_movie(in_memory_repo.get_movie_by_rank(1))) == 0
 
 
+def test_repository_can_get_users_who_watched_an_equal_movie(in_memory_repo):
+    split = in_memory_repo.get_movie_by_rank(3)
+    movie = Movie(split.title, split.release_year)
+    movie.runtime_minutes = split.runtime_minutes
+    user = User('Matt', 'pw4567')
+    user.watch_movie(movie)
+    in_memory_repo.add_user(user)
+
+    assert user in in_memory_repo.get_users_watched_movie(split)
+    assert user in in_memory_repo.get_users_watched_movie(Movie(split.title, split.release_year))
+    assert len(in_memory_repo.get_users_watched_movie(Movie('Moana', 2016))) == 0
+
+    user.remove_watched_movie(movie)
+    assert user not in in_memory_repo.get_users_watched_movie(split)
+
+
+def test_repository_can_get_users_of_added_watching_sims(in_memory_repo):
+    user = in_memory_repo.get_user('ian')
+    watching_simulation = MovieWatchingSimulation(in_memory_repo.get_movie_by_rank(1))
+    watching_simulation.add_user(user)
+    watching_simulation.watch_movie()
+    in_memory_repo.add_watching_sim(watching_simulation)
+
+    assert in_memory_repo.get_users_watched_movie(in_memory_repo.get_movie_by_rank(1)) == [user]
+
+
+def test_repository_can_get_users_who_watch_movie_after_being_stored(in_memory_repo):
+    user = User('Matt', 'pw4567')
+    in_memory_repo.add_user(user)
+    movie = in_memory_repo.get_movie_by_rank(2)
+    assert user not in in_memory_repo.get_users_watched_movie(movie)
+
+    user.watch_movie(movie)
+    assert user in in_memory_repo.get_users_watched_movie(movie)
+
+
+def test_repository_can_get_users_who_watch_movie_after_being_added(in_memory_repo):
+    user = in_memory_repo.get_user('ian')
+    movie = in_memory_repo.get_movie_by_rank(1)
+    user.watch_movie(movie)
+
+    assert in_memory_repo.get_users_watched_movie(Movie(movie.title, movie.release_year)) == [user]
+    assert len(in_memory_repo.get_users_watched_movie(Movie('Moana', 2016))) == 0
+
+
 def test_repository_can_add_watchlist(in_memory_repo):
     user = User('Matt', 'pw4567')
     user.watchlist.add_movie(Movie('Sing', 2016))
@@ -532,3 +627,112 @@ def test_repository_can_get_most_common_genres(in_memory_repo):
 
     most_common_genres = in_memory_repo.get_most_common_genres(20)
     assert len(most_common_genres) == sum(1 for _ in in_memory_repo.get_movie_file_csv_reader().dataset_of_genres)
+
+
+def test_repository_most_common_ties_are_stable(in_memory_repo):
+    most_common_actors = in_memory_repo.get_most_common_actors(5)
+    assert most_common_actors == in_memory_repo.get_most_common_actors(5)
+
+    movie = Movie("Moana", 2016)
+    movie.rank = 12
+    movie.add_actor(Actor('Vin Diesel'))
+    movie.add_actor(Actor('Bradley Cooper'))
+    in_memory_repo.add_movie(movie)
+
+    # Both actors now have two Movies, ranking behind Chris Pratt who reached two Movies first
+    assert in_memory_repo.get_most_common_actors(3) == [
+        Actor('Chris Pratt'), Actor('Vin Diesel'), Actor('Bradley Cooper')
+    ]
+
+
+def test_repository_loads_poster_urls(in_memory_repo):
+    assert in_memory_repo.get_poster_url(Movie('Prometheus', 2012)) == 'http://posters.test/prometheus.jpg'
+    assert in_memory_repo.has_poster_url(Movie('Split', 2016))
+    assert in_memory_repo.get_poster_url(Movie('Split', 2016)) is None
+    assert not in_memory_repo.has_poster_url(Movie('Sing', 2016))
+    assert [movie.rank for movie in in_memory_repo.get_movies_without_poster_urls()] == list(range(4, 12))
+
+
+def test_repository_can_add_poster_url(in_memory_repo):
+    in_memory_repo.add_poster_url(Movie('Sing', 2016), 'http://posters.test/sing.jpg')
+    assert in_memory_repo.get_poster_url(Movie('Sing', 2016)) == 'http://posters.test/sing.jpg'
+    assert Movie('Sing', 2016) not in in_memory_repo.get_movies_without_poster_urls()
+
+
+def test_repository_cannot_add_poster_url_for_nonexistent_movie(in_memory_repo):
+    with pytest.raises(RepositoryException):
+        in_memory_repo.add_poster_url(Movie('Unknown Movie', 2016), 'http://posters.test/unknown_movie.jpg')
+
+
+@pytest.fixture(params=[False, True], ids=['indexes', 'columns'])
+def range_repo(request):
+    # Range queries are answered from the range indexes, or from the movie columns
+    repo = MemoryRepository(use_movie_columns=request.param)
+    repo.populate(test_data)
+    return repo
+
+
+def test_repository_can_retrieve_movie_ranks_by_ranges(range_repo):
+    predicates = [RangePredicate('metascore', minimum=65),
+                  RangePredicate('runtime_minutes', maximum=120, include_maximum=False)]
+    assert range_repo.get_movie_ranks_by_ranges(predicates) == [8, 11]
+
+    # Movies without a revenue never match a revenue range
+    assert range_repo.get_movie_ranks_by_ranges([RangePredicate('revenue_millions', maximum=10)]) == [9, 11]
+    assert range_repo.get_movie_ranks_by_ranges([RangePredicate('external_rating', 7.0, 7.0)]) == [2, 10]
+    assert range_repo.get_movie_ranks_by_ranges([RangePredicate('rating_votes', minimum=10 ** 6)]) == []
+
+
+def test_repository_combines_ranges_with_attribute_queries(range_repo):
+    metascore_above_60 = RangePredicate('metascore', minimum=60, include_minimum=False)
+
+    assert range_repo.get_movie_ranks_by_ranges([metascore_above_60], director=Director('James Gunn')) == [1, 11]
+    assert range_repo.get_movie_ranks_by_ranges([metascore_above_60], genre_list=[Genre('Adventure')]) == [1, 2, 9]
+    assert range_repo.get_movie_ranks_by_ranges([metascore_above_60], actor_list=[Actor('Chris Pratt')]) == [1]
+    assert range_repo.get_movie_ranks_by_ranges([], genre_list=[Genre('Horror')]) == [3, 11]
+    assert range_repo.get_movie_ranks_by_ranges([], director=Director('Unknown Director')) == []
+
+
+def test_repository_ranges_include_added_movies(range_repo):
+    movie = Movie("Moana", 2016)
+    movie.rank = 12
+    movie.metascore = 81
+    range_repo.add_movie(movie)
+
+    assert range_repo.get_movie_ranks_by_ranges([RangePredicate('metascore', minimum=80)]) == [7, 12]
+
+
+def test_repository_rejects_invalid_range_predicates(in_memory_repo):
+    with pytest.raises(RepositoryException):
+        in_memory_repo.get_movie_ranks_by_ranges([RangePredicate('title', minimum=1)])
+
+    with pytest.raises(RepositoryException):
+        in_memory_repo.get_movie_ranks_by_ranges(['metascore>=80'])
+
+
+def test_repository_combines_ranges_with_unknown_actors_and_genres(range_repo):
+    assert range_repo.get_movie_ranks_by_ranges([], actor_list=[Actor('Chris Pratt'), Actor('Nobody')]) == [1, 10]
+    assert range_repo.get_movie_ranks_by_ranges([], genre_list=[Genre('Horror'), Genre('Western')]) == [3, 11]
+    assert range_repo.get_movie_ranks_by_ranges([], genre_list=[Genre('Western')]) == []
+
+
+def test_repository_can_sort_movie_ranks(range_repo):
+    assert range_repo.sort_movie_ranks([7, 8, 9, 11], 'revenue_millions') == [11, 9, 7, 8]
+    assert range_repo.sort_movie_ranks([7, 8, 9, 11], 'revenue_millions', descending=True) == [7, 9, 11, 8]
+
+    # Movies with equal values keep their order, and ranks that are not in the repository are left out
+    assert range_repo.sort_movie_ranks([10, 2, 1000], 'external_rating') == [10, 2]
+    assert range_repo.sort_movie_ranks([], 'metascore') == []
+
+
+def test_repository_answers_whole_catalogue_queries(range_repo):
+    predicates = [RangePredicate('release_year', 2010, 2016), RangePredicate('external_rating', minimum=7,
+                                                                             include_minimum=False)]
+    movie_ranks = range_repo.get_movie_ranks_by_ranges(predicates)
+
+    assert range_repo.sort_movie_ranks(movie_ranks, 'revenue_millions', descending=True) == [1, 4, 7, 3, 9]
+
+
+def test_repository_cannot_sort_by_invalid_attribute(in_memory_repo):
+    with pytest.raises(RepositoryException):
+        in_memory_repo.sort_movie_ranks([1, 2], 'title')
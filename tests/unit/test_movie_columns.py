@@ -0,0 +1,62 @@
+from movie_app.adapters.movie_columns import MovieColumns
+from movie_app.adapters.range_index import RangePredicate
+from movie_app.domainmodel import Director, Genre, Movie
+
+import pytest
+
+
+@pytest.fixture()
+def columns(dataset_of_movies):
+    # A small capacity makes the columns grow while the Movies are added
+    columns = MovieColumns(capacity=2)
+    for movie in dataset_of_movies:
+        columns.add(movie)
+    return columns
+
+
+def test_columns_mirror_all_movies(columns):
+    assert len(columns) == 11
+    assert columns.ranks(columns.mask([])) == list(range(1, 12))
+
+
+def test_columns_mask_by_ranges_director_and_genres(columns):
+    assert columns.ranks(columns.mask([RangePredicate('metascore', minimum=76)])) == [1, 7, 9]
+    assert columns.ranks(columns.mask([RangePredicate('revenue_millions')])) == [1, 2, 3, 4, 5, 6, 7, 9, 10, 11]
+    assert columns.ranks(columns.mask([], director=Director('James Gunn'))) == [1, 11]
+    assert columns.ranks(columns.mask([], genre_list=[Genre('Comedy'), Genre('Horror')])) == [11]
+    assert columns.ranks(columns.mask([], genre_list=[Genre('Western')])) == []
+
+
+def test_columns_sort_ranks(columns):
+    assert columns.sort_ranks([1, 2, 3], 'runtime_minutes') == [3, 1, 2]
+    assert columns.sort_ranks([8, 9, 11], 'revenue_millions', descending=True) == [9, 11, 8]
+
+
+def test_columns_sort_ranks_from_presorted_orders(columns, dataset_of_movies):
+    columns.prepare()
+
+    # Ranks in rank order and making up enough of the catalogue are picked out of the presorted orders, which must
+    # agree with a stable sort of them
+    for attribute in ('external_rating', 'revenue_millions', 'metascore'):
+        for descending in (False, True):
+            values = {movie.rank: getattr(movie, attribute) for movie in dataset_of_movies}
+            expected = sorted(range(1, 12), key=lambda rank: (
+                values[rank] is None, 0 if values[rank] is None else -values[rank] if descending else values[rank]))
+            assert columns.sort_ranks(list(range(1, 12)), attribute, descending) == expected
+
+    # Equal ratings keep rank order in either direction, and Movies missing a revenue come last
+    assert columns.sort_ranks(list(range(1, 12)), 'external_rating', descending=True)[5:7] == [2, 10]
+    assert columns.sort_ranks(list(range(1, 12)), 'revenue_millions', descending=True)[-1] == 8
+
+
+def test_columns_insert_added_movies_into_presorted_orders(columns):
+    columns.prepare()
+    movie = Movie('Slither 2', 2017)
+    movie.rank = 20
+    movie.external_rating = 7.0
+    columns.add(movie)
+
+    ranks = list(range(1, 12)) + [20]
+    assert columns.sort_ranks(ranks, 'external_rating') == [6, 5, 8, 11, 2, 10, 20, 9, 4, 3, 1, 7]
+    assert columns.sort_ranks(ranks, 'external_rating', descending=True) == [7, 1, 3, 4, 9, 2, 10, 20, 11, 8, 5, 6]
+    assert columns.sort_ranks(ranks, 'revenue_millions')[-2:] == [8, 20]
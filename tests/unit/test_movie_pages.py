@@ -0,0 +1,169 @@
+from movie_app.adapters.repository import RepositoryException
+from movie_app.adapters.memory_repository import MemoryRepository
+import movie_app.adapters.memory_repository as memory_repository
+from config import DataPaths
+import movie_app.services.movie_services as services
+from movie_app.domainmodel import Actor, Director, Genre, Movie
+
+import pytest
+
+
+def test_repository_can_get_pages_of_movie_ranks(in_memory_repo):
+    adventure = [Genre('Adventure')]
+    assert in_memory_repo.get_movie_ranks_page('genre', adventure, quantity=4) == ([1, 2, 5, 6], 6)
+    assert in_memory_repo.get_movie_ranks_page('genre', adventure, anchor=6, quantity=4) == ([9, 10], 6)
+    assert in_memory_repo.get_movie_ranks_page('genre', adventure, anchor=6, backward=True, quantity=4) == (
+        [1, 2, 5], 6)
+    assert in_memory_repo.get_movie_ranks_page('genre', adventure, backward=True, quantity=4) == ([5, 6, 9, 10], 6)
+
+    # Pages of Movies with several Genres or Actors hold only the Movies with all of them
+    assert in_memory_repo.get_movie_ranks_page('genre', [Genre('Action'), Genre('Adventure')], anchor=1,
+                                               quantity=2) == ([5, 6], 4)
+    assert in_memory_repo.get_movie_ranks_page('actor', [Actor('Chris Pratt'), 'hello'], anchor=1) == ([10], 2)
+    assert in_memory_repo.get_movie_ranks_page('director', [Director('John Doe')]) == ([], 0)
+
+
+def test_repository_pages_agree_with_movie_ranks(in_memory_repo):
+    for genre in in_memory_repo.get_genres():
+        movie_ranks = in_memory_repo.get_movie_ranks_by_genres([genre])
+        paged_ranks, anchor = list(), None
+        while True:
+            page, number_of_ranks = in_memory_repo.get_movie_ranks_page('genre', [genre], anchor, quantity=2)
+            assert number_of_ranks == len(movie_ranks)
+            if len(page) == 0:
+                break
+            paged_ranks.extend(page)
+            anchor = page[-1]
+        assert paged_ranks == movie_ranks
+
+
+@pytest.mark.parametrize('merge_ratio', (1000, 1), ids=('presorted', 'sorted'))
+@pytest.mark.parametrize('use_movie_columns', (False, True), ids=('indexes', 'columns'))
+def test_repository_can_get_sorted_pages_of_movie_ranks(use_movie_columns, merge_ratio, monkeypatch):
+    # Selections are paged through the presorted catalogue, or sorted when they are a small part of it
+    monkeypatch.setattr(memory_repository, 'MERGE_RATIO', merge_ratio)
+    repo = MemoryRepository(use_movie_columns=use_movie_columns)
+    repo.populate(DataPaths.TEST_DATA_PATHS)
+    comedy = [Genre('Comedy')]
+
+    # Movies missing the attribute come last, in rank order
+    assert repo.get_movie_ranks_page('genre', comedy, quantity=3, sort_attribute='revenue_millions') == ([11, 7, 4], 4)
+    assert repo.get_movie_ranks_page('genre', comedy, anchor=4, sort_attribute='revenue_millions') == ([8], 4)
+    assert repo.get_movie_ranks_page('genre', comedy, anchor=4, backward=True, sort_attribute='revenue_millions',
+                                     descending=True) == ([], 4)
+    assert repo.get_movie_ranks_page('genre', comedy, anchor=11, backward=True, quantity=2,
+                                     sort_attribute='revenue_millions', descending=True) == ([4, 7], 4)
+    assert repo.get_movie_ranks_page('genre', comedy, quantity=2, descending=True) == ([11, 8], 4)
+    assert repo.get_movie_ranks_page('genre', comedy, anchor=8, descending=True) == ([7, 4], 4)
+
+    for genre in repo.get_genres():
+        sorted_ranks = repo.sort_movie_ranks(repo.get_movie_ranks_by_genres([genre]), 'external_rating', True)
+        paged_ranks, anchor = list(), None
+        while True:
+            page, number_of_ranks = repo.get_movie_ranks_page('genre', [genre], anchor, quantity=2,
+                                                              sort_attribute='external_rating', descending=True)
+            if len(page) == 0:
+                break
+            paged_ranks.extend(page)
+            anchor = page[-1]
+        assert paged_ranks == sorted_ranks
+
+    # Adding a Movie changes the selections it is in
+    movie = Movie('Paddington 2', 2017)
+    movie.rank = 12
+    movie.add_genre(Genre('Comedy'))
+    repo.add_movie(movie)
+    assert repo.get_movie_ranks_page('genre', comedy, quantity=3, sort_attribute='revenue_millions') == ([11, 7, 4], 5)
+
+
+def test_repository_cannot_get_invalid_pages(in_memory_repo):
+    with pytest.raises(RepositoryException):
+        in_memory_repo.get_movie_ranks_page('year', [2016])
+    with pytest.raises(RepositoryException):
+        in_memory_repo.get_movie_ranks_page('genre', [Genre('Comedy')], quantity=0)
+    with pytest.raises(RepositoryException):
+        in_memory_repo.get_movie_ranks_page('genre', [Genre('Comedy')], anchor='7')
+    with pytest.raises(RepositoryException):
+        in_memory_repo.get_movie_ranks_page('genre', [Genre('Comedy')], sort_attribute='title')
+
+
+def test_page_cursors_are_opaque_and_round_trip():
+    for backward, anchor in ((False, 17), (True, 17), (True, None)):
+        cursor = services.encode_page_cursor(backward, anchor)
+        assert str(anchor) not in cursor
+        assert services.decode_page_cursor(cursor) == (backward, anchor)
+
+    assert services.decode_page_cursor(None) == (False, None)
+    for cursor in ('3', 'YQ', '!!'):
+        with pytest.raises(services.ServicesException):
+            services.decode_page_cursor(cursor)
+
+
+def test_movie_pages_follow_cursors(in_memory_repo):
+    adventure = [Genre('Adventure')]
+    page = services.get_movie_page('genre', adventure, None, 4, None, False, in_memory_repo)
+    assert page['ranks'] == [1, 2, 5, 6] and page['number_of_movies'] == 6
+    assert page['previous_cursor'] is None
+
+    page = services.get_movie_page('genre', adventure, page['next_cursor'], 4, None, False, in_memory_repo)
+    assert page['ranks'] == [9, 10] and page['next_cursor'] is None
+
+    # Too few Movies precede the second page to fill the one before it, so the first page is shown
+    page = services.get_movie_page('genre', adventure, page['previous_cursor'], 4, None, False, in_memory_repo)
+    assert page['ranks'] == [1, 2, 5, 6] and page['previous_cursor'] is None
+
+    page = services.get_movie_page('genre', adventure, page['last_cursor'], 4, None, False, in_memory_repo)
+    assert page['ranks'] == [5, 6, 9, 10] and page['next_cursor'] is None
+
+    # Pages in other orders are found in the presorted catalogue
+    page = services.get_movie_page('genre', adventure, None, 4, 'external_rating', True, in_memory_repo)
+    assert page['ranks'] == [1, 9, 2, 10]
+    page = services.get_movie_page('genre', adventure, page['next_cursor'], 4, 'external_rating', True,
+                                   in_memory_repo)
+    assert page['ranks'] == [5, 6]
+
+    # A cursor that cannot be read is taken to be for the first page
+    page = services.get_movie_page('genre', adventure, 'not a cursor', 4, None, False, in_memory_repo)
+    assert page['ranks'] == [1, 2, 5, 6]
+
+
+def test_list_pages_follow_cursors():
+    page = services.get_list_page([11, 7, 4, 8, 1], None, 2)
+    assert page['ranks'] == [11, 7] and page['number_of_movies'] == 5 and page['previous_cursor'] is None
+
+    page = services.get_list_page([11, 7, 4, 8, 1], page['next_cursor'], 2)
+    assert page['ranks'] == [4, 8]
+
+    page = services.get_list_page([11, 7, 4, 8, 1], page['last_cursor'], 2)
+    assert page['ranks'] == [8, 1] and page['next_cursor'] is None
+
+    page = services.get_list_page([11, 7, 4, 8, 1], services.encode_page_cursor(True, 4), 2)
+    assert page['ranks'] == [11, 7]
+
+
+def test_movie_pages_do_not_shift_when_movies_are_added(in_memory_repo):
+    horror = [Genre('Horror')]
+    page = services.get_movie_page('genre', horror, None, 1, 'external_rating', True, in_memory_repo)
+    assert page['ranks'] == [3]
+
+    # A Movie rated above the first page is added, but the next page still follows the Movie the first page showed
+    movie = Movie('Split 2', 2019)
+    movie.rank = 12
+    movie.external_rating = 9.0
+    movie.add_genre(Genre('Horror'))
+    in_memory_repo.add_movie(movie)
+
+    page = services.get_movie_page('genre', horror, page['next_cursor'], 1, 'external_rating', True, in_memory_repo)
+    assert page['ranks'] == [11] and page['number_of_movies'] == 3
+
+
+def test_browse_pages_use_cursors_and_page_sizes(client):
+    page = client.get('/movies_by_genres', query_string={'genres': 'Adventure', 'size': 4}).get_data(as_text=True)
+    assert 'Showing 4 of 6 movies' in page
+    assert f"size=4&amp;cursor={services.encode_page_cursor(False, 6)}" in page
+    assert f"size=4&amp;cursor={services.encode_page_cursor(True, None)}" in page
+
+    page = client.get('/movies_by_genres', query_string={
+        'genres': 'Adventure', 'size': 4, 'cursor': services.encode_page_cursor(False, 6)}).get_data(as_text=True)
+    assert 'Showing 2 of 6 movies' in page
+    assert "add_review_for=9'" in page and "add_review_for=6'" not in page
@@ -0,0 +1,159 @@
+import random
+
+from movie_app.adapters.movie_query import MovieQueryException, parse_movie_query, MAX_QUERY_DEPTH
+from movie_app.adapters.rank_bitmap import ARRAY_LIMIT, RankBitmap
+from movie_app.adapters.repository import RepositoryException
+import movie_app.services.movie_services as services
+from movie_app.domainmodel import Director, Genre, Movie
+
+import pytest
+
+
+@pytest.mark.parametrize('size', (10, ARRAY_LIMIT + 1, 20000))
+def test_rank_bitmap_matches_set_operations(size):
+    rng = random.Random(size)
+    a = {rng.randrange(200000) for _ in range(size)}
+    b = {rng.randrange(200000) for _ in range(size // 2)} | set(list(a)[:size // 4])
+    bitmap_a, bitmap_b = RankBitmap(a), RankBitmap(sorted(b, reverse=True))
+
+    assert list(bitmap_a) == sorted(a) and len(bitmap_a) == len(a)
+    assert list(bitmap_a & bitmap_b) == sorted(a & b)
+    assert list(bitmap_a | bitmap_b) == sorted(a | b)
+    assert list(bitmap_a - bitmap_b) == sorted(a - b)
+    assert min(a) in bitmap_a and 200001 not in bitmap_a
+
+
+def test_rank_bitmap_results_do_not_share_containers():
+    bitmap = RankBitmap([1, 2, 3])
+    union = bitmap | RankBitmap()
+    bitmap.add(4)
+    assert list(union) == [1, 2, 3]
+
+
+@pytest.mark.parametrize(('text', 'parsed'), (
+        ('genre:Action OR genre:Sci-Fi NOT genre:Horror',
+         '(genre:"Action" OR (genre:"Sci-Fi" AND NOT genre:"Horror"))'),
+        ('(genre:Action or genre:Sci-Fi) and not genre:Horror director:"James Gunn"',
+         '((genre:"Action" OR genre:"Sci-Fi") AND NOT genre:"Horror" AND director:"James Gunn")'),
+        ('year:2010..2016', 'year:"2010..2016"')
+))
+def test_parse_movie_query(text, parsed):
+    assert str(parse_movie_query(text)) == parsed
+
+
+def test_parse_movie_query_limits_nesting():
+    assert str(parse_movie_query('NOT ' * 3000 + 'genre:Action')) == 'genre:"Action"'
+    assert str(parse_movie_query('NOT ' * 3001 + 'genre:Action')) == 'NOT genre:"Action"'
+    assert str(parse_movie_query('(' * MAX_QUERY_DEPTH + 'genre:Action' + ')' * MAX_QUERY_DEPTH)) == 'genre:"Action"'
+
+    with pytest.raises(MovieQueryException):
+        parse_movie_query('(' * 3000 + 'genre:Action' + ')' * 3000)
+    with pytest.raises(MovieQueryException):
+        parse_movie_query('(NOT ' * (MAX_QUERY_DEPTH + 1) + 'genre:Action' + ')' * (MAX_QUERY_DEPTH + 1))
+
+
+@pytest.mark.parametrize('text', ('', 'genre:', 'title:Split', '(genre:Action', 'genre:Action)', 'AND genre:Action',
+                                  'year:201', 'actor:"Chris Pratt'))
+def test_parse_movie_query_rejects_invalid_queries(text):
+    with pytest.raises(MovieQueryException):
+        parse_movie_query(text)
+
+
+@pytest.mark.parametrize(('text', 'movie_ranks'), (
+        ('genre:Horror', [3, 11]),
+        ('genre:horror NOT director:"JAMES GUNN"', [3]),
+        ('actor:"Chris Pratt" OR genre:Horror', [1, 3, 10, 11]),
+        ('NOT year:2016', [1, 2, 11]),
+        ('year:2012..2014', [1, 2]),
+        ('genre:Horror actor:"Chris Pratt"', []),
+        ('genre:Unknown OR director:"James Gunn"', [1, 11])
+))
+def test_repository_gets_movie_ranks_by_query(in_memory_repo, text, movie_ranks):
+    assert in_memory_repo.get_movie_ranks_by_query(parse_movie_query(text)) == movie_ranks
+
+
+def test_repository_sorts_query_results(in_memory_repo):
+    query = parse_movie_query('year:2016')
+    movie_ranks = in_memory_repo.get_movie_ranks_by_query(query, 'external_rating', descending=True)
+    assert movie_ranks == in_memory_repo.sort_movie_ranks(movie_ranks, 'external_rating', descending=True)
+    assert in_memory_repo.get_movie_ranks_by_query(query, descending=True) == sorted(movie_ranks, reverse=True)
+
+    with pytest.raises(RepositoryException):
+        in_memory_repo.get_movie_ranks_by_query('genre:Horror')
+    with pytest.raises(RepositoryException):
+        in_memory_repo.get_movie_ranks_by_query(query, 'title')
+
+
+def test_repository_query_includes_added_movies(in_memory_repo):
+    movie = Movie('Slither 2', 2017)
+    movie.rank = 70000
+    movie.director = Director('James Gunn')
+    movie.add_genre(Genre('Horror'))
+    in_memory_repo.add_movie(movie)
+
+    assert in_memory_repo.get_movie_ranks_by_query(parse_movie_query('genre:Horror director:"James Gunn"')) == \
+        [11, 70000]
+    assert in_memory_repo.get_movie_ranks_by_query(parse_movie_query('genre:Horror NOT year:2017')) == [3, 11]
+
+
+def test_parse_sort_order():
+    assert services.parse_sort_order('-rating') == ('external_rating', True)
+    assert services.parse_sort_order('year') == ('release_year', False)
+    assert services.parse_sort_order('') == (None, False)
+
+    with pytest.raises(services.ServicesException):
+        services.parse_sort_order('title')
+
+
+def test_movies_by_query(client):
+    response = client.get('/movies_by_query', query_string={'query': 'genre:Horror NOT director:"James Gunn"'})
+    assert b'Movies matching: genre:Horror' in response.data
+    assert b"add_review_for=3'" in response.data
+    assert b"add_review_for=11'" not in response.data
+
+    response = client.get('/movies_by_query', query_string={'query': 'genre:Horror OR', 'sort': '-rating'})
+    assert b'Query is not valid: Query ends before an operand' in response.data
+
+    response = client.get('/movies_by_query', query_string={'query': '(' * 3000 + 'genre:Action' + ')' * 3000})
+    assert response.status_code == 200
+    assert b'Query is not valid: Query nests parentheses' in response.data
+
+
+def test_movies_by_query_reads_page_arguments(client):
+    response = client.get('/movies_by_query', query_string={'query': 'genre:Horror', 'cursor': 'zz'})
+    assert response.status_code == 200
+    assert b"add_review_for=3'" in response.data
+
+    response = client.get('/movies_by_query', query_string={'query': 'genre:Horror', 'sort': '-rating', 'size': 1})
+    assert b"add_review_for=3'" in response.data
+    cursor = services.encode_page_cursor(False, 3)
+    assert f"sort=-rating&amp;size=1&amp;cursor={cursor}".encode() in response.data
+
+    response = client.get('/movies_by_query', query_string={'query': 'genre:Horror', 'sort': '-rating', 'size': 1,
+                                                            'cursor': cursor})
+    assert b"add_review_for=11'" in response.data and b"add_review_for=3'" not in response.data
+
+
+def test_browse_routes_sort_movies(client):
+    page = client.get('/movies_by_genres', query_string={'genres': 'Comedy', 'sort': '-revenue'}).get_data(as_text=True)
+    assert [page.index(f"add_review_for={rank}'") for rank in (4, 7, 11)] == sorted(
+        page.index(f"add_review_for={rank}'") for rank in (4, 7, 11))
+    assert "add_review_for=8'" not in page
+    assert f"sort=-revenue&amp;cursor={services.encode_page_cursor(False, 11)}" in page
+
+    page = client.get('/movies_by_director', query_string={'director': 'James Gunn', 'sort': '-rank'}).get_data(
+        as_text=True)
+    assert page.index("add_review_for=11'") < page.index("add_review_for=1'")
+
+    # An unknown sort order leaves the Movies in rank order
+    page = client.get('/movies_by_actors', query_string={'actors': 'Chris Pratt', 'sort': 'title'}).get_data(
+        as_text=True)
+    assert page.index("add_review_for=1'") < page.index("add_review_for=10'")
+
+
+def test_search_for_movies_redirects_queries(client):
+    assert client.get('/search_for_movies').status_code == 200
+
+    response = client.post('/search_for_movies', data={
+        'select': 'Query, e.g. (genre:Action OR genre:Sci-Fi) NOT genre:Horror', 'search': 'genre:Horror'})
+    assert response.headers['Location'].endswith('/movies_by_query?query=genre%3AHorror')
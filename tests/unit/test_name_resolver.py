@@ -0,0 +1,87 @@
+from movie_app.adapters.frequency_counter import FrequencyCounter
+from movie_app.adapters.name_resolver import NameResolver, deletions, edit_distance
+from movie_app.adapters.repository import RepositoryException
+from movie_app.domainmodel import Actor, Director, User
+import movie_app.services.movie_services as services
+
+import pytest
+
+
+@pytest.fixture()
+def name_resolver():
+    counter = FrequencyCounter()
+    name_resolver = NameResolver(counter)
+    for name in ('Chris Pratt', 'Chris Pine', 'Chris Evans', 'Zoë Saldana', 'Tom Hanks', 'Tim Hanks'):
+        name_resolver.add(name, name)
+    counter.increment('Tom Hanks')
+    return name_resolver
+
+
+@pytest.mark.parametrize(('a', 'b', 'distance'), (
+        ('pratt', 'pratt', 0), ('pratt', 'prat', 1), ('pratt', 'rpatt', 1), ('pratt', 'pine', 3),
+        ('saldana', 'sladanna', 2), ('', 'ab', 2)
+))
+def test_edit_distance(a, b, distance):
+    assert edit_distance(a, b, 2) == min(distance, 3)
+
+
+def test_deletions():
+    assert deletions('abc', 1) == {'abc', 'bc', 'ac', 'ab'}
+    assert len(max(deletions('abcdefghijk', 0), key=len)) == 7
+
+
+def test_name_resolver_resolves_case_and_accent_variants(name_resolver):
+    assert name_resolver.resolve('CHRIS  pratt', 1) == ['Chris Pratt']
+    assert name_resolver.resolve('zoe saldaña', 5) == ['Zoë Saldana']
+
+
+def test_name_resolver_suggests_close_names(name_resolver):
+    assert name_resolver.resolve('chirs prat', 5) == ['Chris Pratt']
+    assert name_resolver.resolve('chris pane', 5) == ['Chris Pine']
+
+    # Equally close names are ranked by count
+    assert name_resolver.resolve('tam hanks', 5) == ['Tom Hanks', 'Tim Hanks']
+    assert name_resolver.resolve('tam hanks', 1) == ['Tom Hanks']
+
+
+def test_name_resolver_bounds_edit_distance(name_resolver):
+    assert name_resolver.resolve('pratt', 5) == []
+    assert name_resolver.resolve('chris brett', 5) == []
+    assert name_resolver.resolve('', 5) == []
+
+
+def test_repository_resolves_names(in_memory_repo):
+    assert in_memory_repo.resolve_actor_names('chris prat', 3) == [Actor('Chris Pratt')]
+    assert in_memory_repo.resolve_director_names('JAMES gun', 3) == [Director('James Gunn')]
+    assert in_memory_repo.resolve_user_names('Martn', 3) == [User('martin', 'pw')]
+
+    with pytest.raises(RepositoryException):
+        in_memory_repo.resolve_actor_names('chris prat', 0)
+
+
+def test_services_accept_case_and_accent_variants(in_memory_repo):
+    assert services.get_actor('CHRIS PRATT', in_memory_repo) == Actor('Chris Pratt')
+    assert services.get_director('james gunn', in_memory_repo) == Director('James Gunn')
+
+    with pytest.raises(services.ServicesException):
+        services.get_actor('chris prat', in_memory_repo)
+
+
+def test_movies_by_actors_suggests_close_names(client):
+    response = client.get('/movies_by_actors', query_string={'actors': 'chris prat'})
+    assert b'Did you mean' in response.data
+    assert b'<a href="/movies_by_actors?actors=Chris+Pratt">Chris Pratt</a>' in response.data
+
+    response = client.get('/movies_by_actors', query_string={'actors': 'chris PRATT'})
+    assert b'Did you mean' not in response.data
+    assert b"add_review_for=1'" in response.data
+
+
+def test_movies_by_director_suggests_close_names(client):
+    response = client.get('/movies_by_director', query_string={'director': 'James Gun'})
+    assert b'<a href="/movies_by_director?director=James+Gunn">James Gunn</a>' in response.data
+
+
+def test_login_suggests_close_username(client):
+    response = client.post('/authentication/login', data={'username': 'martn', 'password': 'pw12345'})
+    assert b'Did you mean martin?' in response.data
@@ -0,0 +1,156 @@
+import time
+
+import movie_app.adapters.omdb_client as omdb_client
+import movie_app.adapters.poster_cache as poster_cache
+import movie_app.blueprints.utilities as utilities
+from movie_app.adapters.omdb_client import OMDbClient, OMDbException, CircuitOpenException, CircuitBreaker, \
+    RetryBudget
+from movie_app.adapters.poster_cache import PosterCache
+
+import pytest
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_client_returns_movie_info(standin):
+    settings, base_url = standin
+    client = OMDbClient('key', base_url=base_url)
+
+    movie_info = client.get_movie_info('Split', 2016)
+    assert movie_info['Response'] == 'True'
+    assert movie_info['Poster'].endswith('/posters/Split.png')
+    assert movie_info['Year'] == '2016'
+
+
+def test_client_returns_movie_not_found(standin):
+    settings, base_url = standin
+    settings.not_found_rate = 1.0
+    client = OMDbClient('key', base_url=base_url)
+
+    assert client.get_movie_info('Split', 2016) == {'Response': 'False', 'Error': 'Movie not found!'}
+    assert client.circuit_breaker.state == CircuitBreaker.CLOSED
+
+
+def test_client_retries_server_errors(standin):
+    settings, base_url = standin
+    settings.failure_rate = 1.0
+    client = OMDbClient('key', base_url=base_url, max_attempts=3)
+
+    with pytest.raises(OMDbException):
+        client.get_movie_info('Split', 2016)
+
+    assert settings.stats['requests'] == 3
+    assert client.stats['retries'] == 2
+    assert client.stats['failures'] == 3
+
+
+def test_client_retries_are_limited_by_budget(standin):
+    settings, base_url = standin
+    settings.failure_rate = 1.0
+    client = OMDbClient('key', base_url=base_url, max_attempts=3, retry_budget=RetryBudget(ratio=0.0, max_tokens=1),
+                        circuit_breaker=CircuitBreaker(failure_threshold=100))
+
+    for _ in range(3):
+        with pytest.raises(OMDbException):
+            client.get_movie_info('Split', 2016)
+
+    assert client.stats['retries'] == 1
+    assert settings.stats['requests'] == 4
+
+
+def test_client_times_out_hung_requests(standin):
+    settings, base_url = standin
+    settings.hang_rate = 1.0
+    settings.hang_seconds = 1.0
+    client = OMDbClient('key', base_url=base_url, read_timeout_seconds=0.1, max_attempts=1)
+
+    start = time.monotonic()
+    with pytest.raises(OMDbException):
+        client.get_movie_info('Split', 2016)
+    assert time.monotonic() - start < 0.9
+
+
+def test_circuit_opens_after_repeated_failures_and_recovers(standin):
+    settings, base_url = standin
+    settings.failure_rate = 1.0
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout_seconds=10, clock=clock)
+    client = OMDbClient('key', base_url=base_url, max_attempts=1, circuit_breaker=breaker)
+
+    for _ in range(2):
+        with pytest.raises(OMDbException):
+            client.get_movie_info('Split', 2016)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    # While open, lookups fail without contacting OMDb
+    with pytest.raises(CircuitOpenException):
+        client.get_movie_info('Split', 2016)
+    assert settings.stats['requests'] == 2
+    assert client.stats['rejected'] == 1
+
+    # A failed probe opens the circuit again
+    clock.now += 10
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(OMDbException):
+        client.get_movie_info('Split', 2016)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    # A successful probe closes it
+    settings.failure_rate = 0.0
+    clock.now += 10
+    assert client.get_movie_info('Split', 2016)['Response'] == 'True'
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_circuit_admits_one_probe():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout_seconds=10, clock=clock)
+    breaker.record_failure()
+
+    assert not breaker.allow_request()
+    clock.now += 10
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+
+def test_open_circuit_ignores_calls_started_before_it_opened():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout_seconds=10, clock=FakeClock())
+    breaker.record_failure()
+    breaker.record_success()
+
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_retry_budget_is_earned_by_requests():
+    budget = RetryBudget(ratio=0.5, max_tokens=1)
+    assert budget.withdraw()
+    assert not budget.withdraw()
+
+    budget.deposit()
+    budget.deposit()
+    assert budget.withdraw()
+
+
+def test_get_image_url_for_movie_returns_none_while_omdb_is_unavailable(standin, monkeypatch):
+    settings, base_url = standin
+    settings.failure_rate = 1.0
+    clock = FakeClock()
+    client = OMDbClient('key', base_url=base_url, max_attempts=1,
+                        circuit_breaker=CircuitBreaker(failure_threshold=1, reset_timeout_seconds=10, clock=clock))
+    monkeypatch.setattr(omdb_client, 'client_instance', client)
+    monkeypatch.setattr(poster_cache, 'cache_instance', PosterCache())
+
+    assert utilities.get_image_url_for_movie('Split', 2016) is None
+    assert utilities.get_image_url_for_movie('Split', 2016) is None
+    assert settings.stats['requests'] == 1
+
+    # Failures are not cached, so the poster is found once OMDb recovers
+    settings.failure_rate = 0.0
+    clock.now += 10
+    assert utilities.get_image_url_for_movie('Split', 2016).endswith('/posters/Split.png')
@@ -0,0 +1,201 @@
+import threading
+import time
+
+from flask import Flask
+
+import movie_app.adapters.omdb_client as omdb_client
+import movie_app.adapters.poster_cache as poster_cache
+import movie_app.blueprints.utilities as utilities
+from movie_app.adapters.poster_cache import PosterCache, MISSING
+from movie_app.adapters.poster_enrichment import OMDB_MOVIE_NOT_FOUND
+
+import pytest
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeClient:
+    def __init__(self, get_movie_info):
+        self.get_movie_info = get_movie_info
+
+
+@pytest.fixture()
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture()
+def cache_file(tmp_path):
+    return str(tmp_path.joinpath('posters.sqlite3'))
+
+
+def test_poster_cache_returns_missing_for_unknown_movie():
+    cache = PosterCache()
+    assert cache.get('Guardians of the Galaxy', 2014) is MISSING
+    assert cache.stats['misses'] == 1
+
+
+def test_poster_cache_returns_stored_url():
+    cache = PosterCache()
+    cache.put('Guardians of the Galaxy', 2014, 'http://posters/gotg.jpg')
+
+    assert cache.get('Guardians of the Galaxy', 2014) == 'http://posters/gotg.jpg'
+    assert cache.get('Guardians of the Galaxy', 2015) is MISSING
+    assert cache.stats['memory_hits'] == 1
+
+
+def test_poster_cache_evicts_least_recently_used_entry():
+    cache = PosterCache(capacity=2)
+    cache.put('Prometheus', 2012, 'http://posters/prometheus.jpg')
+    cache.put('Split', 2016, 'http://posters/split.jpg')
+    cache.get('Prometheus', 2012)
+    cache.put('Sing', 2016, 'http://posters/sing.jpg')
+
+    assert cache.get('Split', 2016) is MISSING
+    assert cache.get('Prometheus', 2012) == 'http://posters/prometheus.jpg'
+    assert cache.stats['evictions'] == 1
+    assert cache.stats['size'] == 2
+
+
+def test_poster_cache_expires_entries(clock):
+    cache = PosterCache(ttl_seconds=100, negative_ttl_seconds=10, clock=clock)
+    cache.put('Prometheus', 2012, 'http://posters/prometheus.jpg')
+    cache.put('Unknown Movie', 2012, None)
+
+    clock.now += 20
+    assert cache.get('Prometheus', 2012) == 'http://posters/prometheus.jpg'
+    assert cache.get('Unknown Movie', 2012) is MISSING
+
+    clock.now += 100
+    assert cache.get('Prometheus', 2012) is MISSING
+
+
+def test_poster_cache_stores_negative_results():
+    cache = PosterCache()
+    cache.put('Unknown Movie', 2012, None)
+    assert cache.get('Unknown Movie', 2012) is None
+
+
+def test_poster_cache_persists_entries_between_instances(cache_file):
+    cache = PosterCache(file_name=cache_file)
+    cache.put('Split', 2016, 'http://posters/split.jpg')
+    cache.put('Unknown Movie', 2016, None)
+
+    other_cache = PosterCache(file_name=cache_file)
+    assert other_cache.get('Split', 2016) == 'http://posters/split.jpg'
+    assert other_cache.get('Unknown Movie', 2016) is None
+    assert other_cache.stats['disk_hits'] == 2
+
+    other_cache.get('Split', 2016)
+    assert other_cache.stats['memory_hits'] == 1
+
+
+def test_poster_cache_clear_keeps_persistent_entries(cache_file):
+    cache = PosterCache(file_name=cache_file)
+    cache.put('Split', 2016, 'http://posters/split.jpg')
+    cache.clear()
+
+    assert cache.stats['size'] == 0
+    assert cache.get('Split', 2016) == 'http://posters/split.jpg'
+    assert cache.stats['disk_hits'] == 1
+
+
+def test_get_image_url_for_movie_fetches_each_movie_once(monkeypatch):
+    requested = list()
+
+    def fake_get_movie_info(movie_title, release_year=None):
+        requested.append((movie_title, release_year))
+        if movie_title == 'Unknown Movie':
+            return {'Response': 'False', 'Error': OMDB_MOVIE_NOT_FOUND}
+        return {'Response': 'True', 'Poster': 'http://posters/split.jpg'}
+
+    monkeypatch.setattr(omdb_client, 'client_instance', FakeClient(fake_get_movie_info))
+    monkeypatch.setattr(poster_cache, 'cache_instance', PosterCache())
+
+    for _ in range(2):
+        assert utilities.get_image_url_for_movie('Split', 2016) == 'http://posters/split.jpg'
+        assert utilities.get_image_url_for_movie('Unknown Movie', 2016) is None
+
+    assert len(requested) == 2
+    assert requested[0] == ('Split', 2016)
+
+
+def test_get_image_url_for_movie_does_not_cache_errors(monkeypatch):
+    requested = list()
+
+    def fake_get_movie_info(movie_title, release_year=None):
+        requested.append((movie_title, release_year))
+        return {'Response': 'False', 'Error': 'Request limit reached!'}
+
+    monkeypatch.setattr(omdb_client, 'client_instance', FakeClient(fake_get_movie_info))
+    monkeypatch.setattr(poster_cache, 'cache_instance', PosterCache())
+
+    assert utilities.get_image_url_for_movie('Split', 2016) is None
+    assert utilities.get_image_url_for_movie('Split', 2016) is None
+    assert len(requested) == 2
+
+
+@pytest.fixture()
+def app_context():
+    app = Flask('movie_app')
+    app.config['POSTER_DEADLINE_SECONDS'] = 0.5
+    with app.test_request_context():
+        yield app
+
+
+def test_get_image_urls_resolves_movies_concurrently(monkeypatch, app_context):
+    barrier = threading.Barrier(3, timeout=2)
+
+    def fake_get_movie_info(movie_title, release_year=None):
+        # Every lookup waits for the others, so this only succeeds if they run at the same time
+        barrier.wait()
+        return {'Response': 'True', 'Poster': f"http://posters/{movie_title}.jpg"}
+
+    monkeypatch.setattr(omdb_client, 'client_instance', FakeClient(fake_get_movie_info))
+    monkeypatch.setattr(poster_cache, 'cache_instance', PosterCache())
+
+    image_urls = utilities.get_image_urls({1: ('Split', 2016), 2: ('Sing', 2016), 3: ('Prometheus', 2012)})
+    assert image_urls == {1: 'http://posters/Split.jpg', 2: 'http://posters/Sing.jpg',
+                          3: 'http://posters/Prometheus.jpg'}
+
+
+def test_get_image_urls_uses_placeholder_after_deadline(monkeypatch, app_context):
+    release = threading.Event()
+
+    def fake_get_movie_info(movie_title, release_year=None):
+        if movie_title == 'Sing':
+            release.wait(2)
+        return {'Response': 'True', 'Poster': f"http://posters/{movie_title}.jpg"}
+
+    monkeypatch.setattr(omdb_client, 'client_instance', FakeClient(fake_get_movie_info))
+    monkeypatch.setattr(poster_cache, 'cache_instance', PosterCache())
+
+    image_urls = utilities.get_image_urls({1: ('Split', 2016), 2: ('Sing', 2016)})
+    assert image_urls[1] == 'http://posters/Split.jpg'
+    assert image_urls[2].endswith('/static/images/poster_placeholder.svg')
+
+    # The late lookup still completes and is served from the cache on the next page
+    release.set()
+    for _ in range(200):
+        if poster_cache.cache_instance.get('Sing', 2016) is not MISSING:
+            break
+        time.sleep(0.01)
+    image_urls = utilities.get_image_urls({2: ('Sing', 2016)})
+    assert image_urls[2] == 'http://posters/Sing.jpg'
+
+
+def test_get_image_urls_uses_placeholder_for_missing_posters(monkeypatch, app_context):
+    def fake_get_movie_info(movie_title, release_year=None):
+        return {'Response': 'False', 'Error': OMDB_MOVIE_NOT_FOUND}
+
+    monkeypatch.setattr(omdb_client, 'client_instance', FakeClient(fake_get_movie_info))
+    monkeypatch.setattr(poster_cache, 'cache_instance', PosterCache())
+
+    image_urls = utilities.get_image_urls({1: ('Unknown Movie', 2016)})
+    assert image_urls[1].endswith('/static/images/poster_placeholder.svg')
@@ -0,0 +1,134 @@
+import csv
+
+from flask import Flask
+
+from movie_app import create_app
+import movie_app.adapters.omdb_client as omdb_client
+import movie_app.adapters.poster_cache as poster_cache
+import movie_app.adapters.poster_enrichment as poster_enrichment
+import movie_app.adapters.repository as repo
+import movie_app.blueprints.utilities as utilities
+from movie_app.adapters.omdb_client import OMDbClient, CircuitBreaker
+from movie_app.adapters.poster_cache import PosterCache, MISSING
+from movie_app.adapters.poster_enrichment import enrich_posters, read_completed_movies, PosterWarmUp
+from config import DataPaths
+
+import pytest
+
+test_data = DataPaths.TEST_DATA_PATHS
+
+
+@pytest.fixture()
+def poster_file(tmp_path):
+    return str(tmp_path.joinpath('posters.csv'))
+
+
+def read_poster_rows(file_name):
+    with open(file_name, mode='r', encoding='utf-8-sig') as csv_file:
+        return list(csv.DictReader(csv_file))
+
+
+def test_enrich_posters_writes_poster_file(standin, poster_file):
+    settings, base_url = standin
+    stats = enrich_posters(test_data['movies'], poster_file, OMDbClient('key', base_url=base_url), workers=3,
+                           checkpoint_every=2)
+
+    rows = read_poster_rows(poster_file)
+    assert stats == {'resolved': 11, 'no_poster': 0, 'failed': 0, 'skipped': 0}
+    assert sorted(int(row['Rank']) for row in rows) == list(range(1, 12))
+    assert all(row['Poster'].endswith(f"/posters/{row['Title'].replace(' ', '%20')}.png") for row in rows)
+
+
+def test_enrich_posters_resumes_from_poster_file(standin, poster_file):
+    settings, base_url = standin
+    client = OMDbClient('key', base_url=base_url)
+
+    assert enrich_posters(test_data['movies'], poster_file, client, limit=4)['resolved'] == 4
+    stats = enrich_posters(test_data['movies'], poster_file, client)
+
+    assert stats['resolved'] == 7 and stats['skipped'] == 4
+    assert len(read_poster_rows(poster_file)) == 11
+    assert settings.stats['requests'] == 11
+
+
+def test_enrich_posters_does_not_write_failed_lookups(standin, poster_file):
+    settings, base_url = standin
+    settings.failure_rate = 1.0
+    client = OMDbClient('key', base_url=base_url, max_attempts=1,
+                        circuit_breaker=CircuitBreaker(failure_threshold=100))
+
+    stats = enrich_posters(test_data['movies'], poster_file, client)
+    assert stats['failed'] == 11
+    assert read_poster_rows(poster_file) == []
+
+
+def test_enrich_posters_records_movies_without_posters(standin, poster_file):
+    settings, base_url = standin
+    settings.not_found_rate = 1.0
+
+    stats = enrich_posters(test_data['movies'], poster_file, OMDbClient('key', base_url=base_url))
+    assert stats['no_poster'] == 11
+    assert all(row['Poster'] == '' for row in read_poster_rows(poster_file))
+
+
+def test_read_completed_movies_removes_partial_last_line(poster_file):
+    with open(poster_file, mode='w', encoding='utf-8') as csv_file:
+        csv_file.write('Rank,Title,Year,Poster\n1,Guardians of the Galaxy,2014,http://posters.test/gotg.jpg\n2,Prom')
+
+    assert read_completed_movies(poster_file) == {('Guardians of the Galaxy', 2014)}
+    assert len(read_poster_rows(poster_file)) == 1
+
+
+def test_poster_warm_up_fills_cache_gaps(standin, in_memory_repo):
+    settings, base_url = standin
+    cache = PosterCache()
+    cache.put('Sing', 2016, 'http://posters.test/sing.jpg')
+
+    warm_up = PosterWarmUp(in_memory_repo, OMDbClient('key', base_url=base_url), cache, interval_seconds=0)
+    warm_up.start()
+    warm_up.join(5)
+
+    # Movies in the poster file, and movies already cached, are not looked up
+    assert warm_up.resolved == 7
+    assert settings.stats['requests'] == 7
+    assert cache.get('Mindhorn', 2016).endswith('/posters/Mindhorn.png')
+    assert cache.get('Prometheus', 2012) is MISSING
+
+
+def test_get_image_urls_uses_repository_poster_urls(standin, in_memory_repo, monkeypatch):
+    settings, base_url = standin
+    monkeypatch.setattr(repo, 'repo_instance', in_memory_repo)
+    monkeypatch.setattr(omdb_client, 'client_instance', OMDbClient('key', base_url=base_url))
+    monkeypatch.setattr(poster_cache, 'cache_instance', PosterCache())
+
+    with Flask('movie_app').test_request_context():
+        image_urls = utilities.get_image_urls({2: ('Prometheus', 2012), 3: ('Split', 2016)})
+
+    assert image_urls[2] == 'http://posters.test/prometheus.jpg'
+    assert image_urls[3].endswith('/static/images/poster_placeholder.svg')
+    assert settings.stats['requests'] == 0
+
+
+def test_create_app_leaves_warm_up_to_forked_workers(standin, monkeypatch):
+    settings, base_url = standin
+    for module, name in ((repo, 'repo_instance'), (poster_cache, 'cache_instance'),
+                         (omdb_client, 'client_instance'), (poster_enrichment, 'warm_up_instance')):
+        monkeypatch.setattr(module, name, None)
+
+    create_app({
+        'TESTING': True,
+        'TEST_DATA_PATHS': test_data,
+        'REPOSITORY_SNAPSHOT': None,
+        'POSTER_CACHE_FILE': None,
+        'POSTER_WARMUP': True,
+        'POSTER_WARMUP_AFTER_FORK': True,
+        'POSTER_DIRECTORY': None,
+        'OMDB_URL': base_url
+    })
+    warm_up = poster_enrichment.warm_up_instance
+    assert warm_up.ident is None
+
+    poster_enrichment.start_warm_up()
+    poster_enrichment.start_warm_up()
+    warm_up.join(5)
+    assert warm_up.resolved == 8
@@ -0,0 +1,110 @@
+from PIL import Image
+
+from movie_app.adapters.omdb_standin import poster_image
+from movie_app.adapters.poster_store import PosterStore, PosterStoreException, ORIGINAL
+
+import pytest
+
+
+@pytest.fixture()
+def store(tmp_path):
+    return PosterStore(str(tmp_path.joinpath('posters')))
+
+
+@pytest.fixture()
+def client_config(tmp_path):
+    return {'POSTER_DIRECTORY': str(tmp_path.joinpath('posters'))}
+
+
+def test_store_returns_stored_poster(store):
+    store.put('Split', 2016, poster_image('Split'))
+
+    stored_poster = store.get('Split', 2016)
+    assert stored_poster.mimetype == 'image/png'
+    with open(stored_poster.path, mode='rb') as poster_file:
+        assert poster_file.read() == poster_image('Split')
+
+    assert store.get('Split', 2017) is None
+
+
+def test_store_etag_changes_with_poster(store):
+    store.put('Split', 2016, poster_image('Split'))
+    etag = store.get('Split', 2016).etag
+    assert store.get('Split', 2016).etag == etag
+
+    store.put('Split', 2016, poster_image('Sing'))
+    assert store.get('Split', 2016).etag != etag
+
+
+def test_store_rejects_non_images(store):
+    with pytest.raises(PosterStoreException):
+        store.put('Split', 2016, b'<html>Not found</html>')
+
+    with pytest.raises(PosterStoreException):
+        store.get('Split', 2016, 'huge')
+
+
+def test_store_generates_thumbnails(store):
+    store.put('Split', 2016, poster_image('Split', width=600, height=888))
+
+    for size, height in (('large', 400), ('small', 200)):
+        thumbnail = store.get('Split', 2016, size)
+        assert thumbnail.mimetype == 'image/jpeg'
+        with Image.open(thumbnail.path) as image:
+            assert image.size == (height * 600 // 888, height)
+
+
+def test_store_serves_original_without_thumbnail(tmp_path):
+    store = PosterStore(str(tmp_path), thumbnail_heights={'small': 200})
+    store.put('Split', 2016, b'GIF89a' + b'\x00' * 16)
+
+    assert store.get('Split', 2016, 'small').path == store.get('Split', 2016, ORIGINAL).path
+
+
+def test_poster_proxy_copies_and_serves_poster(client, standin):
+    settings, base_url = standin
+    response = client.get('/posters/5')
+
+    assert response.status_code == 200
+    assert response.mimetype == 'image/png'
+    assert response.data == poster_image('Suicide Squad')
+    assert response.headers['ETag'].startswith('"')
+    assert response.headers['Cache-Control'] == 'public, no-cache'
+
+    # The poster is copied once
+    client.get('/posters/5')
+    assert settings.stats['poster_requests'] == 1
+
+
+def test_poster_proxy_answers_conditional_requests(client):
+    etag = client.get('/posters/5').headers['ETag']
+
+    response = client.get('/posters/5', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+    assert response.headers['ETag'] == etag
+
+
+def test_poster_proxy_marks_versioned_posters_immutable(client):
+    client.get('/posters/11')
+    page = client.get('/movies_by_genres?genres=Horror').get_data(as_text=True)
+
+    assert '/posters/11?size=large&amp;v=' in page
+    url = page[page.index('/posters/11?size=large'):].split('"')[0].split(' ')[0].split('>')[0].replace('&amp;', '&')
+    response = client.get(url)
+    assert response.headers['Cache-Control'] == 'public, max-age=31536000, immutable'
+
+
+def test_poster_proxy_redirects_movies_without_posters(client, standin):
+    settings, base_url = standin
+    settings.not_found_rate = 1.0
+
+    for rank in (3, 4):
+        response = client.get(f'/posters/{rank}')
+        assert response.status_code == 302
+        assert response.headers['Location'].endswith('/static/images/poster_placeholder.svg')
+
+
+def test_poster_proxy_rejects_unknown_movies_and_sizes(client):
+    assert client.get('/posters/1000').status_code == 404
+    assert client.get('/posters/3?size=huge').status_code == 404
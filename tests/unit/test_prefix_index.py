@@ -0,0 +1,73 @@
+from movie_app.adapters.frequency_counter import FrequencyCounter
+from movie_app.adapters.prefix_index import PrefixIndex, name_key
+from movie_app.adapters.repository import RepositoryException
+from movie_app.domainmodel import Actor, Genre
+
+import pytest
+
+
+@pytest.fixture()
+def prefix_index():
+    counter = FrequencyCounter()
+    prefix_index = PrefixIndex(counter)
+    for name, count in (('Chris Pratt', 3), ('Chris Evans', 1), ('Christian Bale', 2), ('Zoë Saldana', 1)):
+        prefix_index.add(name, name)
+        for _ in range(count):
+            counter.increment(name)
+    return counter, prefix_index
+
+
+def test_name_key():
+    assert name_key('  Zoë   SALDANA ') == 'zoe saldana'
+    assert name_key("Lupita Nyong'o") == 'lupita nyong o'
+    assert name_key(None) == ''
+
+
+def test_prefix_index_ranks_completions_by_count(prefix_index):
+    counter, prefix_index = prefix_index
+    assert prefix_index.complete('chris', 10) == ['Chris Pratt', 'Christian Bale', 'Chris Evans']
+    assert prefix_index.complete('Chris ', 10) == ['Chris Pratt', 'Chris Evans']
+    assert prefix_index.complete('chris', 1) == ['Chris Pratt']
+    assert prefix_index.complete('chrisx', 10) == []
+    assert prefix_index.complete('', 10) == []
+
+
+def test_prefix_index_completes_later_words_and_ignores_accents(prefix_index):
+    counter, prefix_index = prefix_index
+    assert prefix_index.complete('bal', 10) == ['Christian Bale']
+    assert prefix_index.complete('ZOE', 10) == ['Zoë Saldana']
+    assert prefix_index.complete('saldaña', 10) == ['Zoë Saldana']
+
+
+def test_prefix_index_cache_follows_counts(prefix_index):
+    counter, prefix_index = prefix_index
+    assert prefix_index.complete('c', 1) == ['Chris Pratt']
+
+    for _ in range(5):
+        counter.increment('Chris Evans')
+    assert prefix_index.complete('c', 1) == ['Chris Evans']
+
+    prefix_index.add('Cate Blanchett', 'Cate Blanchett')
+    for _ in range(10):
+        counter.increment('Cate Blanchett')
+    assert prefix_index.complete('c', 1) == ['Cate Blanchett']
+
+
+def test_repository_completes_names(in_memory_repo):
+    assert in_memory_repo.complete_actor_names('chris p', 5) == [Actor('Chris Pratt')]
+    assert in_memory_repo.complete_director_names('gunn', 5)[0].director_full_name == 'James Gunn'
+    assert in_memory_repo.complete_genre_names('hor', 5) == [Genre('Horror')]
+
+    with pytest.raises(RepositoryException):
+        in_memory_repo.complete_actor_names('chris', 0)
+
+
+def test_autocomplete(client):
+    response = client.get('/autocomplete', query_string={'prefix': 'chris p'})
+    assert response.status_code == 200
+    assert response.get_json()['actors'] == [{'name': 'Chris Pratt', 'url': '/movies_by_actors?actors=Chris+Pratt'}]
+    assert response.get_json()['directors'] == []
+
+    response = client.get('/autocomplete', query_string={'prefix': 'a', 'kind': 'genres', 'limit': 1})
+    assert list(response.get_json().keys()) == ['genres']
+    assert len(response.get_json()['genres']) == 1
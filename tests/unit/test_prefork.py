@@ -0,0 +1,66 @@
+import gc
+import os
+
+from movie_app.prefork import freeze_preloaded_heap, reopen_after_fork, objects_to_reopen, acquire_process_lock, \
+    memory_usage, format_memory_report
+
+import pytest
+
+
+def test_freeze_preloaded_heap():
+    freeze_preloaded_heap()
+    assert gc.get_freeze_count() > 0
+    gc.unfreeze()
+
+
+class Connection:
+    def __init__(self):
+        self.reopened = 0
+        reopen_after_fork(self)
+
+    def reopen(self):
+        self.reopened += 1
+
+
+def test_reopen_after_fork():
+    connection = Connection()
+    pid = os.fork()
+    if pid == 0:
+        os._exit(connection.reopened)
+
+    _, status = os.waitpid(pid, 0)
+    assert os.WEXITSTATUS(status) == 1
+    assert connection.reopened == 0
+
+
+def test_reopen_after_fork_drops_collected_objects():
+    connection = Connection()
+    assert connection in objects_to_reopen
+
+    count = len(objects_to_reopen)
+    del connection
+    gc.collect()
+    assert len(objects_to_reopen) == count - 1
+
+
+def test_acquire_process_lock(tmp_path):
+    path = str(tmp_path.joinpath('warm-up.lock'))
+    assert acquire_process_lock(path)
+    assert not acquire_process_lock(path)
+
+    pid = os.fork()
+    if pid == 0:
+        os._exit(int(acquire_process_lock(path)))
+
+    _, status = os.waitpid(pid, 0)
+    assert os.WEXITSTATUS(status) == 0
+
+
+@pytest.mark.skipif(not os.path.exists('/proc/self/smaps_rollup'), reason='requires Linux smaps_rollup')
+def test_memory_usage():
+    usage = memory_usage()
+    assert usage['rss'] > 0
+    assert usage['shared'] + usage['private'] == usage['rss']
+
+    report = format_memory_report({'master': usage})
+    assert f"{usage['rss']}" in report.splitlines()[1]
@@ -0,0 +1,112 @@
+import pickle
+import sys
+
+from movie_app.adapters.query_cache import ENTRY_OVERHEAD_BYTES, QueryCache
+from movie_app.adapters.range_index import RangePredicate
+from movie_app.domainmodel import Actor, Genre, Movie
+
+
+def test_query_cache_returns_copies_of_cached_results():
+    cache = QueryCache(max_bytes=1 << 20)
+    calls = list()
+
+    def compute():
+        calls.append(1)
+        return [1, 2, 3]
+
+    result = cache.get('key', compute, ['tag'])
+    result.append(4)
+    assert cache.get('key', compute, ['tag']) == [1, 2, 3]
+    assert len(calls) == 1
+
+    stats = cache.stats
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 1, 1)
+
+
+def test_query_cache_evicts_least_recently_used_results_over_budget():
+    entry_size = sys.getsizeof([0] * 10) + ENTRY_OVERHEAD_BYTES
+    cache = QueryCache(max_bytes=2 * entry_size)
+
+    cache.get('a', lambda: [0] * 10, [])
+    cache.get('b', lambda: [0] * 10, [])
+    cache.get('a', lambda: [1] * 10, [])
+    cache.get('c', lambda: [0] * 10, [])
+
+    # 'b' was used least recently, so it was evicted to keep within the budget
+    assert cache.get('a', lambda: [1] * 10, []) == [0] * 10
+    assert cache.get('b', lambda: [1] * 10, []) == [1] * 10
+    assert cache.stats['evictions'] == 2
+    assert cache.stats['bytes'] <= 2 * entry_size
+
+    # Results larger than the whole budget are returned but not cached
+    assert cache.get('d', lambda: [0] * 1000, []) == [0] * 1000
+    assert cache.stats['entries'] == 2
+
+
+def test_query_cache_invalidates_results_by_tag():
+    cache = QueryCache(max_bytes=1 << 20)
+    cache.get('horror', lambda: [3, 11], [('genre', 'Horror')])
+    cache.get('comedy', lambda: [4, 7], [('genre', 'Comedy')])
+
+    cache.invalidate([('genre', 'Horror')])
+    assert cache.get('horror', lambda: [3, 11, 12], [('genre', 'Horror')]) == [3, 11, 12]
+    assert cache.get('comedy', lambda: [], [('genre', 'Comedy')]) == [4, 7]
+    assert cache.stats['invalidations'] == 1
+
+
+def test_query_cache_does_not_store_results_computed_during_an_invalidation():
+    cache = QueryCache(max_bytes=1 << 20)
+
+    def compute():
+        cache.invalidate([('genre', 'Horror')])
+        return [3]
+
+    assert cache.get('horror', compute, [('genre', 'Horror')]) == [3]
+    assert cache.stats['entries'] == 0
+
+
+def test_query_cache_pickles_empty():
+    cache = QueryCache(max_bytes=1 << 20)
+    cache.get('key', lambda: [1], [])
+
+    cache = pickle.loads(pickle.dumps(cache))
+    assert cache.stats['entries'] == 0
+    assert cache.get('key', lambda: [2], []) == [2]
+
+
+def test_repository_caches_queries_until_a_movie_they_depend_on_is_added(in_memory_repo):
+    horror_comedy = [Genre('Horror'), Genre('Comedy')]
+    action_adventure = [Genre('Action'), Genre('Adventure')]
+    high_metascore = [RangePredicate('metascore', minimum=76)]
+
+    assert in_memory_repo.get_movie_ranks_by_genres(horror_comedy) == [11]
+    assert in_memory_repo.get_movie_ranks_by_genres(action_adventure) == [1, 5, 6, 9]
+    assert in_memory_repo.get_movie_ranks_by_ranges(high_metascore) == [1, 7, 9]
+    in_memory_repo.get_movie_ranks_by_genres(list(reversed(horror_comedy)))
+    assert in_memory_repo.get_query_cache_stats()['hits'] == 1
+
+    movie = Movie('Slither 2', 2017)
+    movie.rank = 12
+    movie.metascore = 80
+    movie.add_genre(Genre('Horror'))
+    movie.add_genre(Genre('Comedy'))
+    in_memory_repo.add_movie(movie)
+
+    # Only the queries about the new Movie's genres, and those over the whole catalogue, are evicted
+    stats = in_memory_repo.get_query_cache_stats()
+    assert (stats['invalidations'], stats['entries']) == (2, 1)
+    assert in_memory_repo.get_movie_ranks_by_genres(horror_comedy) == [11, 12]
+    assert in_memory_repo.get_movie_ranks_by_ranges(high_metascore) == [1, 7, 9, 12]
+    assert in_memory_repo.get_movie_ranks_by_genres(action_adventure) == [1, 5, 6, 9]
+    assert in_memory_repo.get_query_cache_stats()['hits'] == 2
+
+
+def test_repository_evicts_colleague_queries_when_actors_are_added(in_memory_repo):
+    colleagues = [Actor('Chris Pratt')]
+    actors = in_memory_repo.get_actors_by_colleagues(colleagues)
+
+    actor = Actor('Ann Other')
+    actor.add_actor_colleague(Actor('Chris Pratt'))
+    in_memory_repo.add_actor(actor)
+
+    assert in_memory_repo.get_actors_by_colleagues(colleagues) == actors + [actor]
@@ -0,0 +1,92 @@
+from movie_app.adapters.range_index import RangeIndex, RangePredicate
+import movie_app.services.movie_services as services
+
+import pytest
+
+
+@pytest.fixture()
+def range_index():
+    range_index = RangeIndex()
+    for rank, value in enumerate([50, 70, 70, 80, 90, 60], start=1):
+        range_index.add(value, rank)
+    return range_index
+
+
+def test_range_index_answers_range_predicates(range_index):
+    assert range_index.ranks(RangePredicate('metascore', minimum=70)) == [2, 3, 4, 5]
+    assert range_index.ranks(RangePredicate('metascore', minimum=70, include_minimum=False)) == [4, 5]
+    assert range_index.ranks(RangePredicate('metascore', maximum=70, include_maximum=False)) == [1, 6]
+    assert range_index.ranks(RangePredicate('metascore', 60, 80)) == [2, 3, 4, 6]
+    assert range_index.ranks(RangePredicate('metascore', 85, 75)) == []
+    assert range_index.count(RangePredicate('metascore')) == len(range_index) == 6
+
+
+def test_range_index_includes_values_added_after_a_query(range_index):
+    assert range_index.count(RangePredicate('metascore', minimum=90)) == 1
+
+    range_index.add(95, 7)
+    assert range_index.ranks(RangePredicate('metascore', minimum=90)) == [5, 7]
+
+
+def test_range_index_sorts_ranks_by_value(range_index):
+    assert range_index.sorted_ranks() == [1, 6, 2, 3, 4, 5]
+    assert range_index.sorted_ranks(descending=True) == [5, 4, 2, 3, 6, 1]
+
+    range_index.add(70, 7)
+    assert range_index.sorted_ranks(descending=True) == [5, 4, 2, 3, 7, 6, 1]
+
+
+def test_range_predicate_matches_values():
+    predicate = RangePredicate('runtime_minutes', 90, 120, include_maximum=False)
+
+    assert predicate.matches(90) and predicate.matches(119)
+    assert not predicate.matches(120)
+    assert not predicate.matches(None)
+
+
+@pytest.mark.parametrize(('condition', 'predicate'), (
+        ('metascore>=80', RangePredicate('metascore', minimum=80)),
+        ('runtime < 120', RangePredicate('runtime_minutes', maximum=120, include_maximum=False)),
+        ('Rating=7.5', RangePredicate('external_rating', 7.5, 7.5)),
+        ('revenue>100.5', RangePredicate('revenue_millions', minimum=100.5, include_minimum=False)),
+))
+def test_parse_range_condition(condition, predicate):
+    assert services.parse_range_condition(condition) == predicate
+
+
+@pytest.mark.parametrize('condition', ('title>=80', 'metascore=>80', 'votes>many', 'metascore'))
+def test_parse_range_condition_rejects_invalid_conditions(condition):
+    with pytest.raises(services.ServicesException):
+        services.parse_range_condition(condition)
+
+
+def listed_movie_ranks(response):
+    # The random Movies in the sidebar have no review buttons, so only the listed Movies are found
+    return [rank for rank in range(1, 12) if f"add_review_for={rank}'".encode() in response.data]
+
+
+def test_movies_by_ranges(client):
+    response = client.get('/movies_by_ranges', query_string={'ranges': 'metascore>=65/runtime<120'})
+    assert response.status_code == 200
+    assert listed_movie_ranks(response) == [8, 11]
+
+    response = client.get('/movies_by_ranges', query_string={'ranges': 'metascore>60', 'director': 'James Gunn'})
+    assert listed_movie_ranks(response) == [1, 11]
+
+
+def test_movies_by_ranges_reads_page_arguments(client):
+    response = client.get('/movies_by_ranges', query_string={'ranges': 'metascore>0', 'cursor': 'abc'})
+    assert response.status_code == 200
+    assert listed_movie_ranks(response) == [1, 2, 3]
+
+    response = client.get('/movies_by_ranges', query_string={'ranges': 'metascore>0', 'cursor': -3,
+                                                             'view_reviews_for': 'x'})
+    assert listed_movie_ranks(response) == [1, 2, 3]
+
+    response = client.get('/movies_by_ranges', query_string={'ranges': 'metascore>0', 'size': 5})
+    assert listed_movie_ranks(response) == [1, 2, 3, 4, 5]
+    cursor = services.encode_page_cursor(False, 5)
+    assert f"size=5&amp;cursor={cursor}".encode() in response.data
+
+    response = client.get('/movies_by_ranges', query_string={'ranges': 'metascore>0', 'size': 5, 'cursor': cursor})
+    assert listed_movie_ranks(response) == [6, 7, 8, 9, 10]
@@ -0,0 +1,115 @@
+import shutil
+from pathlib import Path
+
+import movie_app.adapters.snapshot as snapshot
+from movie_app.adapters.snapshot import load_or_populate, load_snapshot, save_snapshot
+from movie_app.domainmodel import Actor, Genre, Movie, Review, User
+from config import DataPaths
+
+import pytest
+
+test_data = DataPaths.TEST_DATA_PATHS
+
+
+@pytest.fixture()
+def data_paths(tmp_path):
+    data_paths = dict()
+    for name, file_name in test_data.items():
+        data_paths[name] = str(tmp_path.joinpath(f"{name}.csv"))
+        shutil.copyfile(file_name, data_paths[name])
+    return data_paths
+
+
+@pytest.fixture()
+def snapshot_path(tmp_path):
+    return str(tmp_path.joinpath('repository.snapshot'))
+
+
+def test_snapshot_restores_repository(in_memory_repo, data_paths, snapshot_path):
+    save_snapshot(in_memory_repo, snapshot_path, data_paths)
+    repo = load_snapshot(snapshot_path, data_paths)
+
+    assert repo is not None and repo is not in_memory_repo
+    assert repo.get_number_of_movies() == in_memory_repo.get_number_of_movies()
+    assert repo.get_movie_ranks_by_genres([Genre('Horror')]) == [3, 11]
+    assert repo.get_most_common_actors(1) == [Actor('Chris Pratt')]
+
+    actor = repo.get_actor('Chris Pratt')
+    assert actor.check_if_this_actor_worked_with(Actor('Jennifer Lawrence'))
+
+    review = repo.get_review(1)
+    assert review.user is repo.get_user('ian')
+    assert review.movie is repo.get_movie('Suicide Squad', 2016)
+    assert review in repo.get_reviews_for_movie(review.movie)
+
+    watching_sim = repo.get_watching_sim(1)
+    assert watching_sim.movie is repo.get_movie_by_rank(6)
+    assert repo.get_user_by_id(1) in watching_sim.users
+    assert repo.get_watchlist_by_user_id(3).user is repo.get_user('daniel')
+
+    # Versions of the loaded repository count from the snapshot, not from the repository it was saved from
+    assert repo.get_load_token() != in_memory_repo.get_load_token()
+    assert load_snapshot(snapshot_path, data_paths).get_load_token() != repo.get_load_token()
+
+
+def test_snapshot_continues_ids(in_memory_repo, data_paths, snapshot_path):
+    save_snapshot(in_memory_repo, snapshot_path, data_paths)
+    User.reset_id()
+    Review.reset_id()
+    load_snapshot(snapshot_path, data_paths)
+
+    assert User('Bob', 'pw01234').id == 4
+    assert Review(Movie('Sing', 2016), 'Fun', 7).id == 9
+
+
+def test_snapshot_is_rebuilt_when_data_file_changes(data_paths, snapshot_path):
+    load_or_populate(data_paths, snapshot_path)
+    assert load_snapshot(snapshot_path, data_paths) is not None
+
+    with open(data_paths['users'], mode='a', encoding='utf-8') as users_file:
+        users_file.write('\n4,Bob,pw01234,"1"')
+    assert load_snapshot(snapshot_path, data_paths) is None
+
+    repo = load_or_populate(data_paths, snapshot_path)
+    assert repo.get_user('bob') is not None
+    assert load_snapshot(snapshot_path, data_paths).get_user('bob') is not None
+
+
+def test_snapshot_survives_touched_data_file(data_paths, snapshot_path):
+    load_or_populate(data_paths, snapshot_path)
+
+    shutil.copyfile(test_data['movies'], data_paths['movies'])
+    assert load_snapshot(snapshot_path, data_paths) is not None
+
+
+def test_unreadable_snapshot_is_ignored(data_paths, snapshot_path):
+    with open(snapshot_path, mode='wb') as snapshot_file:
+        snapshot_file.write(b'not a snapshot')
+
+    assert load_snapshot(snapshot_path, data_paths) is None
+    assert load_or_populate(data_paths, snapshot_path).get_number_of_movies() == 11
+
+
+def test_snapshot_is_stale_once_missing_data_file_is_created(in_memory_repo, data_paths, snapshot_path):
+    poster_file = Path(data_paths['posters'])
+    poster_file.unlink()
+    save_snapshot(in_memory_repo, snapshot_path, data_paths)
+    assert load_snapshot(snapshot_path, data_paths) is not None
+
+    shutil.copyfile(test_data['posters'], poster_file)
+    assert load_snapshot(snapshot_path, data_paths) is None
+
+
+def test_snapshot_is_stale_when_code_changes(in_memory_repo, data_paths, snapshot_path, monkeypatch):
+    save_snapshot(in_memory_repo, snapshot_path, data_paths)
+
+    monkeypatch.setattr(snapshot, 'fingerprint_code', lambda: 'other code')
+    assert load_snapshot(snapshot_path, data_paths) is None
+
+
+def test_snapshot_restores_repository_indexes(in_memory_repo, data_paths, snapshot_path):
+    save_snapshot(in_memory_repo, snapshot_path, data_paths)
+    repo = load_snapshot(snapshot_path, data_paths)
+
+    assert repo.search_movie_ranks('intergalactic criminals') == ([1], 1)
+    assert repo.get_movie_ranks_by_ranges([], genre_list=[Genre('Horror')]) == [3, 11]
@@ -0,0 +1,116 @@
+from movie_app.adapters.repository import RepositoryException
+from movie_app.adapters.text_index import TextIndex, stem, tokenize
+from movie_app.domainmodel import Movie
+import movie_app.services.movie_services as services
+
+import pytest
+
+
+@pytest.fixture()
+def text_index(dataset_of_movies):
+    text_index = TextIndex()
+    for movie in dataset_of_movies:
+        text_index.add(movie.rank, movie.title, movie.description)
+    return text_index
+
+
+@pytest.mark.parametrize(('word', 'stemmed'), (
+        ('criminals', 'crimin'), ('criminality', 'crimin'), ('ponies', 'poni'), ('hopping', 'hop'),
+        ('agreed', 'agre'), ('relational', 'relat'), ('generalizations', 'gener'), ('adoption', 'adopt'),
+        ('sky', 'sky'), ('2016', '2016')
+))
+def test_stem(word, stemmed):
+    assert stem(word) == stemmed
+
+
+def test_tokenize_folds_case_and_accents_and_drops_stop_words():
+    assert tokenize("The Guardians' Café, of GALAXIES") == ['guardian', 'cafe', 'galaxi']
+    assert tokenize(None) == []
+
+
+def test_text_index_ranks_matches(text_index):
+    assert text_index.search('intergalactic criminals') == ([1], 1)
+    assert text_index.search('INTERGALACTIC Criminal') == ([1], 1)
+
+    # Title words outweigh description words, so The Lost City of Z is ranked first
+    assert text_index.search('city') == ([9, 4], 2)
+
+
+def test_text_index_requires_all_words(text_index):
+    assert text_index.search('criminals Slither') == ([], 0)
+    assert text_index.search('the of') == ([], 0)
+    assert text_index.search('') == ([], 0)
+
+
+def test_text_index_matches_phrases(text_index):
+    assert text_index.search('"fanatical warrior"') == ([1], 1)
+    assert text_index.search('"warrior fanatical"') == ([], 0)
+    assert text_index.search('universe "intergalactic criminals"') == ([1], 1)
+
+
+def test_text_index_pages_matches(text_index):
+    movie_ranks, number_of_movies = text_index.search('city')
+    assert text_index.search('city', cursor=1, quantity=1) == (movie_ranks[1:], number_of_movies)
+    assert text_index.search('city', cursor=5) == ([], number_of_movies)
+
+
+def test_text_index_pages_matches_from_anchors(text_index):
+    movie_ranks, number_of_movies = text_index.search('must')
+    assert text_index.search_page('must', quantity=1) == (movie_ranks[:1], number_of_movies)
+    assert text_index.search_page('must', anchor=movie_ranks[0]) == (movie_ranks[1:], number_of_movies)
+    assert text_index.search_page('must', anchor=movie_ranks[1], backward=True) == (movie_ranks[:1], number_of_movies)
+    assert text_index.search_page('must', backward=True, quantity=1) == (movie_ranks[-1:], number_of_movies)
+
+
+def test_text_index_keeps_postings_sorted_when_movies_are_added_out_of_order():
+    text_index = TextIndex()
+    text_index.add(5, 'Space Station', 'A space station drifts.')
+    text_index.add(2, 'Space Race', 'A race into space.')
+    text_index.add(9, 'Lost in Space', 'Lost in space.')
+    text_index.add(5, 'Duplicate', 'Ignored.')
+
+    assert len(text_index) == 3
+    assert sorted(text_index.search('space')[0]) == [2, 5, 9]
+    assert text_index.search('"space race"') == ([2], 1)
+    assert text_index.search('duplicate') == ([], 0)
+
+
+def test_repository_searches_movies(in_memory_repo):
+    assert in_memory_repo.search_movie_ranks('intergalactic criminals') == ([1], 1)
+
+    movie = Movie('Galaxy Quest', 1999)
+    movie.rank = 12
+    movie.description = 'Actors of a cancelled show meet real intergalactic criminals.'
+    in_memory_repo.add_movie(movie)
+
+    # The new Movie's shorter description makes its matches count for more
+    assert in_memory_repo.search_movie_ranks('intergalactic criminals', quantity=1) == ([12], 2)
+
+    with pytest.raises(RepositoryException):
+        in_memory_repo.search_movie_ranks('criminals', cursor=-1)
+
+
+def test_movies_by_text(client):
+    response = client.get('/movies_by_text', query_string={'query': 'intergalactic criminals'})
+    assert response.status_code == 200
+    assert b'Movies matching: intergalactic criminals' in response.data
+    assert b"add_review_for=1'" in response.data
+
+    response = client.get('/movies_by_text', query_string={'query': 'no such words'})
+    assert b'No movies found matching: no such words' in response.data
+
+
+def test_movies_by_text_reads_page_arguments(client):
+    response = client.get('/movies_by_text', query_string={'query': 'must', 'cursor': 'x'})
+    assert response.status_code == 200
+    assert b'Movies matching: must' in response.data
+
+    response = client.get('/movies_by_text', query_string={'query': 'must', 'size': 1, 'cursor': -1})
+    assert response.status_code == 200
+    first_rank = next(rank for rank in (3, 8) if f"add_review_for={rank}'".encode() in response.data)
+    cursor = services.encode_page_cursor(False, first_rank)
+    assert f"size=1&amp;cursor={cursor}".encode() in response.data
+
+    response = client.get('/movies_by_text', query_string={'query': 'must', 'size': 1, 'cursor': cursor})
+    other_rank = 8 if first_rank == 3 else 3
+    assert f"add_review_for={other_rank}'".encode() in response.data